@@ -4,20 +4,25 @@ PDF Extraction Viewer - Streamlit
 Run: streamlit run app.py
 """
 
-import hashlib
-import json
+from concurrent.futures import Future
 from pathlib import Path
 
 import pandas as pd
-import pymupdf
-import pymupdf4llm
-import pdfplumber
 import streamlit as st
 
 from src.extractor import PDFExtractor
 from src.structure_parser import StructureParser
 from src.chunker import PDFChunker
-from src.models import Chunk
+from src.doc_pool import DocumentPool
+from src.document import parse_page_ranges
+from src.jobs import BackgroundJob
+from src.models import ElementType, PageElement, PageResult
+from src.overlay import IMAGE_MIME, data_uri, overlay_html
+from src.pdf_source import PDFSource
+from src.page_cache import PageCache
+from src.pypdf_document import PyPDFDocument, chunk_documents
+from src.render_cache import IMAGE_FORMATS, RenderCache
+from src.serializer import dumps_models
 
 st.set_page_config(
     page_title="PDF Extractor",
@@ -32,53 +37,66 @@ st.set_page_config(
 # ------------------------------------------------------------------
 
 @st.cache_resource
-def load_pdf(path: str):
-    return pymupdf.open(path)
-
-
-@st.cache_data
-def render_page(pdf_path: str, page_index: int, zoom: float = 2.0) -> bytes:
-    doc = pymupdf.open(pdf_path)
-    page = doc[page_index]
-    mat = pymupdf.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat)
-    data = pix.tobytes("png")
-    doc.close()
-    return data
-
-
-@st.cache_data
-def extract_page_markdown(pdf_path: str, page_index: int) -> str:
-    md = pymupdf4llm.to_markdown(
-        doc=pdf_path,
-        pages=[page_index],
-        hdr_info=False,
-        ignore_code=True,
-    )
-    # Fallback: markdown 추출 빈약 시 raw text 사용
-    doc = pymupdf.open(pdf_path)
-    raw = doc[page_index].get_text()
-    doc.close()
-    if raw.strip() and len(md.strip()) < len(raw.strip()) * 0.3:
-        lines = [l.strip() for l in raw.split("\n")]
-        md = "\n\n".join(l for l in lines if l)
-    return md
-
-
-@st.cache_data
-def extract_page_pypdf(pdf_path: str, page_index: int) -> str:
+def get_doc_pool() -> DocumentPool:
+    """세션 간 공유 문서 핸들 풀 (PyMuPDF 문서는 스레드 간 공유 불가)."""
+    return DocumentPool(max_per_file=4, idle_seconds=300)
+
+
+def release_source(source: PDFSource) -> None:
+    """캐시에서 빠진 문서의 풀 핸들 정리 (사용 중인 핸들은 반납될 때 닫힘)."""
+    get_doc_pool().close_file(source)
+
+
+@st.cache_resource(max_entries=16, on_release=release_source)
+def load_path_source(path: str, mtime_ns: int) -> PDFSource:
+    """경로 입력. mtime이 바뀌면 새 PDFSource (내용 해시 재계산)."""
+    return PDFSource(path)
+
+
+@st.cache_resource(max_entries=8, on_release=release_source)
+def load_upload_source(file_id: str, _uploaded) -> PDFSource:
+    """업로드 입력은 디스크에 쓰지 않고 메모리 버퍼 그대로 사용 (file_id당 1회 복사)."""
+    return PDFSource(_uploaded.getvalue(), name=_uploaded.name)
+
+
+@st.cache_resource
+def get_page_cache() -> PageCache:
+    """세션 간 공유 페이지 캐시 (prefetch 워커 풀 포함)."""
+    return PageCache(workers=2)
+
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """세션 간 공유 렌더 캐시 (메모리/디스크 용량 상한)."""
+    return RenderCache(disk_dir=Path("output") / "render_cache", doc_pool=get_doc_pool())
+
+
+@st.cache_resource(max_entries=8)
+def get_pypdf_document(key: str, _source: PDFSource) -> PyPDFDocument:
+    """LangChain 모드 - 문서당 pypdf reader 하나 (페이지 표시와 Extract All이 공유)."""
+    return PyPDFDocument(_source)
+
+
+def extract_page_result(source: PDFSource, page_index: int) -> PageResult:
+    """Custom 모드 - PDFExtractor로 페이지 추출 (Extract All과 같은 결과를 공유).
+
+    호출마다 풀에서 핸들을 빌려 추출기를 만들므로 세션/prefetch 워커가 서로 기다리지 않는다
+    (문서당 최대 max_per_file개 동시). 페이지를 볼 때마다 ./output에 이미지를 쓰지 않도록
+    write_images=False.
+    """
+    with get_doc_pool().document(source) as doc:
+        extractor = PDFExtractor(source, write_images=False, doc=doc)
+        return extractor.extract_page(page_index)
+
+
+def extract_page_pypdf(source: PDFSource, page_index: int) -> str:
     """PyPDFLoader 방식 - pypdf로 페이지 텍스트 추출."""
-    from pypdf import PdfReader
-    reader = PdfReader(pdf_path)
-    if page_index < len(reader.pages):
-        return reader.pages[page_index].extract_text() or ""
-    return ""
+    return get_pypdf_document(source.key, source).page_text(page_index)
 
 
-@st.cache_data
-def extract_page_tables(pdf_path: str, page_index: int) -> list[dict]:
+def extract_page_tables(source: PDFSource, page_index: int) -> list[dict]:
     tables = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with source.open_pdfplumber() as pdf:
         if page_index < len(pdf.pages):
             page = pdf.pages[page_index]
             for t in page.find_tables():
@@ -87,10 +105,336 @@ def extract_page_tables(pdf_path: str, page_index: int) -> list[dict]:
                     tables.append({
                         "headers": [c or "" for c in raw[0]],
                         "rows": [[c or "" for c in row] for row in raw[1:]],
+                        "bbox": tuple(t.bbox),
                     })
     return tables
 
 
+def extract_page_images(source: PDFSource, page_index: int) -> list[dict]:
+    """50x50 초과 이미지만 (아이콘 제외)."""
+    images = []
+    with get_doc_pool().document(source) as doc:
+        page = doc[page_index]
+        for img_idx, img in enumerate(page.get_images()):
+            xref = img[0]
+            try:
+                base_img = doc.extract_image(xref)
+            except Exception:
+                continue
+            if base_img and base_img["width"] > 50 and base_img["height"] > 50:
+                rects = page.get_image_rects(xref)
+                images.append({
+                    "index": img_idx,
+                    "image": base_img["image"],
+                    "width": base_img["width"],
+                    "height": base_img["height"],
+                    "bbox": tuple(rects[0]) if rects else None,
+                })
+    return images
+
+
+def page_tasks(source: PDFSource, page_index: int, is_langchain: bool) -> list[tuple]:
+    """페이지 하나의 추출 결과에 필요한 (캐시 키, 함수, 인자) 목록. 렌더링은 RenderCache가 담당.
+
+    Custom: [PageResult, 이미지], LangChain: [pypdf 텍스트, 테이블, 이미지]
+    """
+    key = source.key  # 내용 해시 (같은 파일을 업로드/경로로 열어도 캐시 공유)
+    images_task = ((key, page_index, "images"), extract_page_images, (source, page_index))
+    if is_langchain:
+        return [
+            ((key, page_index, "pypdf"), extract_page_pypdf, (source, page_index)),
+            ((key, page_index, "tables"), extract_page_tables, (source, page_index)),
+            images_task,
+        ]
+    return [
+        ((key, page_index, "page"), extract_page_result, (source, page_index)),
+        images_task,
+    ]
+
+
+def schedule_prefetch(
+    cache: PageCache,
+    render_cache: RenderCache,
+    source: PDFSource,
+    page_index: int,
+    total_pages: int,
+    window: int,
+    zoom: float,
+    image_format: str,
+    is_langchain: bool,
+):
+    """현재 페이지 앞뒤 window 페이지를 가까운 순으로 prefetch.
+
+    이 세션이 예약한 대기 작업 중 범위 밖인 것만 취소한다 (캐시는 다른 세션과 공유).
+    """
+    pending: dict[tuple, Future] = st.session_state.setdefault("prefetch_futures", {})
+    stale = [
+        (key, fut) for key, fut in pending.items()
+        if fut.done()
+        or key[0] != source.key
+        or abs(key[1] - page_index) > window
+        or (key[2] == "render" and key[3:] != (zoom, image_format))
+    ]
+    cache.cancel(stale)
+    for key, _ in stale:
+        del pending[key]
+
+    def submit(key, fn, *args, keep=True):
+        fut = cache.prefetch(key, fn, *args, keep=keep)
+        if fut is not None:
+            pending[key] = fut
+
+    for dist in range(1, window + 1):
+        for p in (page_index + dist, page_index - dist):
+            if 0 <= p < total_pages:
+                submit(
+                    (source.key, p, "render", zoom, image_format),
+                    render_cache.get, source, p, zoom, image_format,
+                    keep=False,
+                )
+                for key, fn, args in page_tasks(source, p, is_langchain):
+                    submit(key, fn, *args)
+
+
+def show_page_strip(render_cache: RenderCache, source: PDFSource, page_num: int, total_pages: int):
+    """현재 페이지 주변 썸네일 스트립. 클릭 시 해당 페이지로 이동."""
+    first = max(1, min(page_num - 3, total_pages - 6))
+    nums = list(range(first, min(total_pages, first + 6) + 1))
+    for col, num in zip(st.columns(len(nums)), nums):
+        with col:
+            st.image(render_cache.thumbnail(source, num - 1), use_container_width=True)
+            st.button(
+                f"p.{num}",
+                key=f"strip_{num}",
+                type="primary" if num == page_num else "secondary",
+                on_click=st.session_state.update,
+                kwargs={"page_slider": num},
+                use_container_width=True,
+            )
+
+
+def element_label(e: PageElement) -> str:
+    return f"h{e.level}" if e.type == ElementType.HEADING else e.type.value
+
+
+def page_elements(page_num: int, is_langchain: bool, tasks: list[tuple], cached) -> list[PageElement]:
+    """bbox가 있는 페이지 요소. Custom 모드는 HEADING 포함 읽기 순서, LangChain 모드는 테이블 + 이미지만."""
+    if not is_langchain:
+        return [e for e in cached(tasks[0]).elements if e.bbox]
+    elements = [
+        PageElement(
+            type=ElementType.TABLE, content=" | ".join(t["headers"]), page=page_num, bbox=t["bbox"]
+        )
+        for t in cached(tasks[1])
+    ]
+    elements += [
+        PageElement(
+            type=ElementType.IMAGE, content=f"{img['width']}x{img['height']}",
+            page=page_num, bbox=img["bbox"],
+        )
+        for img in cached(tasks[-1]) if img["bbox"]
+    ]
+    return elements
+
+
+def image_url(data: bytes, fmt: str, coordinates: str) -> str:
+    """st.image와 같은 미디어 파일 URL (같은 내용이면 같은 URL이라 브라우저가 캐시).
+
+    재실행마다 래스터를 base64로 HTML에 넣어 다시 보내지 않도록 한다. 런타임이 없으면
+    (AppTest 등) data URI.
+    """
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return data_uri(data, fmt)
+    return runtime.get_instance().media_file_mgr.add(data, IMAGE_MIME[fmt], coordinates)
+
+
+def show_inspector(
+    render_cache: RenderCache,
+    source: PDFSource,
+    page_idx: int,
+    page_image: bytes,
+    elements: list[PageElement],
+    clip_zoom: float,
+    image_format: str,
+):
+    """캐시된 페이지 래스터 위에 요소 bbox를 겹쳐 그리고, 선택한 요소는 그 영역만 고배율로 렌더링."""
+    choice = st.selectbox(
+        "Element", range(len(elements)), index=None,
+        format_func=lambda i: f"{i + 1}. {element_label(elements[i])} - "
+        + elements[i].content[:40].replace("\n", " "),
+        placeholder=f"{len(elements)} elements - select to zoom",
+        key=f"inspect_{source.key}_{page_idx}",
+    )
+    with get_doc_pool().document(source) as doc:
+        rect = doc[page_idx].rect
+    boxes = [
+        (e.bbox, e.type, f"{i + 1}. {element_label(e)}\n{e.content[:300]}") for i, e in enumerate(elements)
+    ]
+    st.markdown(
+        overlay_html(
+            image_url(page_image, image_format, f"inspector.{source.key}.{page_idx}"),
+            (rect.width, rect.height), boxes, choice,
+        ),
+        unsafe_allow_html=True,
+    )
+    if choice is not None:
+        x0, y0, x1, y1 = elements[choice].bbox
+        clip = (x0 - 4, y0 - 4, x1 + 4, y1 + 4)  # 테두리 선이 잘리지 않도록 약간 여유
+        clip_bytes, tier = render_cache.get(source, page_idx, clip_zoom, image_format, clip=clip)
+        st.image(
+            clip_bytes,
+            caption=f"Element {choice + 1} @ {clip_zoom}x - {len(clip_bytes) / 1024:.0f} KB ({tier})",
+        )
+
+
+def show_render_cache_stats(render_cache: RenderCache):
+    stats = render_cache.stats()
+    mb = 1024 * 1024
+    st.markdown(
+        f"- Memory: {stats['memory_bytes'] / mb:.1f} / {stats['memory_limit'] / mb:.0f} MB "
+        f"({stats['memory_entries']} pages)\n"
+        f"- Thumbnails: {stats['thumbnail_bytes'] / mb:.1f} MB\n"
+        f"- Disk: {stats['disk_bytes'] / mb:.1f} MB ({stats['disk_entries']} files)\n"
+        f"- Hits: memory {stats['hits']['memory']}, disk {stats['hits']['disk']}, "
+        f"render {stats['hits']['render']}\n"
+        f"- Avg render: {stats['avg_render_ms']:.0f} ms"
+    )
+
+
+# ------------------------------------------------------------------
+# Full extraction (background job)
+# ------------------------------------------------------------------
+
+def run_custom_extraction(
+    job: BackgroundJob, page_cache: PageCache, source: PDFSource, pages: list[int]
+):
+    """Custom 모드 추출 (pages: 0부터 시작 인덱스).
+
+    페이지 결과는 뷰어와 같은 캐시를 사용 (이미 본 페이지는 재추출 없음).
+    """
+    source_name = source.stem
+    total = len(pages)
+    all_results: list[PageResult] = []
+    for n, pi in enumerate(pages, 1):
+        if job.cancel_requested:
+            return None
+        (key, fn, args), _ = page_tasks(source, pi, is_langchain=False)
+        result, hit = page_cache.get(key, fn, *args)
+        all_results.append(result)
+        job.report(
+            n, total,
+            f"Page {result.page_number} - tables: {len(result.tables)}, images: {len(result.images)}",
+        )
+        job.log(
+            f"Page {result.page_number:2d}: tables {len(result.tables)}, images {len(result.images)}"
+            + (" (cached)" if hit else "")
+        )
+
+    # 구조 파싱 + 청킹 (뷰어 요소 목록과 같은 폰트 통계 캐시 사용)
+    job.report(total, total, "Parsing structure & chunking...")
+    struct_parser = StructureParser(source)
+    sections = struct_parser.parse(all_results)
+
+    chunker = PDFChunker()
+    if sections:
+        chunks = chunker.chunk_by_sections(sections, all_results, source=source_name)
+    else:
+        chunks = chunker.chunk_by_pages(all_results, source=source_name)
+
+    return {
+        "summary": f"Done! {len(sections)} sections, {len(chunks)} chunks",
+        "sections": sections,
+        "chunks": chunks,
+        "full_text": "\n\n---\n\n".join(r.markdown for r in all_results),
+    }
+
+
+def run_langchain_extraction(job: BackgroundJob, source: PDFSource, pages: list[int]):
+    """LangChain 모드 추출: PyPDFLoader와 같은 pypdf 텍스트 + RecursiveCharacterTextSplitter.
+
+    PyPDFLoader로 문서를 다시 파싱하지 않고 뷰어와 같은 PyPDFDocument를 쓴다
+    (이미 본 페이지는 텍스트 추출도 생략).
+    """
+    pypdf_doc = get_pypdf_document(source.key, source)
+    total = len(pages)
+    docs = []
+    for n, pi in enumerate(pages, 1):
+        if job.cancel_requested:
+            return None
+        doc_item = pypdf_doc.documents([pi])[0]
+        docs.append(doc_item)
+        job.report(n, total, f"Page {pi + 1} - pypdf")
+        job.log(f"Page {pi + 1:2d}: {len(doc_item.page_content)} chars")
+
+    job.report(total, total, "RecursiveCharacterTextSplitter - chunking...")
+    chunks = chunk_documents(docs, source=source.stem)
+
+    return {
+        "summary": f"Done! {len(docs)} pages, {len(chunks)} chunks (LangChain)",
+        "sections": [],
+        "chunks": chunks,
+        "full_text": "\n\n---\n\n".join(d.page_content for d in docs),
+    }
+
+
+@st.fragment(run_every=0.5)
+def show_job_progress(job: BackgroundJob):
+    """0.5초마다 진행 상황 스냅샷만 다시 그린다 (작업 속도와 무관한 UI 갱신 빈도)."""
+    if job.done:
+        st.rerun()
+
+    snap = job.snapshot()
+    st.progress(snap["fraction"])
+    st.markdown(f"**[{snap['done']}/{snap['total']}]** {snap['message']}  ({snap['elapsed']:.0f}s)")
+    tail = snap["log"][-20:]
+    hidden = snap["log_total"] - len(tail)
+    header = [f"... {hidden} earlier lines"] if hidden else []
+    st.code("\n".join(header + tail), language=None)
+    if st.button("Cancel", key="cancel_extract_job"):
+        job.cancel()
+
+
+def show_extraction_result(result: dict, source_name: str):
+    st.success(result["summary"])
+    sections = result["sections"]
+    chunks = result["chunks"]
+
+    # 섹션 요약 (Custom 모드만)
+    if sections:
+        st.subheader("Document Structure")
+        for sec in sections:
+            indent = "--" * (sec.level - 1)
+            label = f"{indent} {sec.title} (p.{sec.start_page}-{sec.end_page})"
+            with st.expander(label):
+                display = sec.content[:500] + "..." if len(sec.content) > 500 else sec.content
+                st.text(display)
+
+    # 다운로드
+    st.subheader("Export")
+    col_dl1, col_dl2 = st.columns(2)
+
+    with col_dl1:
+        chunks_json = dumps_models(chunks)
+        st.download_button(
+            "RAG Chunks (JSON)",
+            chunks_json,
+            f"{source_name}_chunks.json",
+            mime="application/json",
+            use_container_width=True,
+        )
+
+    with col_dl2:
+        st.download_button(
+            "Full Text",
+            result["full_text"],
+            f"{source_name}.md",
+            mime="text/markdown",
+            use_container_width=True,
+        )
+
+
 # ------------------------------------------------------------------
 # Main
 # ------------------------------------------------------------------
@@ -106,14 +450,11 @@ def main():
         upload_mode = st.radio("PDF source", ["File path", "Upload"], horizontal=True)
 
         pdf_path = None
+        source = None
         if upload_mode == "Upload":
             uploaded = st.file_uploader("Upload PDF", type=["pdf"])
             if uploaded:
-                # 임시 저장
-                tmp_path = Path("data") / uploaded.name
-                tmp_path.parent.mkdir(parents=True, exist_ok=True)
-                tmp_path.write_bytes(uploaded.read())
-                pdf_path = str(tmp_path)
+                source = load_upload_source(uploaded.file_id, uploaded)
         else:
             pdf_path = st.text_input("PDF file path", value="")
             # data 폴더 내 PDF 자동 탐색
@@ -128,15 +469,19 @@ def main():
                     if selected != "(manual input)":
                         pdf_path = selected
 
-        if not pdf_path or not Path(pdf_path).exists():
+            if pdf_path and Path(pdf_path).exists():
+                source = load_path_source(pdf_path, Path(pdf_path).stat().st_mtime_ns)
+
+        if source is None:
             st.info("PDF file path or upload a file to start.")
             return
 
-        doc = load_pdf(pdf_path)
-        total_pages = len(doc)
+        doc_pool = get_doc_pool()
+        with doc_pool.document(source) as doc:
+            total_pages = len(doc)
 
         st.markdown(f"**Pages**: {total_pages}")
-        st.markdown(f"**File**: {Path(pdf_path).name}")
+        st.markdown(f"**File**: {source.name}")
 
         st.divider()
         mode = st.radio(
@@ -150,22 +495,60 @@ def main():
 
         st.divider()
         zoom = st.slider("Zoom", 1.0, 3.0, 2.0, 0.5)
+        image_format = st.selectbox(
+            "Image format", IMAGE_FORMATS, index=0,
+            help="jpeg/webp는 png보다 인코딩이 빠르고 전송량이 작음",
+        )
+        prefetch_window = st.slider(
+            "Prefetch pages", 0, 5, 2,
+            help="현재 페이지 앞뒤 N 페이지를 백그라운드에서 미리 렌더링/추출",
+        )
+        inspect = st.toggle(
+            "Inspect elements",
+            help="요소 bbox를 페이지 위에 표시. 선택한 요소는 그 영역만 고배율로 렌더링",
+        )
+        clip_zoom = st.slider("Element zoom", 2.0, 8.0, 4.0, 0.5, disabled=not inspect)
 
         st.divider()
+        page_spec = st.text_input(
+            "Pages", placeholder="all (e.g. 1-10,15)",
+            help="추출할 페이지 범위. 비워 두면 전체",
+        )
         extract_all_btn = st.button(
-            "Extract All Pages", type="primary", use_container_width=True
+            "Extract Pages" if page_spec.strip() else "Extract All Pages",
+            type="primary", use_container_width=True,
         )
 
     # --- Main area: side-by-side ---
     col_pdf, col_parsed = st.columns([1, 1], gap="medium")
     page_idx = page_num - 1
+    is_langchain = mode.startswith("LangChain")
+
+    page_cache = get_page_cache()
+    render_cache = get_render_cache()
+    tasks = page_tasks(source, page_idx, is_langchain)
+    hits: list[bool] = []
+
+    def cached(task):
+        key, fn, args = task
+        value, hit = page_cache.get(key, fn, *args)
+        hits.append(hit)
+        return value
 
     with col_pdf:
         st.subheader(f"PDF - Page {page_num}/{total_pages}")
-        img_bytes = render_page(pdf_path, page_idx, zoom)
-        st.image(img_bytes, use_container_width=True)
-
-    is_langchain = mode.startswith("LangChain")
+        cache_status = st.empty()
+        img_bytes, tier = render_cache.get(source, page_idx, zoom, image_format)
+        hits.append(tier != "render")
+        if inspect:
+            show_inspector(
+                render_cache, source, page_idx, img_bytes,
+                page_elements(page_num, is_langchain, tasks, cached),
+                clip_zoom, image_format,
+            )
+        else:
+            st.image(img_bytes, use_container_width=True)
+        show_page_strip(render_cache, source, page_num, total_pages)
 
     with col_parsed:
         st.subheader("Extracted")
@@ -175,176 +558,88 @@ def main():
             [first_tab, "Raw Text", "Tables", "Images"]
         )
 
+        if is_langchain:
+            lc_text = cached(tasks[0])
+            tables = [
+                pd.DataFrame(t["rows"], columns=t["headers"]) for t in cached(tasks[1])
+            ]
+        else:
+            page_result = cached(tasks[0])
+            tables = [pd.DataFrame(t.rows, columns=t.headers) for t in page_result.tables]
+
         with tab_md:
             if is_langchain:
-                lc_text = extract_page_pypdf(pdf_path, page_idx)
                 st.text_area("PyPDFLoader", lc_text, height=600, label_visibility="collapsed")
             else:
-                md_text = extract_page_markdown(pdf_path, page_idx)
-                st.markdown(md_text)
+                st.markdown(page_result.markdown)
 
         with tab_raw:
-            page = doc[page_idx]
-            raw_text = page.get_text()
+            with doc_pool.document(source) as doc:
+                raw_text = doc[page_idx].get_text()
             st.text_area("Raw Text", raw_text, height=600, label_visibility="collapsed")
 
         with tab_tables:
-            tables = extract_page_tables(pdf_path, page_idx)
             if tables:
-                for idx, t in enumerate(tables):
+                for idx, df in enumerate(tables):
                     st.markdown(f"**Table {idx + 1}**")
-                    df = pd.DataFrame(t["rows"], columns=t["headers"])
                     st.dataframe(df, use_container_width=True)
             else:
                 st.info("No tables on this page.")
 
         with tab_images:
-            page_obj = doc[page_idx]
-            img_list = page_obj.get_images()
-            shown = 0
-            for img_idx, img in enumerate(img_list):
-                xref = img[0]
-                try:
-                    base_img = doc.extract_image(xref)
-                except Exception:
-                    continue
-                if base_img and base_img["width"] > 50 and base_img["height"] > 50:
-                    st.image(
-                        base_img["image"],
-                        caption=f"Image {img_idx + 1} ({base_img['width']}x{base_img['height']})",
-                    )
-                    shown += 1
-            if shown == 0:
+            images = cached(tasks[-1])
+            for img in images:
+                st.image(
+                    img["image"],
+                    caption=f"Image {img['index'] + 1} ({img['width']}x{img['height']})",
+                )
+            if not images:
                 st.info("No significant images on this page.")
 
-    # --- Full extraction ---
-    if extract_all_btn:
-        st.divider()
-        st.subheader("Full Extraction")
-
-        source_name = Path(pdf_path).stem
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        log_area = st.empty()
-
-        if is_langchain:
-            # ============================================================
-            # LangChain Mode: PyPDFLoader + RecursiveCharacterTextSplitter
-            # ============================================================
-            from langchain_community.document_loaders import PyPDFLoader
-            from langchain_text_splitters import RecursiveCharacterTextSplitter
-
-            status_text.markdown("**PyPDFLoader - loading...**")
-            loader = PyPDFLoader(pdf_path)
-            docs = loader.load()
-            progress_bar.progress(0.5)
-
-            log_lines = []
-            for doc_item in docs:
-                pg = doc_item.metadata.get("page", 0) + 1
-                log_lines.append(f"Page {pg:2d}: {len(doc_item.page_content)} chars")
-            log_area.code("\n".join(log_lines), language=None)
-
-            status_text.markdown("**RecursiveCharacterTextSplitter - chunking...**")
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-            )
-            split_docs = splitter.split_documents(docs)
-
-            chunks = []
-            for i, sd in enumerate(split_docs):
-                chunks.append(Chunk(
-                    id=hashlib.md5(f"{source_name}_{i}".encode()).hexdigest()[:12],
-                    content=sd.page_content,
-                    metadata=sd.metadata,
-                    token_count=max(1, len(sd.page_content) // 2),
-                ))
+    if all(hits):
+        cache_status.caption("⚡ cache hit")
+    else:
+        cache_status.caption(f"extracted ({hits.count(True)}/{len(hits)} cached)")
 
-            progress_bar.progress(1.0)
-            st.success(f"Done! {len(docs)} pages, {len(chunks)} chunks (LangChain)")
+    if prefetch_window:
+        schedule_prefetch(
+            page_cache, render_cache, source, page_idx, total_pages,
+            prefetch_window, zoom, image_format, is_langchain,
+        )
 
-            full_text = "\n\n---\n\n".join(d.page_content for d in docs)
-            sections = []
+    with st.sidebar.expander("Render cache"):
+        show_render_cache_stats(render_cache)
 
+    # --- Full extraction (백그라운드 작업) ---
+    job: BackgroundJob | None = st.session_state.get("extract_job")
+    if extract_all_btn and not (job and job.running):
+        try:
+            if page_spec.strip():
+                pages = parse_page_ranges(page_spec, total_pages)
+            else:
+                pages = list(range(total_pages))
+        except ValueError as e:
+            st.sidebar.error(str(e))
         else:
-            # ============================================================
-            # Custom Mode: pymupdf4llm + pdfplumber + StructureParser
-            # ============================================================
-            extractor = PDFExtractor(pdf_path)
-            all_results = []
-            log_lines = []
-
-            for pi in range(extractor.total_pages):
-                result = extractor.extract_page(pi)
-                all_results.append(result)
-
-                pct = (pi + 1) / extractor.total_pages
-                progress_bar.progress(pct)
-                status_text.markdown(
-                    f"**[{pi + 1}/{extractor.total_pages}]** "
-                    f"Page {result.page_number} - "
-                    f"tables: {len(result.tables)}, images: {len(result.images)}"
-                )
-                log_lines.append(
-                    f"Page {result.page_number:2d}: tables {len(result.tables)}, images {len(result.images)}"
-                )
-                log_area.code("\n".join(log_lines), language=None)
-
-            extractor.close()
-
-            # 구조 파싱 + 청킹
-            status_text.markdown("**Parsing structure & chunking...**")
-            struct_parser = StructureParser(pdf_path)
-            sections = struct_parser.parse(all_results)
-
-            chunker = PDFChunker()
-            if sections:
-                chunks = chunker.chunk_by_sections(sections, all_results, source=source_name)
+            if is_langchain:
+                job = BackgroundJob(run_langchain_extraction, source, pages, name=source.key)
             else:
-                chunks = chunker.chunk_by_pages(all_results, source=source_name)
-
-            progress_bar.progress(1.0)
-            st.success(f"Done! {len(sections)} sections, {len(chunks)} chunks")
-
-            full_text = "\n\n---\n\n".join(r.markdown for r in all_results)
-
-        # 섹션 요약 (Custom 모드만)
-        if sections:
-            st.subheader("Document Structure")
-            for sec in sections:
-                indent = "--" * (sec.level - 1)
-                label = f"{indent} {sec.title} (p.{sec.start_page}-{sec.end_page})"
-                with st.expander(label):
-                    display = sec.content[:500] + "..." if len(sec.content) > 500 else sec.content
-                    st.text(display)
-
-        # 다운로드
-        st.subheader("Export")
-        col_dl1, col_dl2 = st.columns(2)
-
-        with col_dl1:
-            chunks_json = json.dumps(
-                [c.model_dump() for c in chunks],
-                ensure_ascii=False,
-                indent=2,
-            )
-            st.download_button(
-                "RAG Chunks (JSON)",
-                chunks_json,
-                f"{source_name}_chunks.json",
-                mime="application/json",
-                use_container_width=True,
-            )
+                job = BackgroundJob(
+                    run_custom_extraction, page_cache, source, pages, name=source.key
+                )
+            st.session_state["extract_job"] = job.start()
 
-        with col_dl2:
-            st.download_button(
-                "Full Text",
-                full_text,
-                f"{source_name}.md",
-                mime="text/markdown",
-                use_container_width=True,
-            )
+    if job and job.name == source.key:
+        st.divider()
+        st.subheader("Full Extraction")
+        if not job.done:
+            show_job_progress(job)
+        elif job.error:
+            st.error(f"Extraction failed: {job.error}")
+        elif job.cancelled:
+            st.warning("Extraction cancelled.")
+        else:
+            show_extraction_result(job.result, source.stem)
 
 
 if __name__ == "__main__":
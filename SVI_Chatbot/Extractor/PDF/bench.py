@@ -0,0 +1,979 @@
+"""
+추출 파이프라인 벤치마크
+
+Usage:
+    python bench.py splitter
+    python bench.py splitter --pdf data/sample.pdf --chunk-size 500
+    python bench.py memory --pages 1000
+    python bench.py serialize --pages 1000
+    python bench.py docpool
+    python bench.py docpool data/sample.pdf --threads 16
+    python bench.py pipeline data/sample.pdf
+    python bench.py pipeline data/sample.pdf --pages 10-20,25
+    python bench.py pipeline data/sample.pdf --lengths 20,400
+    python bench.py startup --pdf data/sample.pdf
+    python bench.py layout data/sample.pdf
+    python bench.py service data/sample.pdf --jobs 4
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+
+# 기존 LangChain 경로에서 쓰던 구분자 (비교 기준)
+_LANGCHAIN_SEPARATORS = [
+    "\n\n", "\n", " ", ".", ",",
+    "\u200b", "\uff0c", "\u3001", "\uff0e", "\u3002", "",
+]
+
+_SAMPLE_SENTENCES = [
+    "사회적가치지표(SVI)는 사회적경제기업의 사회적 가치 창출 성과를 측정하는 도구이다.",
+    "평가 결과는 기업의 경영 개선과 정책 지원의 기초 자료로 활용된다.",
+    "측정 지표는 사회적 성과, 경제적 성과, 혁신 성과의 세 영역으로 구성됩니다.",
+    "각 지표는 정량 지표와 정성 지표로 구분하며, 배점은 영역별로 다르다.",
+    "자세한 산식은 부록을 참고하시기 바랍니다\u3002",
+    "취약계층 고용 비율\uff0c지역사회 재투자 비율 등이 포함된다.",
+]
+
+
+def _synthetic_text(n_chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts: list[str] = []
+    size = 0
+    while size < n_chars:
+        para = " ".join(rng.choice(_SAMPLE_SENTENCES) for _ in range(rng.randint(1, 8)))
+        if rng.random() < 0.3:
+            para = "\n".join(para.split(" ", 3))
+        parts.append(para)
+        size += len(para) + 2
+    return "\n\n".join(parts)
+
+
+def _load_texts(args) -> list[str]:
+    if args.pdf:
+        import pymupdf
+        with pymupdf.open(args.pdf) as doc:
+            return [page.get_text() for page in doc]
+    return [_synthetic_text(args.chars, seed=i) for i in range(args.docs)]
+
+
+def _timeit(fn, texts: list[str], repeat: int) -> tuple[float, list[list[str]]]:
+    best = float("inf")
+    out: list[list[str]] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _check_spans(text: str, spans: list[tuple[int, int]], chunk_size: int, chunk_overlap: int) -> list[str]:
+    """분할 결과 검증: 크기 제한, 이웃 청크 겹침 ≤ chunk_overlap, 앞으로만 진행, 공백 외 모든 문자 포함."""
+    errors: list[str] = []
+    covered = bytearray(len(text))
+    prev = None
+    for start, end in spans:
+        if end - start > chunk_size:
+            errors.append(f"span ({start}, {end}) exceeds chunk_size")
+        if prev is not None:
+            if start <= prev[0] or end <= prev[1]:
+                errors.append(f"span ({start}, {end}) does not advance past {prev}")
+            elif prev[1] - start > chunk_overlap:
+                errors.append(f"span ({start}, {end}) overlaps {prev} by {prev[1] - start} > chunk_overlap")
+        covered[start:end] = b"\x01" * (end - start)
+        prev = (start, end)
+    missing = sum(1 for i, ch in enumerate(text) if not covered[i] and not ch.isspace())
+    if missing:
+        errors.append(f"{missing} non-space chars not covered")
+    return errors
+
+
+def _check_chunk_offsets(text: str, chunker) -> list[str]:
+    """섹션 청크의 char_start/char_end가 (표 제거, strip한) 섹션 본문에서 청크 내용을 그대로 가리키는지."""
+    from src.models import Section
+
+    section = Section(title="bench", content=text, start_page=1, end_page=1)
+    body = text.strip()
+    errors = []
+    for chunk in chunker._section_chunks(0, section, "bench", []):
+        meta = chunk.metadata
+        if "char_start" not in meta:
+            if chunk.content != body:
+                errors.append("single chunk is not the whole section")
+        elif body[meta["char_start"]:meta["char_end"]] != chunk.content:
+            errors.append(f"chunk ({meta['char_start']}, {meta['char_end']}) does not slice back to its content")
+    return errors
+
+
+def _boundary_level(text: str, levels: list[list[int]], pos: int) -> int:
+    """pos(앞뒤 공백을 뺀 청크 끝)가 어느 경계 레벨인지. 텍스트 끝 -1, 경계 아님(강제 분할) len(levels)."""
+    from bisect import bisect_left
+
+    if not text[pos:].strip():
+        return -1
+    for lv, cuts in enumerate(levels):
+        i = bisect_left(cuts, pos)
+        if i < len(cuts) and not text[pos:cuts[i]].strip():
+            return lv
+    return len(levels)
+
+
+def _compare_with_langchain(
+    text: str, spans: list[tuple[int, int]], lc_spans: dict[int, int], chunk_size: int
+) -> tuple[Counter, list[str]]:
+    """같은 위치에서 시작하는 청크의 끝이 다르면 KoreanTextSplitter docstring의 원인 중 하나인지 분류.
+    반환: (원인별 개수, 설명되지 않는 차이 목록)."""
+    from src.chunker import _BOUNDARY_PATTERNS
+
+    levels = [[m.end() for m in p.finditer(text)] for p in _BOUNDARY_PATTERNS]
+    reasons: Counter = Counter()
+    errors = []
+    prev_end = 0
+    for start, end in spans:
+        lc_end = lc_spans.get(start)
+        if lc_end is not None and lc_end != end:
+            ours, theirs = _boundary_level(text, levels, end), _boundary_level(text, levels, lc_end)
+            after = len(text) - len(text[lc_end:].lstrip())  # lc_end 뒤 구분자 공백까지
+            if ours <= theirs:
+                reasons["equal or higher-priority boundary"] += 1
+            elif lc_end <= prev_end:
+                reasons["langchain chunk inside previous chunk"] += 1
+            elif lc_end - start <= chunk_size < after - start:
+                reasons["separator straddles chunk_size"] += 1
+            else:
+                errors.append(f"chunk at {start}: ends at level {ours} ({end}), langchain level {theirs} ({lc_end})")
+        prev_end = end
+    return reasons, errors
+
+
+def bench_splitter(args):
+    """네이티브 분할기 vs RecursiveCharacterTextSplitter 속도 + 분할 규칙 검사 (위반 시 종료 코드 1)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from src.chunker import KoreanTextSplitter, PDFChunker
+
+    texts = _load_texts(args)
+    total_chars = sum(len(t) for t in texts)
+    print(f"Texts: {len(texts)}, chars: {total_chars:,}")
+    print(f"chunk_size={args.chunk_size}, chunk_overlap={args.chunk_overlap}")
+    print()
+
+    lc = RecursiveCharacterTextSplitter(
+        separators=_LANGCHAIN_SEPARATORS,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=len,
+    )
+    native = KoreanTextSplitter(args.chunk_size, args.chunk_overlap)
+
+    lc_time, lc_out = _timeit(lc.split_text, texts, args.repeat)
+    native_time, native_out = _timeit(native.split_text, texts, args.repeat)
+
+    # 검증
+    lc_indexed = RecursiveCharacterTextSplitter(
+        separators=_LANGCHAIN_SEPARATORS,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=len,
+        add_start_index=True,
+    )
+    chunker = PDFChunker(args.chunk_size, args.chunk_overlap)
+    errors: list[str] = []
+    reasons: Counter = Counter()
+    for text in texts:
+        spans = native.split_spans(text)
+        errors += _check_spans(text, spans, args.chunk_size, args.chunk_overlap)
+        errors += _check_chunk_offsets(text, chunker)
+        lc_spans = {
+            d.metadata["start_index"]: d.metadata["start_index"] + len(d.page_content)
+            for d in lc_indexed.create_documents([text])
+        }
+        found, errs = _compare_with_langchain(text, spans, lc_spans, args.chunk_size)
+        reasons += found
+        errors += errs
+    lc_chunks = sum(len(c) for c in lc_out)
+    native_chunks = sum(len(c) for c in native_out)
+    same = sum(len(set(a) & set(b)) for a, b in zip(lc_out, native_out))
+
+    print(f"{'splitter':<12} {'time(s)':>10} {'MB/s':>8} {'chunks':>8}")
+    for name, t, n in [("langchain", lc_time, lc_chunks), ("native", native_time, native_chunks)]:
+        mbps = total_chars / t / 1e6 if t else 0.0
+        print(f"{name:<12} {t:>10.4f} {mbps:>8.2f} {n:>8}")
+    print()
+    print(f"Speedup: {lc_time / native_time:.1f}x")
+    print(f"Identical chunks: {same}/{lc_chunks}")
+    for reason, n in reasons.most_common():
+        print(f"  different end from the same start - {reason}: {n}")
+    if errors:
+        print(f"Validation FAILED ({len(errors)}):")
+        for e in errors[:10]:
+            print(f"  {e}")
+        sys.exit(1)
+    print("Validation OK (size limit, overlap limit, char offsets, full coverage, LangChain differences explained)")
+
+
+def _synthetic_pdf(n_pages: int) -> bytes:
+    """헤딩 1줄 + 한국어 본문 문단으로 된 합성 PDF."""
+    import pymupdf
+
+    doc = pymupdf.open()
+    for i in range(n_pages):
+        page = doc.new_page()
+        page.insert_text((50, 60), f"{i + 1}. 지표 설명", fontname="korea", fontsize=16)
+        page.insert_textbox(
+            pymupdf.Rect(50, 80, 545, 800), _synthetic_text(2000, seed=i),
+            fontname="korea", fontsize=8,
+        )
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _synthetic_table(page_index: int):
+    from src.models import TableData
+
+    return TableData(
+        headers=["지표", "배점", "비고"],
+        rows=[[f"지표 {i}", str(i), "정량"] for i in range(20)],
+        page=page_index + 1,
+    )
+
+
+class _StubBackends:
+    """pymupdf4llm/pdfplumber 출력만 대체 (PDFExtractor의 나머지 경로는 실제 코드).
+
+    Markdown은 페이지 텍스트에 헤딩 표시를 붙인 것, 테이블은 5페이지마다 1개.
+    """
+
+    def __enter__(self):
+        import pymupdf4llm
+        from src.extractor import PDFExtractor
+
+        def to_markdown(doc, pages, **kwargs):
+            text = doc[pages[0]].get_text()
+            return "## " + text.replace("\n\n", "\n\n\n", 1)
+
+        def extract_tables(extractor, page_index):
+            return [_synthetic_table(page_index)] if page_index % 5 == 0 else []
+
+        self._saved = [
+            (pymupdf4llm, "to_markdown", pymupdf4llm.to_markdown),
+            (PDFExtractor, "_extract_tables", PDFExtractor._extract_tables),
+        ]
+        pymupdf4llm.to_markdown = to_markdown
+        PDFExtractor._extract_tables = extract_tables
+        return self
+
+    def __exit__(self, *exc):
+        for obj, name, value in self._saved:
+            setattr(obj, name, value)
+
+
+def _extract_synthetic(data: bytes, output_dir: str, compact: bool) -> list:
+    """합성 PDF를 PDFExtractor(compact)로 추출 (백엔드 출력만 stub)."""
+    from src.extractor import PDFExtractor
+
+    with _StubBackends():
+        extractor = PDFExtractor(data, output_dir, compact=compact)
+        try:
+            return extractor.extract_all()
+        finally:
+            extractor.close()
+
+
+def bench_memory(args):
+    from src.chunker import PDFChunker
+
+    data = _synthetic_pdf(args.pages)
+    print(f"Synthetic document: {args.pages} pages (PDFExtractor, pymupdf4llm/pdfplumber outputs stubbed)")
+    print()
+    print(f"{'mode':<10} {'pages(MB)':>10} {'peak(MB)':>10} {'chunks':>8}")
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("full", "compact"):
+            tracemalloc.start()
+            pages = _extract_synthetic(data, tmp, compact=(mode == "compact"))
+            pages_mem = tracemalloc.get_traced_memory()[0]
+            chunks = PDFChunker().chunk_by_pages(pages, source="synthetic")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            peaks[mode] = peak
+            print(f"{mode:<10} {pages_mem / 1e6:>10.1f} {peak / 1e6:>10.1f} {len(chunks):>8}")
+            del pages, chunks
+    print()
+    print(f"Peak reduction: {(1 - peaks['compact'] / peaks['full']) * 100:.0f}%")
+
+
+def bench_serialize(args):
+    from src import serializer
+    from src.chunker import PDFChunker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = _extract_synthetic(_synthetic_pdf(args.pages), tmp, compact=True)
+    chunks = PDFChunker().chunk_by_pages(pages, source="synthetic")
+    print(f"Chunks: {len(chunks)} (orjson: {'yes' if serializer.orjson else 'no'})")
+    print()
+
+    def legacy(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([c.model_dump() for c in chunks], f, ensure_ascii=False, indent=2)
+
+    def pydantic_only(path):
+        backend, serializer.orjson = serializer.orjson, None
+        try:
+            serializer.dump_models(chunks, path)
+        finally:
+            serializer.orjson = backend
+
+    cases = [
+        ("json.dump indent=2", legacy),
+        ("pydantic compact", pydantic_only),
+        ("serializer compact", lambda path: serializer.dump_models(chunks, path)),
+        ("serializer pretty", lambda path: serializer.dump_models(chunks, path, pretty=True)),
+    ]
+    print(f"{'path':<20} {'time(s)':>10} {'size(MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chunks.json")
+        for name, fn in cases:
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                fn(path)
+                best = min(best, time.perf_counter() - t0)
+            with open(path, encoding="utf-8") as f:
+                assert len(json.load(f)) == len(chunks)
+            print(f"{name:<20} {best:>10.4f} {os.path.getsize(path) / 1e6:>10.2f}")
+
+
+def bench_docpool(args):
+    """여러 스레드가 동시에 텍스트/이미지/렌더를 요청하는 스트레스 테스트 (점검 실패 시 종료 코드 1).
+
+    풀 점검: 핸들은 한 번에 한 스레드만 사용, 파일별 동시 핸들 ≤ max_handles, 닫힌 핸들을
+    내주지 않음, close_file 이전에 빌려 간 핸들은 반납 시 닫힘(세대), 유휴 핸들 정리 후 항목 제거.
+    """
+    import pymupdf
+    from src.doc_pool import DocumentPool
+    from src.pdf_source import PDFSource, as_source
+
+    # 파일 2개 (풀 키가 다른 두 문서): 주어진 PDF(없으면 합성) + 메모리 버퍼
+    sources = [
+        args.pdf or PDFSource(_synthetic_pdf(5), name="synthetic.pdf"),
+        PDFSource(_synthetic_pdf(3), name="memory.pdf"),
+    ]
+    page_counts = []
+    for src in sources:
+        with as_source(src).open_pymupdf() as doc:
+            page_counts.append(len(doc))
+
+    def work(doc, rng, total_pages):
+        page = doc[rng.randrange(total_pages)]
+        page.get_text()
+        for img in page.get_images()[:1]:
+            doc.extract_image(img[0])
+        page.get_pixmap(matrix=pymupdf.Matrix(0.5, 0.5))
+
+    def run(name, worker):
+        errors: list[BaseException] = []
+        def loop(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(args.ops):
+                    worker(rng)
+            except BaseException as e:
+                errors.append(e)
+        threads = [threading.Thread(target=loop, args=(i,)) for i in range(args.threads)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        ops = args.threads * args.ops
+        print(f"{name:<14} {elapsed:>8.2f}s {ops / elapsed:>8.1f} ops/s  errors: {len(errors)}")
+        return errors
+
+    print(f"{args.threads} threads x {args.ops} ops, 2 files ({page_counts[0]} + {page_counts[1]} pages)")
+    print()
+
+    # 기존 방식: 전역 핸들 1개 + 락 (락 없이 공유하면 크래시 가능)
+    shared = [as_source(src).open_pymupdf() for src in sources]
+    lock = threading.Lock()
+    def single(rng):
+        i = rng.randrange(len(sources))
+        with lock:
+            work(shared[i], rng, page_counts[i])
+    run("single+lock", single)
+    for doc in shared:
+        doc.close()
+
+    pool = DocumentPool(max_per_file=args.max_handles, idle_seconds=args.idle_seconds)
+    failures: list[str] = []
+    state = threading.Lock()
+    in_use: set[int] = set()
+    held = [0] * len(sources)
+    peak = [0] * len(sources)
+    replaced = [0]  # close_file 횟수 (파일 교체 스레드)
+    order = threading.Lock()  # checkout과 close_file 순서를 기록하기 위한 직렬화
+    stale_closed = [0]
+
+    def pooled(rng):
+        i = rng.randrange(len(sources))
+        with order:
+            doc = pool.checkout(sources[i])
+            seen = replaced[0]
+        try:
+            with state:
+                if doc.is_closed:
+                    failures.append("checked out a closed handle")
+                if id(doc) in in_use:
+                    failures.append("handle checked out by two threads at once")
+                in_use.add(id(doc))
+                held[i] += 1
+                peak[i] = max(peak[i], held[i])
+                if held[i] > args.max_handles:
+                    failures.append(f"file {i}: {held[i]} handles in use (limit {args.max_handles})")
+            work(doc, rng, page_counts[i])
+            time.sleep(0.002)  # GIL을 놓고 핸들을 잡고 있어 스레드들이 실제로 겹치도록
+        finally:
+            with state:
+                in_use.discard(id(doc))
+                held[i] -= 1
+            pool.checkin(sources[i], doc)
+        if i == 0 and replaced[0] != seen:
+            stale_closed[0] += 1
+            if not doc.is_closed:
+                failures.append("handle checked out before close_file was not closed on checkin")
+
+    stop = threading.Event()
+    def replacer():
+        while not stop.wait(0.05):
+            with order:
+                pool.close_file(sources[0])
+                replaced[0] += 1
+    rt = threading.Thread(target=replacer)
+    rt.start()
+    errors = run("pool+checks", pooled)
+    stop.set()
+    rt.join()
+    failures += [f"{type(e).__name__}: {e}" for e in errors]
+
+    # 유휴 정리: idle_seconds가 지나면 다음 checkout/checkin 때 닫히고, 빈 파일 항목은 제거
+    time.sleep(args.idle_seconds * 1.5)
+    with pool.document(sources[1]):
+        stats = pool.stats()
+    if len(stats) != 1 or next(iter(stats.values()))["open"] != 1:
+        failures.append(f"idle eviction: expected only the file in use with 1 handle, got {stats}")
+    pool.close()
+    if pool.stats():
+        failures.append(f"close(): entries left {pool.stats()}")
+
+    # 점검 대상 경로가 실제로 실행됐는지
+    if max(peak) < args.max_handles:
+        failures.append(f"handle limit never reached (peak {peak}) - not enough contention")
+    if not stale_closed[0]:
+        failures.append("no handle was checked out across close_file - generations not exercised")
+
+    print()
+    print(f"Peak handles in use: {peak} (limit {args.max_handles}), close_file x{replaced[0]},"
+          f" {stale_closed[0]} stale handles closed on checkin")
+    if failures:
+        print(f"Validation FAILED ({len(failures)}):")
+        for f in failures[:10]:
+            print(f"  {f}")
+        sys.exit(1)
+    print("Validation OK (exclusive use, handle limit, generations, idle eviction)")
+
+
+def _first_chunk(source, output_dir: str) -> tuple[float, int]:
+    """stream_chunks의 첫 청크까지 시간(s)과 그때까지 추출한 페이지 수."""
+    from src.pipeline import stream_chunks
+
+    extracted = []
+    t0 = time.perf_counter()
+    chunks = stream_chunks(source, output_dir, progress_callback=lambda n, total, result: extracted.append(n))
+    next(chunks, None)
+    elapsed = time.perf_counter() - t0
+    chunks.close()
+    return elapsed, len(extracted)
+
+
+def bench_pipeline(args):
+    """단계별 일괄 처리 vs 페이지 단위 파이프라인: 첫 청크까지 시간, 전체 시간, 결과 동일성.
+
+    페이지 범위 추출 청크 id가 전체 추출 id와 맞는지도 확인한다 (같은 id = 같은 내용).
+    구조가 같고 길이만 다른 합성 문서(--lengths)로 첫 청크까지 시간이 문서 길이에
+    비례하지 않는지 본다 (cold: 폰트 통계 캐시 비움, cached: 같은 문서 재실행).
+    """
+    from src import layout
+    from src.chunker import PDFChunker
+    from src.document import parse_page_ranges
+    from src.extractor import PDFExtractor
+    from src.pdf_source import PDFSource
+    from src.pipeline import stream_chunks
+    from src.structure_parser import StructureParser
+
+    source = PDFSource(args.pdf)
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        extractor = PDFExtractor(source, tmp, compact=True)
+        results = extractor.extract_all()
+        extractor.close()
+        sections = StructureParser(source).parse(results)
+        batch = PDFChunker().chunk_by_sections(sections, results, source=source.stem)
+        batch_total = time.perf_counter() - t0  # 일괄 처리는 끝나야 첫 청크가 나온다
+        del results
+
+        t0 = time.perf_counter()
+        first = None
+        streamed = []
+        for chunk in stream_chunks(source, tmp):
+            if first is None:
+                first = time.perf_counter() - t0
+            streamed.append(chunk)
+        stream_total = time.perf_counter() - t0
+
+        with source.open_pymupdf() as doc:
+            n_pages = len(doc)
+        spec = args.pages or f"{n_pages // 3 + 1}-{2 * n_pages // 3}"
+        cut: set[tuple[str, int]] = set()
+
+        def on_section(section):
+            # 범위 경계에서 잘린 섹션 (키에 @p/~p 표시) - 전체 추출과 내용이 다르므로 새 id
+            if "@" in section.key or "~" in section.key:
+                cut.add((section.title, section.start_page))
+
+        ranged = list(stream_chunks(source, tmp, pages=parse_page_ranges(spec, n_pages), on_section=on_section))
+
+    print(f"{source.name}: {len(batch)} chunks")
+    print()
+    print(f"{'mode':<10} {'first chunk(s)':>15} {'total(s)':>10}")
+    print(f"{'batch':<10} {batch_total:>15.2f} {batch_total:>10.2f}")
+    print(f"{'pipeline':<10} {first or 0.0:>15.2f} {stream_total:>10.2f}")
+    print()
+    same = {(c.id, c.content) for c in batch} == {(c.id, c.content) for c in streamed}
+    print(f"Same chunks (id, content): {'yes' if same else 'NO'} ({len(batch)} vs {len(streamed)})")
+
+    full = {c.id: c.content for c in batch}
+    shared = [c for c in ranged if c.id in full]
+    differs = [c for c in shared if full[c.id] != c.content]
+    new = [c for c in ranged if c.id not in full]
+    unexpected = [
+        c for c in new
+        if (c.metadata.get("section_title"), c.metadata.get("start_page")) not in cut
+    ]
+    print(f"\nPages {spec}: {len(ranged)} chunks, {len(shared)} ids shared with full run, "
+          f"{len(new)} new from {len(cut)} boundary-cut section(s)")
+    ok = not differs and not unexpected and len({c.id for c in ranged}) == len(ranged)
+    print(f"Range ids consistent: {'yes' if ok else 'NO'}"
+          f" (same id with different content: {len(differs)}, new id outside cut sections: {len(unexpected)})")
+
+    documents = [
+        PDFSource(_synthetic_pdf(int(n)), name=f"synthetic-{n}p.pdf") for n in args.lengths.split(",")
+    ]
+    documents.append(source)
+    print("\nTime to first chunk by document length")
+    print(f"{'document':<28} {'pages':>6} {'cold(s)':>8} {'cached(s)':>10} {'pages read':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for doc_source in documents:
+            with doc_source.open_pymupdf() as doc:
+                n_pages = len(doc)
+            layout._stats_cache.clear()
+            cold, extracted = _first_chunk(doc_source, tmp)
+            cached, _ = _first_chunk(doc_source, tmp)
+            print(f"{doc_source.name[:28]:<28} {n_pages:>6} {cold:>8.2f} {cached:>10.2f} {extracted:>11}")
+
+    if not same or not ok:
+        sys.exit(1)
+
+
+def _importtime(argv: list[str]) -> dict[str, int]:
+    """python -X importtime 출력 → 최상위 모듈별 누적 import 시간(us)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        capture_output=True, text=True,
+    )
+    totals: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):  # 최상위 import만
+            totals[name.strip()] = int(cumulative)
+    return totals
+
+
+def bench_startup(args):
+    """CLI 콜드 스타트: 실행 시간(중앙값) + 무거운 top-level import."""
+    cases = [
+        ("extract.py --help", ["extract.py", "--help"]),
+        ("watch.py --help", ["watch.py", "--help"]),
+        ("import src.pipeline", ["-c", "import src.pipeline"]),
+        ("import pymupdf4llm", ["-c", "import pymupdf4llm"]),
+    ]
+    if args.pdf:
+        tmp = tempfile.mkdtemp()
+        cases.append((
+            "extract.py --format markdown",
+            ["extract.py", args.pdf, "--format", "markdown", "--pages", "1", "--output-dir", tmp],
+        ))
+
+    print(f"{'command':<30} {'median(s)':>10} {'min(s)':>8}")
+    for name, argv in cases:
+        times = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, *argv], capture_output=True, check=True)
+            times.append(time.perf_counter() - t0)
+        print(f"{name:<30} {statistics.median(times):>10.3f} {min(times):>8.3f}")
+
+    print()
+    print("Top-level imports (-X importtime, cumulative ms)")
+    for name, argv in cases[:1] + cases[-1:]:
+        totals = _importtime(argv)
+        top = sorted(totals.items(), key=lambda kv: -kv[1])[: args.top]
+        print(f"  {name}")
+        for module, us in top:
+            print(f"    {module:<32} {us / 1000:>8.1f}")
+
+
+def _loop_headings(page_dicts: list[dict], max_levels: int = 2) -> dict[int, list[tuple[str, int]]] | None:
+    """기존 StructureParser._find_headings의 span 루프 - 비교 기준."""
+    size_chars: dict[float, int] = {}
+    page_spans: list[list[tuple[str, float]]] = []
+    for page_dict in page_dicts:
+        spans: list[tuple[str, float]] = []
+        for block in page_dict["blocks"]:
+            if block["type"] != 0:
+                continue
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    text = span.get("text", "").strip()
+                    if not text or len(text) < 2:
+                        continue
+                    size = round(span.get("size", 0), 1)
+                    size_chars[size] = size_chars.get(size, 0) + len(text)
+                    if not text.isdigit():
+                        spans.append((text, size))
+        page_spans.append(spans)
+    if not size_chars:
+        return None
+    body_size = max(size_chars, key=size_chars.get)
+    heading_sizes = sorted([s for s in size_chars if s > body_size], reverse=True)[:max_levels]
+    if not heading_sizes:
+        return None
+    size_to_level = {s: i + 1 for i, s in enumerate(heading_sizes)}
+    headings: dict[int, list[tuple[str, int]]] = {}
+    for page_idx, spans in enumerate(page_spans):
+        merged: list[tuple[str, float]] = []
+        for text, size in spans:
+            if size not in size_to_level:
+                continue
+            if merged and merged[-1][1] == size and len(merged[-1][0]) < 50:
+                merged[-1] = (merged[-1][0] + " " + text, size)
+            else:
+                merged.append((text, size))
+        if merged:
+            headings[page_idx + 1] = [(text, size_to_level[size]) for text, size in merged]
+    return headings
+
+
+def _loop_text_elements(page_dict: dict) -> list[tuple[str, tuple]]:
+    """기존 PDFExtractor._build_elements의 텍스트 블록 루프 - 비교 기준."""
+    elements = []
+    for block in page_dict["blocks"]:
+        if block["type"] == 0:
+            text = ""
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    text += span.get("text", "")
+                text += "\n"
+            text = text.strip()
+            if text:
+                elements.append((text, tuple(block["bbox"])))
+    return elements
+
+
+def bench_layout(args):
+    """span 루프 vs 배열 기반 레이아웃 분석: 분석 단계만 (같은 dict 입력) + 뷰어 요소 목록 전체."""
+    import pymupdf
+    from src.layout import TEXT_FLAGS, DocumentLayout
+
+    def best(fn, *fn_args):
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = fn(*fn_args)
+            times.append(time.perf_counter() - t0)
+        return min(times), out
+
+    def on_fresh_doc(fn):
+        def run():
+            with pymupdf.open(args.pdf) as doc:  # MuPDF 페이지/폰트 캐시 영향 제거
+                return fn(doc)
+        return run
+
+    with pymupdf.open(args.pdf) as doc:
+        dicts = [page.get_text("dict", flags=TEXT_FLAGS) for page in doc]
+        widths = [page.rect.width for page in doc]
+    pages = len(dicts)
+    spans = sum(
+        len(line["spans"]) for d in dicts for b in d["blocks"] if b["type"] == 0 for line in b["lines"]
+    )
+
+    def layout_headings(layout):
+        if not layout.has_headings:
+            return None
+        found = {p: layout.headings(p) for p in range(1, pages + 1)}
+        return {p: [(h.content, h.level) for h in hs] for p, hs in found.items() if hs}
+
+    def layout_elements(layout):
+        return [layout.page_elements(p) for p in range(1, pages + 1)]
+
+    # 1) 분석만: 같은 dict 입력
+    loop_h_t, loop_h = best(_loop_headings, dicts)
+    arr_h_t, new_h = best(lambda: layout_headings(DocumentLayout(dicts, widths)))
+    loop_e_t, _ = best(lambda: [_loop_text_elements(d) for d in dicts])
+    arr_e_t, _ = best(lambda: layout_elements(DocumentLayout(dicts, widths)))
+
+    # 2) 뷰어 요소 목록 전체 (PDF 읽기 포함). 두 경로 모두 같은 TEXT_FLAGS로 읽고,
+    #    기본 플래그(이미지 포함) 행은 플래그 차이만 따로 보이도록 참고용으로 둔다
+    flags_view_t, _ = best(on_fresh_doc(lambda doc: [_loop_text_elements(p.get_text("dict")) for p in doc]))
+    old_view_t, _ = best(on_fresh_doc(
+        lambda doc: [_loop_text_elements(p.get_text("dict", flags=TEXT_FLAGS)) for p in doc]
+    ))
+    new_view_t, _ = best(on_fresh_doc(lambda doc: layout_elements(DocumentLayout.from_document(doc))))
+
+    print(f"{Path(args.pdf).name}: {pages} pages, {spans:,} spans")
+    print()
+    print(f"{'analysis only (same dict input)':<40} {'time(ms)':>9} {'spans/s':>12}")
+    for name, t in [
+        ("headings: span loops", loop_h_t),
+        ("headings: arrays (+ levels/merge)", arr_h_t),
+        ("text elements: span loops", loop_e_t),
+        ("elements: arrays (+ headings, order)", arr_e_t),
+    ]:
+        print(f"{name:<40} {t * 1000:>9.1f} {spans / t:>12,.0f}")
+    print()
+    print(f"{'viewer elements, all pages (with PDF read)':<40} {'time(s)':>9} {'ms/page':>12}")
+    for name, t in [
+        ("span loops, default flags (reference)", flags_view_t),
+        ("span loops, TEXT_FLAGS", old_view_t),
+        ("DocumentLayout, TEXT_FLAGS", new_view_t),
+    ]:
+        print(f"{name:<40} {t:>9.3f} {t / pages * 1000:>12.1f}")
+    print()
+    print(f"Same headings: {'yes' if new_h == loop_h else 'NO'}")
+
+
+async def _http(
+    port: int, method: str, target: str, body: bytes = b"", content_length: str | None = None
+) -> tuple[int, bytes]:
+    """서비스에 요청 하나 (응답은 연결이 닫힐 때까지 읽음). 반환: (상태 코드, 본문).
+
+    content_length를 주면 본문 길이 대신 그 값을 헤더에 넣는다 (잘못된 헤더 점검용).
+    """
+    import asyncio
+
+    length = len(body) if content_length is None else content_length
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+def _sse_events(payload: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in payload.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def _check_events(events: list[tuple[str, dict]]) -> list[str]:
+    """queued → started → page 1..N (증가) → done, done 뒤 이벤트 없음."""
+    names = [e for e, _ in events]
+    errors = []
+    if names[:2] != ["queued", "started"]:
+        errors.append(f"starts with {names[:2]}")
+    if not names or names[-1] != "done" or names.count("done") != 1:
+        errors.append(f"ends with {names[-1:]} ({names.count('done')} done)")
+    pages = [d["page"] for e, d in events if e == "page"]
+    total = max((d["total"] for e, d in events if e == "page"), default=0)
+    if pages != list(range(1, total + 1)):
+        errors.append(f"page events {pages[:5]}... (total {total})")
+    return errors
+
+
+def bench_service(args):
+    """로컬 추출 서비스 점검: 동시 작업 처리량, SSE 이벤트 순서, 청크 수, 잘못된 요청 → 400/413/429,
+    워커 비정상 종료 후 복구. 점검에 실패하면 종료 코드 1."""
+    import asyncio
+    from src.service import ExtractionService
+
+    data = Path(args.pdf).read_bytes()
+    small = _synthetic_pdf(1)
+
+    async def wait_events(port: int, job_id: str) -> list[tuple[str, dict]]:
+        _, payload = await _http(port, "GET", f"/jobs/{job_id}/events")
+        return _sse_events(payload)
+
+    async def run(tmp: str):
+        service = ExtractionService(
+            workers=args.workers, max_queue=args.jobs, max_upload_bytes=len(data) * 2, output_dir=tmp,
+        )
+        server = await service.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        errors: list[str] = []
+        try:
+            for target, body, length, expected in [
+                ("/jobs?chunk_size=abc", data, None, 400),
+                ("/jobs?priority=1.5", data, None, 400),
+                ("/jobs?chunk_size=500&chunk_overlap=500", data, None, 400),
+                ("/jobs", b"not a pdf", None, 400),
+                ("/jobs", b"", "abc", 400),
+                ("/jobs", b"", "-5", 400),
+                ("/jobs", b"", str(len(data) * 4), 413),
+            ]:
+                status, _ = await _http(port, "POST", target, body, length)
+                if status != expected:
+                    errors.append(f"POST {target} (Content-Length {length}): {status} (expected {expected})")
+
+            t0 = time.perf_counter()
+            submitted = await asyncio.gather(*(
+                _http(port, "POST", f"/jobs?name=job{i}.pdf", data) for i in range(args.jobs)
+            ))
+            ids = [json.loads(body)["job_id"] for _, body in submitted]
+            streams = await asyncio.gather(*(_http(port, "GET", f"/jobs/{i}/events") for i in ids))
+            elapsed = time.perf_counter() - t0
+
+            pages = 0
+            for job_id, (_, payload) in zip(ids, streams):
+                events = _sse_events(payload)
+                errors += [f"{job_id}: {e}" for e in _check_events(events)]
+                pages += sum(1 for e, _ in events if e == "page")
+                _, body = await _http(port, "GET", f"/jobs/{job_id}/chunks")
+                expected = events[-1][1].get("chunk_count")
+                if len(json.loads(body)) != expected:
+                    errors.append(f"{job_id}: chunks {len(json.loads(body))} != done {expected}")
+            # 완료 후 다시 구독해도 기록된 이벤트 순서가 같아야 한다
+            _, replay = await _http(port, "GET", f"/jobs/{ids[0]}/events")
+            errors += [f"replay: {e}" for e in _check_events(_sse_events(replay))]
+
+            # 대기 큐 초과 → 429 (워커 수만큼은 바로 실행되므로 그보다 많이 넣는다)
+            statuses, accepted = [], []
+            for i in range(args.jobs + args.workers + 2):
+                status, body = await _http(port, "POST", f"/jobs?name=small{i}.pdf", small)
+                statuses.append(status)
+                if status == 202:
+                    accepted.append(json.loads(body)["job_id"])
+            if 429 not in statuses:
+                errors.append(f"queue limit: no 429 in {statuses}")
+            await asyncio.gather(*(wait_events(port, i) for i in accepted))
+
+            # 워커 강제 종료 → 그 작업만 failed, 다음 작업은 새 풀에서 done
+            _, body = await _http(port, "POST", "/jobs?name=crash.pdf", data)
+            crash_id = json.loads(body)["job_id"]
+            while service._jobs[crash_id].pages_done < 1:
+                await asyncio.sleep(0.05)
+            next(iter(service._pool._processes.values())).kill()
+            crash = await wait_events(port, crash_id)
+            if crash[-1][0] != "failed":
+                errors.append(f"killed worker: job ended with {crash[-1][0]} (expected failed)")
+            _, body = await _http(port, "POST", "/jobs?name=after_crash.pdf", small)
+            after = await wait_events(port, json.loads(body)["job_id"])
+            errors += [f"after crash: {e}" for e in _check_events(after)]
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+        return elapsed, pages, errors
+
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed, pages, errors = asyncio.run(run(tmp))
+
+    print(f"{args.jobs} jobs x {Path(args.pdf).name}, {args.workers} workers")
+    print(f"  {elapsed:.2f}s, {pages} pages, {pages / elapsed:.1f} pages/s")
+    if errors:
+        print(f"Validation FAILED ({len(errors)}):")
+        for e in errors[:10]:
+            print(f"  {e}")
+        sys.exit(1)
+    print("Validation OK (event order, chunk counts, 400/413/429, recovery after worker crash)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF Extractor benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("splitter", help="native splitter vs RecursiveCharacterTextSplitter")
+    p.add_argument("--pdf", help="PDF file to take page text from (default: synthetic text)")
+    p.add_argument("--docs", type=int, default=200)
+    p.add_argument("--chars", type=int, default=20000)
+    p.add_argument("--chunk-size", type=int, default=1000)
+    p.add_argument("--chunk-overlap", type=int, default=200)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_splitter)
+
+    p = sub.add_parser("memory", help="peak memory, full vs compact page results")
+    p.add_argument("--pages", type=int, default=1000)
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("serialize", help="chunk JSON export paths")
+    p.add_argument("--pages", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_serialize)
+
+    p = sub.add_parser("docpool", help="document handle pool concurrency stress test")
+    p.add_argument("pdf", nargs="?", help="PDF file (default: synthetic)")
+    p.add_argument("--threads", type=int, default=16)
+    p.add_argument("--ops", type=int, default=50)
+    p.add_argument("--max-handles", type=int, default=4)
+    p.add_argument("--idle-seconds", type=float, default=0.5)
+    p.set_defaults(func=bench_docpool)
+
+    p = sub.add_parser("pipeline", help="batch stages vs streaming pipeline (time to first chunk)")
+    p.add_argument("pdf")
+    p.add_argument("--pages", help="page ranges for the chunk id check (default: middle third)")
+    p.add_argument("--lengths", default="20,400", help="synthetic document lengths for time to first chunk")
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser("startup", help="CLI cold-start time and heaviest imports")
+    p.add_argument("--pdf", help="also time a one-page Markdown-only extract.py run")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=8)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("layout", help="per-span loops vs array layout analysis")
+    p.add_argument("pdf")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_layout)
+
+    p = sub.add_parser("service", help="extraction service: throughput, SSE event order, bad requests")
+    p.add_argument("pdf")
+    p.add_argument("--jobs", type=int, default=4)
+    p.add_argument("--workers", type=int, default=2)
+    p.set_defaults(func=bench_service)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Custom / LangChain 추출 모드 비교 - 문서(또는 폴더)별 처리 속도, 청크 수, 토큰 분포, 텍스트 겹침
+
+Usage:
+    python compare.py data/sample.pdf
+    python compare.py data --json output/compare.json
+    python compare.py data --chunk-size 500 --chunk-overlap 100
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# 모드별 첫 문서에 백엔드 import 시간이 섞이지 않도록 측정 전에 한 번 로드
+_WARMUP_MODULES = ("pymupdf4llm", "pdfplumber", "pypdf", "langchain_text_splitters")
+
+
+def print_report(report: dict):
+    print(f"\n{report['document']}")
+    for mode in ("custom", "langchain"):
+        r = report[mode]
+        t = r["tokens"]
+        print(
+            f"  {mode:<9} {r['pages']:4d} pages {r['seconds']:7.2f}s {r['pages_per_sec']:7.2f} pages/s"
+            f"  {r['chunks']:5d} chunks  tokens min/p50/p90/max {t['min']}/{t['p50']}/{t['p90']}/{t['max']}"
+            f" (mean {t['mean']})"
+        )
+    o = report["overlap"]
+    print(
+        f"  overlap   words {o['words']:.3f}  shingles {o['shingles']:.3f}"
+        f"  custom∩/custom {o['a_in_b']:.3f}  langchain∩/langchain {o['b_in_a']:.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Custom and LangChain extraction")
+    parser.add_argument("path", help="PDF file or folder of PDFs")
+    parser.add_argument("--output-dir", default="./output/compare",
+                        help="Custom mode working directory (images)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--json", metavar="FILE", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    from src.compare import compare_pdf, find_pdfs, total_report
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"Error: not found - {path}")
+        return
+    pdfs = find_pdfs(path)
+    if not pdfs:
+        print(f"Error: no PDF files in {path}")
+        return
+
+    for module in _WARMUP_MODULES:
+        __import__(module)
+
+    reports = []
+    for pdf in pdfs:
+        try:
+            report = compare_pdf(pdf, args.output_dir, args.chunk_size, args.chunk_overlap)
+        except Exception as e:
+            print(f"\n{pdf.name}: failed - {e}")
+            continue
+        reports.append(report)
+        print_report(report)
+
+    total = total_report(reports)
+    if len(reports) > 1:
+        print(f"\nTotal ({total['documents']} documents)")
+        for mode in ("custom", "langchain"):
+            r = total[mode]
+            print(f"  {mode:<9} {r['pages']:4d} pages {r['seconds']:7.2f}s "
+                  f"{r['pages_per_sec']:7.2f} pages/s  {r['chunks']:5d} chunks")
+        if "overlap" in total:
+            o = total["overlap"]
+            print(f"  overlap   words {o['words']:.3f}  shingles {o['shingles']:.3f}")
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(
+            json.dumps({"documents": reports, "total": total}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"\nReport: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,19 @@ Usage:
     python extract.py data/sample.pdf --output-dir ./out
     python extract.py data/sample.pdf --format chunks
     python extract.py data/sample.pdf --format both
+    python extract.py data/sample.pdf --chunk-workers 4
+    python extract.py data/sample.pdf --format chunks --pretty
+    python extract.py data/sample.pdf --pages 10-40,55
+    python extract.py data/scanned.pdf --ocr tesseract --ocr-dpi 300
+    cat data/sample.pdf | python extract.py - --name sample.pdf
 """
 
 import argparse
-import json
+import sys
 from pathlib import Path
 
-from src.extractor import PDFExtractor
-from src.structure_parser import StructureParser
-from src.chunker import PDFChunker
+# 무거운 백엔드(pymupdf4llm, pdfplumber 등)는 실제로 쓰는 단계에서만 import
+# (--help, 잘못된 인자, Markdown 전용 실행의 시작 시간 단축)
 
 
 def print_progress(current: int, total: int, result):
@@ -25,65 +29,146 @@ def print_progress(current: int, total: int, result):
 
 def main():
     parser = argparse.ArgumentParser(description="PDF Extractor for RAG")
-    parser.add_argument("pdf_path", help="PDF file path")
+    parser.add_argument("pdf_path", help="PDF file path ('-' = read from stdin)")
+    parser.add_argument("--name", help="document name when reading from stdin")
     parser.add_argument("--output-dir", default="./output")
     parser.add_argument("--format", choices=["markdown", "chunks", "both"], default="both")
     parser.add_argument("--chunk-size", type=int, default=1000)
     parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="process pool size for chunking (1 = serial)")
+    parser.add_argument("--pretty", action="store_true", help="indent chunk JSON")
+    parser.add_argument("--pages", help="page ranges to process, e.g. 10-40,55 (default: all). "
+                        "Only these pages are laid out; heading levels come from a font-size "
+                        "sample of up to 32 pages")
+    parser.add_argument("--ocr", metavar="ENGINE",
+                        help="OCR image-only pages: 'tesseract' or 'module:function'")
+    parser.add_argument("--ocr-dpi", type=int, default=300)
+    parser.add_argument("--ocr-lang", default="kor+eng")
+    parser.add_argument("--ocr-workers", type=int, default=2)
     args = parser.parse_args()
 
-    pdf_path = Path(args.pdf_path)
-    if not pdf_path.exists():
-        print(f"Error: file not found - {pdf_path}")
-        return
+    from src.pdf_source import PDFSource
+
+    if args.pdf_path == "-":
+        source = PDFSource(sys.stdin.buffer.read(), name=args.name or "stdin.pdf")
+    else:
+        pdf_path = Path(args.pdf_path)
+        if not pdf_path.exists():
+            print(f"Error: file not found - {pdf_path}")
+            return
+        source = PDFSource(pdf_path, name=args.name)
+
+    pages = None
+    source_name = source.stem
+    if args.pages:
+        from src.document import parse_page_ranges
+        with source.open_pymupdf() as doc:
+            total_pages = len(doc)
+        try:
+            pages = parse_page_ranges(args.pages, total_pages)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        # 일부 페이지 결과가 전체 문서 결과를 덮어쓰지 않도록 파일명에 범위 표시
+        source_name += "_p" + args.pages.replace(" ", "").replace(",", "_")
 
     output_dir = Path(args.output_dir)
-    source_name = pdf_path.stem
-    print(f"PDF: {pdf_path}")
+    ocr = None
+    if args.ocr:
+        from src.ocr import OCROptions
+        ocr = OCROptions(
+            engine=args.ocr,
+            dpi=args.ocr_dpi,
+            language=args.ocr_lang,
+            workers=args.ocr_workers,
+            cache_dir=str(output_dir / "ocr_cache"),
+        )
+    print(f"PDF: {source.path or source.name}")
     print(f"Output: {output_dir}")
+    if pages is not None:
+        print(f"Pages: {args.pages} ({len(pages)} of {total_pages})")
     print()
 
-    # 1) 추출
-    extractor = PDFExtractor(str(pdf_path), str(output_dir))
-    print(f"Extracting {extractor.total_pages} pages...")
-    results = extractor.extract_all(progress_callback=print_progress)
-    extractor.close()
-    print()
-
-    # 2) 구조 파싱
-    print("Parsing document structure...")
-    struct_parser = StructureParser(str(pdf_path))
-    sections = struct_parser.parse(results)
-    print(f"  -> {len(sections)} sections detected")
-    for sec in sections[:20]:  # 처음 20개만 표시
-        indent = "  " * sec.level
-        print(f"    {indent}[L{sec.level}] {sec.title[:60]} (p.{sec.start_page}-{sec.end_page})")
-    if len(sections) > 20:
-        print(f"    ... and {len(sections) - 20} more")
-    print()
+    chunks_path = output_dir / "chunks" / f"{source_name}_chunks.json"
+    md_path = output_dir / "markdown" / f"{source_name}.md"
+    write_chunks = args.format in ("chunks", "both")
+    write_md = args.format in ("markdown", "both")
+    if write_chunks:
+        chunks_path.parent.mkdir(parents=True, exist_ok=True)
+    if write_md:
+        md_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # 3) 청킹
-    chunker = PDFChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
-    if sections:
-        chunks = chunker.chunk_by_sections(sections, results, source=source_name)
-    else:
-        print("  No sections found - falling back to page-based chunking")
-        chunks = chunker.chunk_by_pages(results, source=source_name)
-    print(f"  -> {len(chunks)} chunks created")
+    md_file = open(md_path, "w", encoding="utf-8") if write_md else None
+    n_sections = 0
+    n_chunks = 0
+
+    def on_page(current, total, result):
+        print_progress(current, total, result)
+        if md_file:
+            if current > 1:
+                md_file.write("\n\n---\n\n")
+            md_file.write(result.markdown)
+
+    def on_section(sec):
+        nonlocal n_sections
+        n_sections += 1
+        if n_sections <= 20:  # 처음 20개만 표시
+            indent = "  " * sec.level
+            print(f"    {indent}[L{sec.level}] {sec.title[:60]} (p.{sec.start_page}-{sec.end_page})")
+
+    def counted(chunks):
+        nonlocal n_chunks
+        for chunk in chunks:
+            n_chunks += 1
+            yield chunk
+
+    if not write_chunks:
+        # Markdown만 필요하면 구조 파싱(폰트 분석)과 청킹을 건너뛴다
+        from src.document import LazyDocument
+
+        print("Extracting...")
+        try:
+            with LazyDocument(source, str(output_dir), compact=True, ocr=ocr) as doc:
+                for _ in doc.pages(pages, on_page, memoize=False):
+                    pass
+        finally:
+            md_file.close()
+        print()
+        print(f"  -> Markdown saved: {md_path}")
+        print("\nDone!")
+        return
 
-    # 4) 저장
-    if args.format in ("chunks", "both"):
-        chunks_path = output_dir / "chunks" / f"{source_name}_chunks.json"
-        chunks_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(chunks_path, "w", encoding="utf-8") as f:
-            json.dump([c.model_dump() for c in chunks], f, ensure_ascii=False, indent=2)
-        print(f"  -> Chunks saved: {chunks_path}")
+    # 추출 → 구조 파싱 → 청킹을 페이지 단위 파이프라인으로 실행
+    # (섹션은 다음 헤딩이 나오는 즉시, 청크는 생성되는 즉시 파일에 기록)
+    from src.pipeline import stream_chunks
+    from src.serializer import dump_models
+
+    chunks = counted(stream_chunks(
+        source,
+        str(output_dir),
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        chunk_workers=args.chunk_workers,
+        pages=pages,
+        ocr=ocr,
+        progress_callback=on_page,
+        on_section=on_section,
+    ))
+    print("Extracting, parsing and chunking...")
+    try:
+        dump_models(chunks, chunks_path, pretty=args.pretty)
+    finally:
+        if md_file:
+            md_file.close()
+    print()
 
-    if args.format in ("markdown", "both"):
-        md_path = output_dir / "markdown" / f"{source_name}.md"
-        md_path.parent.mkdir(parents=True, exist_ok=True)
-        full_md = "\n\n---\n\n".join(r.markdown for r in results)
-        md_path.write_text(full_md, encoding="utf-8")
+    if n_sections > 20:
+        print(f"    ... and {n_sections - 20} more")
+    print(f"  -> {n_sections} sections detected")
+    print(f"  -> {n_chunks} chunks created")
+    print(f"  -> Chunks saved: {chunks_path}")
+    if write_md:
         print(f"  -> Markdown saved: {md_path}")
 
     print("\nDone!")
@@ -0,0 +1,57 @@
+"""
+로컬 PDF 추출 서비스
+
+Usage:
+    python serve.py
+    python serve.py --port 8765 --workers 4 --max-queue 64
+
+    curl --data-binary @data/sample.pdf "localhost:8765/jobs?name=sample.pdf&priority=1"
+    curl -N localhost:8765/jobs/<job_id>/events
+    curl localhost:8765/jobs/<job_id>/chunks
+"""
+
+import argparse
+import asyncio
+import signal
+
+from src.service import ExtractionService
+
+
+async def run(args):
+    service = ExtractionService(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        output_dir=args.output_dir,
+    )
+    server = await service.serve(args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} (workers: {args.workers}, queue: {args.max_queue})")
+    # SIGTERM에도 워커 프로세스를 정리하고 종료
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, server.close)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PDF extraction service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="extraction process pool size")
+    parser.add_argument("--max-queue", type=int, default=32,
+                        help="max queued jobs (further uploads get 429)")
+    parser.add_argument("--output-dir", default="./output/service")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
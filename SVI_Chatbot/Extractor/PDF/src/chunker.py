@@ -4,47 +4,137 @@ from __future__ import annotations
 
 import hashlib
 import re
-from pathlib import Path
-
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import sys
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 from .models import Chunk, PageResult, Section, TableData
 
+if TYPE_CHECKING:
+    from .structure_parser import SectionStream
+
 
 MAX_CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
-# 한국어 + 일반 구분자
-_KOREAN_SEPARATORS = [
-    "\n\n",
-    "\n",
-    " ",
-    ".",
-    ",",
-    "\u200b",   # Zero-width space
-    "\uff0c",   # Fullwidth comma
-    "\u3001",   # Ideographic comma
-    "\uff0e",   # Fullwidth full stop
-    "\u3002",   # Ideographic full stop
-    "",
+# Markdown 테이블 블록 (| 로 시작하고 끝나는 줄 2줄 이상)
+_MD_TABLE_BLOCK = re.compile(r"(?:^[ \t]*\|.*\|[ \t]*(?:\n|$)){2,}", re.MULTILINE)
+_MD_SEPARATOR_CELL = re.compile(r":?-+:?")
+_CELL_SPACE = re.compile(r"\s+|<br\s*/?>")
+# 본문 테이블 블록이 pdfplumber 테이블과 같은 테이블로 볼 최소 셀 일치 비율
+TABLE_MATCH_RATIO = 0.5
+
+# 분할 경계 (우선순위 순). 매치 끝 위치가 분할 지점이 된다.
+_BOUNDARY_PATTERNS = [
+    re.compile(r"\n\s*\n"),                            # 문단
+    re.compile(r"\n"),                                  # 줄
+    re.compile(r"(?:다|요|죠|까|음|함|임|됨)[.?!]+\s*"),  # 한국어 문장 종결
+    re.compile(r"[.?!\uff0e\u3002]+\s*"),               # 일반/전각 마침표
+    re.compile(r"\s+"),                                 # 공백
+    re.compile(r"[,\uff0c\u3001\u200b]\s*"),           # 쉼표, Zero-width space
 ]
 
 
+class KoreanTextSplitter:
+    """한국어 문서용 단일 패스 분할기.
+
+    경계 위치를 레벨별로 한 번만 계산한 뒤 앞에서부터 훑으며 chunk_size 안에서
+    가장 우선순위가 높은 마지막 경계로 자른다. 하위 레벨 경계는 상위 레벨로
+    자를 수 없을 때 처음 계산된다. 다음 청크는 직전 청크 끝에서 chunk_overlap
+    이내에 있는 같은 레벨의 첫 경계부터 시작한다 (RecursiveCharacterTextSplitter와
+    같은 의미).
+
+    RecursiveCharacterTextSplitter와 끝 위치가 다를 수 있는 경우 (bench.py splitter가 검사):
+    - 줄 안에서 잘라야 할 때 LangChain 구분자 목록에는 한국어 문장 종결이 없어 마지막
+      공백(문장 중간)에서 자르고, 이 분할기는 마지막 "~다." 등 문장 끝에서 자른다
+    - 문단/줄 구분자가 chunk_size 경계에 걸칠 때: 여기서는 구분자 뒤 위치가 chunk_size
+      안에 있어야 하고, LangChain은 구분자를 다음 조각 앞에 붙여 센다 (한 단계 낮은 경계에서 끝남)
+    - LangChain은 직전 청크 안에 완전히 들어가는 짧은 청크를 낼 수 있고, 여기서는 직전
+      청크 끝을 넘는 경계만 쓴다
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = MAX_CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap({chunk_overlap}) must be smaller than chunk_size({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> list[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_spans(self, text: str) -> list[tuple[int, int]]:
+        """(start, end) 문자 오프셋 목록. 앞뒤 공백은 제외된다."""
+        n = len(text)
+        levels: list[list[int] | None] = [None] * len(_BOUNDARY_PATTERNS)
+
+        content_end = len(text.rstrip())  # 끝 공백만 남으면 더 자르지 않는다
+
+        spans: list[tuple[int, int]] = []
+        start = prev_end = 0
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= content_end:
+                end = n
+            else:
+                end = limit  # 경계가 없으면 강제 분할
+                cut_level = None
+                for lv, pattern in enumerate(_BOUNDARY_PATTERNS):
+                    cuts = levels[lv]
+                    if cuts is None:
+                        cuts = levels[lv] = [m.end() for m in pattern.finditer(text)]
+                    i = bisect_right(cuts, limit) - 1
+                    # 직전 청크 끝을 넘어서는 경계만 사용 (overlap 구간만 담긴 청크 방지)
+                    if i >= 0 and cuts[i] > max(start, prev_end):
+                        end = cuts[i]
+                        cut_level = cuts
+                        break
+
+            span = _trim_span(text, start, end)
+            if span:
+                spans.append(span)
+            if end >= n:
+                break
+
+            # overlap: end - overlap 이후 같은 레벨의 첫 경계에서 다음 청크 시작
+            prev_end = next_start = end
+            if self.chunk_overlap > 0:
+                lo = max(start + 1, end - self.chunk_overlap)
+                if cut_level is None:
+                    next_start = lo
+                else:
+                    i = bisect_left(cut_level, lo)
+                    if cut_level[i] < end:
+                        next_start = cut_level[i]
+            start = next_start
+
+        return spans
+
+
 class PDFChunker:
-    """범용 PDF 청킹."""
+    """범용 PDF 청킹.
+
+    workers > 1이면 섹션/페이지(또는 문서) 단위로 프로세스 풀에 분배한다.
+    청크 id와 순서는 직렬 처리 결과와 동일하다.
+    """
 
     def __init__(
         self,
         chunk_size: int = MAX_CHUNK_SIZE,
         chunk_overlap: int = CHUNK_OVERLAP,
+        workers: int = 1,
     ):
         self.chunk_size = chunk_size
-        self.splitter = RecursiveCharacterTextSplitter(
-            separators=_KOREAN_SEPARATORS,
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-        )
+        self.chunk_overlap = chunk_overlap
+        self.workers = workers
+        self.splitter = KoreanTextSplitter(chunk_size, chunk_overlap)
 
     def chunk_by_sections(
         self,
@@ -53,62 +143,70 @@ class PDFChunker:
         source: str = "",
     ) -> list[Chunk]:
         """섹션 기반 청킹 (구조 파서 결과 활용)."""
-        chunks: list[Chunk] = []
+        # 별도 청크로 나가는 테이블은 섹션 본문에서 제거 (페이지별로 일치하는 블록만)
+        table_blocks = {pr.page_number: _emitted_table_blocks(pr) for pr in page_results if pr.tables}
+        tasks = [
+            ("section", (
+                sec_idx,
+                section,
+                source,
+                _section_blocks(section, table_blocks),
+            ))
+            for sec_idx, section in enumerate(sections)
+        ]
+        # 테이블 별도 청크
+        tasks += [("tables", (pr, source)) for pr in page_results if pr.tables]
+        return self._run(tasks)
 
-        for sec_idx, section in enumerate(sections):
-            base_meta = {
-                "section_title": section.title,
-                "section_level": section.level,
-                "start_page": section.start_page,
-                "end_page": section.end_page,
-                "source": source,
-            }
+    def chunk_stream(
+        self,
+        pages: Iterable[PageResult],
+        sections: SectionStream,
+        source: str = "",
+        on_section: Callable[[Section], None] | None = None,
+    ) -> Iterator[Chunk]:
+        """chunk_by_sections의 스트리밍 버전. 페이지가 도착하는 대로 청크를 내보낸다.
 
-            text = section.content.strip()
-            if not text:
-                continue
+        sections는 StructureParser.stream(). 섹션 청크는 다음 헤딩이 섹션을 닫는 즉시,
+        테이블 청크는 페이지가 도착하는 즉시 나간다 (청크 id는 chunk_by_sections와 동일,
+        순서만 테이블이 해당 위치에 끼어든다). workers > 1이면 작업을 풀에 넣고 순서대로 받는다.
+        """
+        table_blocks: dict[int, list[str]] = {}
+        sec_idx = 0
 
-            if len(text) <= self.chunk_size:
-                chunks.append(
-                    Chunk(
-                        id=_make_id(source, sec_idx, 0),
-                        content=text,
-                        metadata=base_meta,
-                        token_count=_approx_tokens(text),
-                    )
-                )
-            else:
-                sub_texts = self.splitter.split_text(text)
-                for idx, sub in enumerate(sub_texts):
-                    chunks.append(
-                        Chunk(
-                            id=_make_id(source, sec_idx, idx),
-                            content=sub,
-                            metadata={**base_meta, "sub_chunk_index": idx},
-                            token_count=_approx_tokens(sub),
-                        )
-                    )
+        def section_tasks(closed: list[Section]) -> list[tuple[str, tuple]]:
+            nonlocal sec_idx
+            tasks = []
+            for section in closed:
+                if on_section:
+                    on_section(section)
+                blocks = _section_blocks(section, table_blocks)
+                tasks.append(("section", (sec_idx, section, source, blocks)))
+                sec_idx += 1
+            return tasks
 
-        # 테이블 별도 청크
-        for pr in page_results:
-            for t_idx, table in enumerate(pr.tables):
-                md = _table_to_markdown(table)
-                if not md.strip():
-                    continue
-                chunks.append(
-                    Chunk(
-                        id=_make_id(source, f"table_p{pr.page_number}", t_idx),
-                        content=md,
-                        metadata={
-                            "element_type": "table",
-                            "page": pr.page_number,
-                            "source": source,
-                        },
-                        token_count=_approx_tokens(md),
-                    )
-                )
+        def task_stream() -> Iterator[tuple[str, tuple]]:
+            for pr in pages:
+                if pr.tables:
+                    table_blocks[pr.page_number] = _emitted_table_blocks(pr)
+                yield from section_tasks(sections.feed(pr))
+                if pr.tables:
+                    yield ("tables", (pr, source))
+            yield from section_tasks(sections.finish())
 
-        return chunks
+        if self.workers <= 1:
+            for task in task_stream():
+                yield from _run_task(self, task)
+            return
+
+        pending: deque[Future] = deque()
+        with self._pool(self.workers) as pool:
+            for task in task_stream():
+                pending.append(pool.submit(_run_worker_task, task))
+                while pending and pending[0].done():
+                    yield from _interned(pending.popleft().result())
+            while pending:
+                yield from _interned(pending.popleft().result())
 
     def chunk_by_pages(
         self,
@@ -116,77 +214,321 @@ class PDFChunker:
         source: str = "",
     ) -> list[Chunk]:
         """페이지 단위 청킹 (구조 파싱 없이)."""
+        return self._run([("page", (pr, source)) for pr in page_results])
+
+    def chunk_documents(
+        self,
+        documents: list[tuple[list[Section], list[PageResult], str]],
+    ) -> list[list[Chunk]]:
+        """여러 문서를 문서 단위로 병렬 청킹. (sections, page_results, source) 목록을 받는다.
+
+        sections가 비어 있으면 해당 문서는 페이지 단위로 청킹한다.
+        """
+        tasks = [("document", doc) for doc in documents]
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [_run_task(self, task) for task in tasks]
+        with self._pool(len(tasks)) as pool:
+            return list(pool.map(_run_worker_task, tasks))
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    def _run(self, tasks: list[tuple[str, tuple]]) -> list[Chunk]:
         chunks: list[Chunk] = []
-        for pr in page_results:
-            text = pr.markdown.strip()
-            if not text:
-                continue
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                chunks.extend(_run_task(self, task))
+            return chunks
+
+        # 작은 섹션이 대부분이라 IPC 비용을 줄이기 위해 묶어서 보낸다
+        batch = max(1, len(tasks) // (self.workers * 4))
+        with self._pool(len(tasks)) as pool:
+            for part in pool.map(_run_worker_task, tasks, chunksize=batch):
+                chunks.extend(_interned(part))
+        return chunks
 
+    def _pool(self, n_tasks: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=min(self.workers, n_tasks),
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap),
+        )
+
+    def _section_chunks(
+        self, sec_idx: int, section: Section, source: str, table_blocks: list[str]
+    ) -> list[Chunk]:
+        text = _strip_md_tables(section.content, table_blocks).strip()
+        if not text:
+            return []
+
+        base_meta = {
+            "section_title": section.title,
+            "section_level": section.level,
+            "start_page": section.start_page,
+            "end_page": section.end_page,
+            "source": source,
+        }
+        # 파서가 붙인 고정 키 우선 (페이지 범위 추출도 같은 id), 없으면 섹션 순번
+        key = section.key or sec_idx
+        return self._text_chunks(text, base_meta, source, (key, 0), key)
+
+    def _page_chunks(self, pr: PageResult, source: str) -> list[Chunk]:
+        text = pr.markdown
+        if pr.tables:
+            text = _strip_md_tables(text, _emitted_table_blocks(pr))
+        text = text.strip()
+
+        chunks: list[Chunk] = []
+        if text:
             meta = {
                 "page": pr.page_number,
                 "source": source,
             }
+            chunks = self._text_chunks(
+                text, meta, source, ("page", pr.page_number), f"page{pr.page_number}"
+            )
+        # 테이블 별도 청크
+        chunks.extend(self._table_chunks(pr, source))
+        return chunks
+
+    def _text_chunks(
+        self,
+        text: str,
+        meta: dict,
+        source: str,
+        whole_key: tuple[object, int],
+        split_key: object,
+    ) -> list[Chunk]:
+        """text가 chunk_size 이하면 1개(id: whole_key), 넘으면 분할(id: split_key + 순번)."""
+        if len(text) <= self.chunk_size:
+            return [
+                _new_chunk(
+                    id=_make_id(source, *whole_key),
+                    content=text,
+                    metadata=meta,
+                    token_count=_approx_tokens(text),
+                )
+            ]
+
+        chunks: list[Chunk] = []
+        for idx, (start, end) in enumerate(self.splitter.split_spans(text)):
+            sub = text[start:end]
+            chunks.append(
+                _new_chunk(
+                    id=_make_id(source, split_key, idx),
+                    content=sub,
+                    metadata={
+                        **meta,
+                        "sub_chunk_index": idx,
+                        "char_start": start,
+                        "char_end": end,
+                    },
+                    token_count=_approx_tokens(sub),
+                )
+            )
+        return chunks
+
+    def _table_chunks(self, pr: PageResult, source: str) -> list[Chunk]:
+        """테이블 청크. chunk_size를 넘는 테이블은 헤더를 반복한 행 그룹으로 나눈다."""
+        chunks: list[Chunk] = []
+        for t_idx, table in enumerate(pr.tables):
+            md = table.to_markdown()
+            if not md.strip():
+                continue
 
-            if len(text) <= self.chunk_size:
+            meta = {
+                "element_type": "table",
+                "page": pr.page_number,
+                "source": source,
+            }
+            if len(md) <= self.chunk_size:
                 chunks.append(
-                    Chunk(
-                        id=_make_id(source, "page", pr.page_number),
-                        content=text,
+                    _new_chunk(
+                        id=_make_id(source, f"table_p{pr.page_number}", t_idx),
+                        content=md,
                         metadata=meta,
-                        token_count=_approx_tokens(text),
+                        token_count=_approx_tokens(md),
                     )
                 )
-            else:
-                sub_texts = self.splitter.split_text(text)
-                for idx, sub in enumerate(sub_texts):
-                    chunks.append(
-                        Chunk(
-                            id=_make_id(source, f"page{pr.page_number}", idx),
-                            content=sub,
-                            metadata={**meta, "sub_chunk_index": idx},
-                            token_count=_approx_tokens(sub),
-                        )
-                    )
+                continue
 
-            # 테이블 별도 청크
-            for t_idx, table in enumerate(pr.tables):
-                md = _table_to_markdown(table)
-                if not md.strip():
-                    continue
+            for g_idx, (start, end) in enumerate(self._row_groups(table)):
+                group_md = table.to_markdown(start, end)
                 chunks.append(
-                    Chunk(
-                        id=_make_id(source, f"table_p{pr.page_number}", t_idx),
-                        content=md,
+                    _new_chunk(
+                        id=_make_id(source, f"table_p{pr.page_number}_{t_idx}", g_idx),
+                        content=group_md,
                         metadata={
-                            "element_type": "table",
-                            "page": pr.page_number,
-                            "source": source,
+                            **meta,
+                            "table_index": t_idx,
+                            "row_group_index": g_idx,
+                            "row_start": start,
+                            "row_end": end,
+                            "total_rows": len(table.rows),
                         },
-                        token_count=_approx_tokens(md),
+                        token_count=_approx_tokens(group_md),
                     )
                 )
-
         return chunks
 
+    def _row_groups(self, table: TableData) -> list[tuple[int, int]]:
+        """헤더 포함 chunk_size 이내가 되도록 행을 [start, end) 그룹으로 묶는다.
+
+        한 행만으로 예산을 넘으면 그 행 하나가 그룹이 된다.
+        """
+        n_cols = len(table.headers)
+        # "| a | b |" 한 줄 = 셀 길이 합 + 3*n + 1, 줄바꿈 1
+        header_len = (sum(len(h) for h in table.headers) + 3 * n_cols + 2) + (6 * n_cols + 2)
+        budget = self.chunk_size - header_len
+
+        groups: list[tuple[int, int]] = []
+        start = 0
+        size = 0
+        for i, row in enumerate(table.rows):
+            row_len = sum(len(c) for c in row) + 3 * len(row) + 2
+            if i > start and size + row_len > budget:
+                groups.append((start, i))
+                start, size = i, 0
+            size += row_len
+        if start < len(table.rows) or not groups:
+            groups.append((start, len(table.rows)))
+        return groups
+
+
+# ------------------------------------------------------------------
+# Worker (프로세스 풀)
+# ------------------------------------------------------------------
+
+_worker_chunker: PDFChunker | None = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int):
+    global _worker_chunker
+    _worker_chunker = PDFChunker(chunk_size, chunk_overlap)
+
+
+def _run_worker_task(task: tuple[str, tuple]) -> list[Chunk]:
+    return _run_task(_worker_chunker, task)
+
+
+def _run_task(chunker: PDFChunker, task: tuple[str, tuple]) -> list[Chunk]:
+    kind, args = task
+    if kind == "section":
+        return chunker._section_chunks(*args)
+    if kind == "tables":
+        return chunker._table_chunks(*args)
+    if kind == "page":
+        return chunker._page_chunks(*args)
+    # document: 문서 하나를 워커 안에서 직렬 처리
+    sections, page_results, source = args
+    if sections:
+        return chunker.chunk_by_sections(sections, page_results, source=source)
+    return chunker.chunk_by_pages(page_results, source=source)
+
 
 # ------------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------------
 
+def _new_chunk(id: str, content: str, metadata: dict, token_count: int) -> Chunk:
+    """내부 생성용 Chunk. 검증(메타데이터 dict 복사)을 생략하고 반복되는 문자열은 intern."""
+    return Chunk.model_construct(
+        id=id, content=content, metadata=_intern_values(metadata), token_count=token_count
+    )
+
+
+def _interned(chunks: list[Chunk]) -> list[Chunk]:
+    """워커에서 intern한 문자열은 unpickle 시 새 객체가 되므로 다시 intern."""
+    for chunk in chunks:
+        _intern_values(chunk.metadata)
+    return chunks
+
+
+def _intern_values(metadata: dict) -> dict:
+    for key, value in metadata.items():
+        if type(value) is str:
+            metadata[key] = sys.intern(value)
+    return metadata
+
+
 def _make_id(source: str, section: object, idx: int) -> str:
     raw = f"{source}_{section}_{idx}"
     return hashlib.md5(raw.encode()).hexdigest()[:12]
 
 
+def _trim_span(text: str, start: int, end: int) -> tuple[int, int] | None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _emitted_table_blocks(pr: PageResult) -> list[str]:
+    """페이지 Markdown의 테이블 블록 중 테이블 청크로 나가는 pdfplumber 테이블과 같은 것.
+
+    pdfplumber 테이블의 (공백 무시) 셀 중 TABLE_MATCH_RATIO 이상이 블록에 있으면 같은
+    테이블로 본다. 테이블 하나는 블록 하나에만 대응하고, pdfplumber가 놓친 테이블의
+    블록은 본문에 남는다.
+    """
+    if "|" not in pr.markdown:
+        return []
+    remaining = [_table_cells(t) for t in pr.tables if t.to_markdown().strip()]
+    remaining = [cells for cells in remaining if cells]
+    blocks: list[str] = []
+    for m in _MD_TABLE_BLOCK.finditer(pr.markdown):
+        if not remaining:
+            break
+        block_cells = _block_cells(m.group())
+        scores = [len(cells & block_cells) / len(cells) for cells in remaining]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        if scores[best] >= TABLE_MATCH_RATIO:
+            blocks.append(m.group())
+            del remaining[best]
+    return blocks
+
+
+def _section_blocks(section: Section, table_blocks: dict[int, list[str]]) -> list[str]:
+    """섹션 페이지 범위의 테이블 블록 (페이지 순서)."""
+    return [
+        block
+        for page in range(section.start_page, section.end_page + 1)
+        for block in table_blocks.get(page, ())
+    ]
+
+
+def _strip_md_tables(text: str, blocks: list[str]) -> str:
+    """본문에서 테이블 청크로 나가는 Markdown 테이블 블록만 제거 (앞에서부터 순서대로 찾음).
+
+    섹션이 페이지 중간에서 시작하면 앞부분 블록은 본문에 없으므로 건너뛴다.
+    """
+    if not blocks:
+        return text
+    pos = 0
+    for block in blocks:
+        i = text.find(block, pos)
+        if i != -1:
+            text = text[:i] + text[i + len(block):]
+            pos = i
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+
+def _block_cells(block: str) -> set[str]:
+    cells: set[str] = set()
+    for line in block.strip().splitlines():
+        row = [_CELL_SPACE.sub("", c) for c in line.strip().strip("|").split("|")]
+        if all(not c or _MD_SEPARATOR_CELL.fullmatch(c) for c in row):
+            continue
+        cells.update(c for c in row if c)
+    return cells
+
+
+def _table_cells(table: TableData) -> set[str]:
+    return {_CELL_SPACE.sub("", c or "") for row in [table.headers, *table.rows] for c in row} - {""}
+
+
 def _approx_tokens(text: str) -> int:
     """대략적인 토큰 수 추정."""
     return max(1, len(text) // 2)
 
-
-def _table_to_markdown(table: TableData) -> str:
-    if not table.headers:
-        return ""
-    header_line = "| " + " | ".join(table.headers) + " |"
-    separator = "| " + " | ".join(["---"] * len(table.headers)) + " |"
-    rows = ["| " + " | ".join(row) + " |" for row in table.rows]
-    return "\n".join([header_line, separator] + rows)
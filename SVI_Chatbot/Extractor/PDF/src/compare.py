@@ -0,0 +1,164 @@
+"""Custom / LangChain 추출 모드 비교 - 처리 속도, 청크 수, 토큰 분포, 모드 간 텍스트 겹침"""
+
+from __future__ import annotations
+
+import re
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .pdf_source import PdfInput, as_source
+
+MODES = ("custom", "langchain")
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    pages: int
+    seconds: float  # 추출 + 청킹 (문서 열기 포함)
+    tokens: list[int] = field(default_factory=list)  # 청크별 token_count
+    text: str = ""  # 페이지 텍스트 전체 (겹침 계산용)
+
+    @property
+    def chunks(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "pages": self.pages,
+            "seconds": round(self.seconds, 3),
+            "pages_per_sec": round(self.pages_per_sec, 2),
+            "chunks": self.chunks,
+            "chars": len(self.text),
+            "tokens": token_stats(self.tokens),
+        }
+
+
+def run_custom(
+    pdf: PdfInput,
+    output_dir: str = "./output/compare",
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+) -> ModeResult:
+    """Custom 모드: pymupdf4llm + pdfplumber 추출 → 구조 파싱 → 섹션/페이지 청킹."""
+    from .pipeline import stream_chunks
+
+    texts: list[str] = []
+    t0 = time.perf_counter()
+    tokens = [
+        c.token_count
+        for c in stream_chunks(
+            as_source(pdf), output_dir, chunk_size, chunk_overlap,
+            progress_callback=lambda n, total, r: texts.append(r.markdown),
+        )
+    ]
+    return ModeResult("custom", len(texts), time.perf_counter() - t0, tokens, "\n\n".join(texts))
+
+
+def run_langchain(pdf: PdfInput, chunk_size: int = 1000, chunk_overlap: int = 200) -> ModeResult:
+    """LangChain 모드: pypdf 페이지 텍스트 → RecursiveCharacterTextSplitter."""
+    from .pypdf_document import PyPDFDocument, chunk_documents
+
+    source = as_source(pdf)
+    t0 = time.perf_counter()
+    docs = PyPDFDocument(source).documents()
+    chunks = chunk_documents(docs, source.stem, chunk_size, chunk_overlap)
+    return ModeResult(
+        "langchain", len(docs), time.perf_counter() - t0,
+        [c.token_count for c in chunks], "\n\n".join(d.page_content for d in docs),
+    )
+
+
+def token_stats(tokens: list[int]) -> dict:
+    if not tokens:
+        return {"min": 0, "p50": 0, "p90": 0, "max": 0, "mean": 0.0}
+    ordered = sorted(tokens)
+    return {
+        "min": ordered[0],
+        "p50": ordered[len(ordered) // 2],
+        "p90": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        "max": ordered[-1],
+        "mean": round(statistics.fmean(ordered), 1),
+    }
+
+
+def text_overlap(a: str, b: str, n: int = 3) -> dict:
+    """두 추출 결과의 겹침. Markdown 기호/공백 차이는 무시하고 단어 단위로 비교한다.
+
+    words: 단어 집합 Jaccard, shingles: 연속 n단어 집합 Jaccard (순서까지 비교),
+    a_in_b / b_in_a: 한쪽 n단어 조각 중 다른 쪽에도 있는 비율.
+    """
+    wa = _WORD.findall(a.lower())
+    wb = _WORD.findall(b.lower())
+    sa, sb = _shingles(wa, n), _shingles(wb, n)
+    common = len(sa & sb)
+    return {
+        "words": round(_jaccard(set(wa), set(wb)), 4),
+        "shingles": round(_jaccard(sa, sb), 4),
+        "a_in_b": round(common / len(sa), 4) if sa else 0.0,
+        "b_in_a": round(common / len(sb), 4) if sb else 0.0,
+    }
+
+
+def compare_pdf(
+    pdf: PdfInput,
+    output_dir: str = "./output/compare",
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+) -> dict:
+    """PDF 하나를 두 모드로 처리한 보고서 (overlap의 a = custom, b = langchain)."""
+    source = as_source(pdf)
+    custom = run_custom(source, output_dir, chunk_size, chunk_overlap)
+    langchain = run_langchain(source, chunk_size, chunk_overlap)
+    return {
+        "document": source.name,
+        "custom": custom.summary(),
+        "langchain": langchain.summary(),
+        "overlap": text_overlap(custom.text, langchain.text),
+    }
+
+
+def total_report(reports: list[dict]) -> dict:
+    """문서별 보고서 합계 (속도는 전체 페이지 / 전체 시간, 겹침은 글자 수 가중 평균)."""
+    total: dict = {"documents": len(reports)}
+    for mode in MODES:
+        pages = sum(r[mode]["pages"] for r in reports)
+        seconds = sum(r[mode]["seconds"] for r in reports)
+        total[mode] = {
+            "pages": pages,
+            "seconds": round(seconds, 3),
+            "pages_per_sec": round(pages / seconds, 2) if seconds else 0.0,
+            "chunks": sum(r[mode]["chunks"] for r in reports),
+        }
+    weights = [r["custom"]["chars"] + r["langchain"]["chars"] for r in reports]
+    if sum(weights):
+        total["overlap"] = {
+            key: round(sum(r["overlap"][key] * w for r, w in zip(reports, weights)) / sum(weights), 4)
+            for key in ("words", "shingles", "a_in_b", "b_in_a")
+        }
+    return total
+
+
+def find_pdfs(path: str | Path) -> list[Path]:
+    """파일이면 그대로, 폴더면 바로 아래 *.pdf (이름순)."""
+    path = Path(path)
+    return sorted(path.glob("*.pdf")) if path.is_dir() else [path]
+
+
+def _shingles(words: list[str], n: int) -> set[tuple[str, ...]]:
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
@@ -0,0 +1,144 @@
+"""PyMuPDF 문서 핸들 풀 - 경로별 checkout/checkin, 핸들 수 제한, 유휴 핸들 정리"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import pymupdf
+
+from .pdf_source import PdfInput, as_source, source_key
+
+
+@dataclass
+class _FilePool:
+    cond: threading.Condition  # 이 파일의 핸들을 기다리는 스레드만 깨우도록 파일별 조건 변수
+    idle: list[tuple[pymupdf.Document, float]] = field(default_factory=list)  # (doc, 반납 시각)
+    open_count: int = 0
+    waiters: int = 0
+    generation: int = 0  # close_file()마다 증가. 이전 세대 핸들은 반납 시 닫는다
+    checked_out: dict[int, int] = field(default_factory=dict)  # id(doc) → 빌려 간 세대
+
+
+class DocumentPool:
+    """PyMuPDF Document는 동시 사용이 안전하지 않으므로 스레드마다 핸들을 빌려 쓴다.
+
+    풀은 source_key() 기준이라 PDFSource(메모리 버퍼 포함)는 내용 해시로 공유된다.
+
+    - 한 파일당 최대 max_per_file개 핸들. 모두 사용 중이면 반납될 때까지 대기
+    - idle_seconds 동안 쓰이지 않은 핸들은 다음 checkout/checkin 때 닫힘
+    - 핸들이 하나도 없고 기다리는 스레드도 없는 파일 항목은 제거
+    """
+
+    def __init__(self, max_per_file: int = 4, idle_seconds: float = 300.0):
+        self.max_per_file = max_per_file
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._files: dict[str, _FilePool] = {}
+
+    @contextmanager
+    def document(self, pdf: PdfInput, timeout: float | None = None) -> Iterator[pymupdf.Document]:
+        """with pool.document(pdf) as doc: ... 형태로 사용."""
+        doc = self.checkout(pdf, timeout)
+        try:
+            yield doc
+        finally:
+            self.checkin(pdf, doc)
+
+    def checkout(self, pdf: PdfInput, timeout: float | None = None) -> pymupdf.Document:
+        key = source_key(pdf)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._evict_idle()
+            fp = self._files.get(key)
+            if fp is None:
+                fp = self._files[key] = _FilePool(threading.Condition(self._lock))
+            fp.waiters += 1
+            try:
+                while not fp.idle and fp.open_count >= self.max_per_file:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"no free document handle for {pdf}")
+                    fp.cond.wait(remaining)
+            finally:
+                fp.waiters -= 1
+            if fp.idle:
+                doc = fp.idle.pop()[0]
+                fp.checked_out[id(doc)] = fp.generation
+                return doc
+            fp.open_count += 1
+            generation = fp.generation
+
+        # 파일 열기는 락 밖에서 (다른 파일 checkout을 막지 않도록)
+        try:
+            doc = as_source(pdf).open_pymupdf()
+        except BaseException:
+            with self._lock:
+                fp.open_count -= 1
+                fp.cond.notify()
+                self._drop_if_empty(key, fp)
+            raise
+        with self._lock:
+            fp.checked_out[id(doc)] = generation
+        return doc
+
+    def checkin(self, pdf: PdfInput, doc: pymupdf.Document) -> None:
+        key = source_key(pdf)
+        with self._lock:
+            fp = self._files[key]
+            if fp.checked_out.pop(id(doc), fp.generation) == fp.generation:
+                fp.idle.append((doc, time.monotonic()))
+            else:
+                # close_file() 이전에 빌려 간 핸들 - 교체 전 파일이므로 재사용하지 않음
+                doc.close()
+                fp.open_count -= 1
+            self._evict_idle()
+            fp.cond.notify()
+            self._drop_if_empty(key, fp)
+
+    def close_file(self, pdf: PdfInput) -> None:
+        """유휴 핸들을 모두 닫는다 (파일 교체 시). 사용 중인 핸들은 반납될 때 닫힌다."""
+        key = source_key(pdf)
+        with self._lock:
+            fp = self._files.get(key)
+            if fp:
+                for doc, _ in fp.idle:
+                    doc.close()
+                fp.open_count -= len(fp.idle)
+                fp.idle.clear()
+                fp.generation += 1
+                fp.cond.notify_all()
+                self._drop_if_empty(key, fp)
+
+    def close(self) -> None:
+        for key in list(self._files):
+            self.close_file(key)
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                path: {"open": fp.open_count, "idle": len(fp.idle)}
+                for path, fp in self._files.items()
+            }
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key, fp in list(self._files.items()):
+            keep = []
+            for doc, since in fp.idle:
+                if now - since > self.idle_seconds:
+                    doc.close()
+                    fp.open_count -= 1
+                else:
+                    keep.append((doc, since))
+            if len(keep) != len(fp.idle):
+                fp.idle = keep
+                fp.cond.notify_all()  # 닫힌 만큼 새로 열 수 있음
+                self._drop_if_empty(key, fp)
+
+    def _drop_if_empty(self, key: str, fp: _FilePool) -> None:
+        if not fp.open_count and not fp.waiters and self._files.get(key) is fp:
+            del self._files[key]
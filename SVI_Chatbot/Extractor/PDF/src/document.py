@@ -0,0 +1,104 @@
+"""지연 문서 모델 - 접근한 페이지만 추출 + 결과 메모이즈, 페이지 범위 지정"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterable, Iterator
+
+from .extractor import PDFExtractor
+from .models import PageResult
+from .ocr import OCROptions
+from .pdf_source import PdfInput, as_source
+
+_RANGE_PART = re.compile(r"^\s*(\d*)\s*(?:(-)\s*(\d*))?\s*$")
+
+
+class LazyDocument:
+    """PDFExtractor 위의 지연 문서. doc[i]로 처음 접근할 때 추출하고 결과를 기억한다.
+
+    인덱스는 0부터 (PageResult.page_number는 1부터). 일부 페이지만 다루는 작업은
+    접근한 페이지 수에 비례하는 비용만 든다.
+    """
+
+    def __init__(
+        self,
+        pdf: PdfInput,
+        output_dir: str = "./output",
+        compact: bool = False,
+        ocr: OCROptions | None = None,
+    ):
+        self.source = as_source(pdf)
+        self.extractor = PDFExtractor(self.source, output_dir, compact=compact, ocr=ocr)
+        self.total_pages = self.extractor.total_pages
+        self._results: dict[int, PageResult] = {}
+
+    def __len__(self) -> int:
+        return self.total_pages
+
+    def __getitem__(self, index: int) -> PageResult:
+        if index < 0:
+            index += self.total_pages
+        if not 0 <= index < self.total_pages:
+            raise IndexError(f"page index {index} out of range (0-{self.total_pages - 1})")
+        result = self._results.get(index)
+        if result is None:
+            result = self._results[index] = self.extractor.extract_page(index)
+        return result
+
+    @property
+    def extracted(self) -> list[int]:
+        """지금까지 추출된 페이지 인덱스."""
+        return sorted(self._results)
+
+    def pages(
+        self,
+        indices: Iterable[int] | None = None,
+        progress_callback: Callable[[int, int, PageResult], None] | None = None,
+        memoize: bool = True,
+    ) -> Iterator[PageResult]:
+        """indices(기본: 전체) 순서대로 페이지 결과를 낸다. callback(현재, 전체, 결과).
+
+        memoize=False이면 새로 추출한 결과를 보관하지 않는다 (한 번 훑는 파이프라인용).
+        """
+        indices = list(range(self.total_pages)) if indices is None else list(indices)
+        if self.extractor.ocr is not None:
+            # 스캔 페이지는 먼저 OCR 풀에 넣어 텍스트 페이지 추출과 병렬로 진행
+            self.extractor.ocr.prefetch(i for i in indices if i not in self._results)
+        for n, index in enumerate(indices, 1):
+            if memoize:
+                result = self[index]
+            else:
+                result = self._results.get(index) or self.extractor.extract_page(index)
+            if progress_callback:
+                progress_callback(n, len(indices), result)
+            yield result
+
+    def close(self) -> None:
+        self.extractor.close()
+
+    def __enter__(self) -> LazyDocument:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def parse_page_ranges(spec: str, total_pages: int) -> list[int]:
+    """"10-40,55" 같은 1부터 시작하는 페이지 범위 → 정렬된 0부터 시작 인덱스.
+
+    "10-"는 10페이지부터 끝까지, "-5"는 처음부터 5페이지까지.
+    """
+    pages: set[int] = set()
+    for part in spec.split(","):
+        m = _RANGE_PART.match(part)
+        if not m or not (m.group(1) or m.group(3)):
+            raise ValueError(f"invalid page range: {part.strip()!r}")
+        start = int(m.group(1)) if m.group(1) else 1
+        if m.group(2):
+            end = int(m.group(3)) if m.group(3) else total_pages
+        else:
+            end = start
+        if not 1 <= start <= end <= total_pages:
+            raise ValueError(f"page range {part.strip()!r} out of bounds (1-{total_pages})")
+        pages.update(range(start - 1, end))
+    return sorted(pages)
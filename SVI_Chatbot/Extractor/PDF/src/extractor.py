@@ -3,11 +3,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 
 import pymupdf
-import pymupdf4llm
-import pdfplumber
 
 from .models import (
     ImageData,
@@ -16,19 +14,45 @@ from .models import (
     TableData,
     ElementType,
 )
+from .ocr import OCROptions, OCRRouter
+from .pdf_source import PdfInput, as_source
 
 
 class PDFExtractor:
-    """PDF에서 텍스트, 테이블, 이미지를 추출한다."""
-
-    def __init__(self, pdf_path: str, output_dir: str = "./output"):
-        self.pdf_path = Path(pdf_path)
+    """PDF에서 텍스트, 테이블, 이미지를 추출한다.
+
+    pdf는 파일 경로 외에 bytes/memoryview/file-like도 받는다 (PDFSource 참고).
+    compact=True이면 raw_text와 elements(뷰어 시각화용)를 결과에 남기지 않는다.
+    대용량 문서를 CLI로 처리할 때 페이지 텍스트 사본을 1개로 줄인다.
+    ocr을 주면 텍스트 레이어 없이 이미지만 있는 페이지는 pymupdf4llm/pdfplumber 대신
+    OCR 풀로 보낸다 (텍스트 페이지는 기존 경로 그대로).
+    write_images=False이면 이미지 파일을 output_dir에 쓰지 않는다 (뷰어의 페이지 표시용).
+    Markdown에 이미지 링크가 빠지고 ImageData.filename은 쓰이지 않은 이름이 된다.
+    doc을 주면(DocumentPool에서 빌린 핸들 등) 문서를 새로 열지 않고 close()에서도 닫지 않는다.
+    """
+
+    def __init__(
+        self,
+        pdf: PdfInput,
+        output_dir: str = "./output",
+        compact: bool = False,
+        ocr: OCROptions | None = None,
+        write_images: bool = True,
+        doc: pymupdf.Document | None = None,
+    ):
+        self.source = as_source(pdf)
+        self.pdf_path = self.source.path
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        (self.output_dir / "images").mkdir(parents=True, exist_ok=True)
+        self.compact = compact
+        self.write_images = write_images
+        if write_images:
+            (self.output_dir / "images").mkdir(parents=True, exist_ok=True)
 
-        self.doc = pymupdf.open(str(self.pdf_path))
+        self._owns_doc = doc is None
+        self.doc = self.source.open_pymupdf() if doc is None else doc
         self.total_pages = len(self.doc)
+        self.ocr = OCRRouter(self.source, self.doc, ocr) if ocr else None
+        self._plumber = None  # 테이블용 pdfplumber 문서 (처음 필요할 때 열어 재사용)
 
     # ------------------------------------------------------------------
     # Public
@@ -39,23 +63,40 @@ class PDFExtractor:
         progress_callback: Callable[[int, int, PageResult], None] | None = None,
     ) -> list[PageResult]:
         """전체 페이지 추출. callback(현재, 전체, 결과)로 실시간 진행 표시."""
-        results: list[PageResult] = []
+        return list(self.iter_pages(progress_callback))
+
+    def iter_pages(
+        self,
+        progress_callback: Callable[[int, int, PageResult], None] | None = None,
+    ) -> Iterator[PageResult]:
+        """페이지를 하나씩 추출해 바로 넘긴다 (파싱/청킹 파이프라인용)."""
+        if self.ocr is not None:
+            self.ocr.prefetch(range(self.total_pages))
         for page_idx in range(self.total_pages):
             result = self.extract_page(page_idx)
-            results.append(result)
             if progress_callback:
                 progress_callback(page_idx + 1, self.total_pages, result)
-        return results
+            yield result
 
     def extract_page(self, page_index: int) -> PageResult:
-        """단일 페이지 추출 (뷰어에서 페이지 전환 시 호출)."""
+        """단일 페이지 추출 (뷰어에서 페이지 전환 시 호출).
+
+        compact=False이면 요소 목록을 위해 그 페이지만 레이아웃 분석한다. 헤딩 레벨 기준인
+        폰트 통계는 문서당 한 번 (긴 문서는 표본 페이지로) 계산해 캐시한다 (layout.font_stats).
+        """
+        if self.ocr is not None and self.ocr.needs_ocr(page_index):
+            return self._extract_scanned_page(page_index)
+
         # Pass 1: PyMuPDF4LLM → Markdown
+        # (import 1초 내외 - 레이아웃 모델 포함. 실제 추출할 때만 로드)
+        import pymupdf4llm
         md_text = pymupdf4llm.to_markdown(
-            doc=str(self.pdf_path),
+            doc=self.doc,
             pages=[page_index],
+            filename=self.source.name,
             hdr_info=False,
             ignore_code=True,
-            write_images=True,
+            write_images=self.write_images,
             image_path=str(self.output_dir / "images"),
             image_format="png",
             dpi=200,
@@ -78,6 +119,16 @@ class PDFExtractor:
         # 이미지 추출
         images = self._extract_images(page_index)
 
+        if self.compact:
+            return PageResult.model_construct(
+                page_number=page_index + 1,
+                markdown=md_text,
+                raw_text="",
+                tables=tables,
+                images=images,
+                elements=[],
+            )
+
         # 요소 목록 (뷰어 시각화용)
         elements = self._build_elements(page_index, raw_text, tables, images)
 
@@ -90,20 +141,70 @@ class PDFExtractor:
             elements=elements,
         )
 
-    def render_page(self, page_index: int, zoom: float = 2.0) -> bytes:
-        """PDF 페이지를 PNG 바이트로 렌더링 (뷰어 좌측 패널용)."""
+    def render_page(
+        self,
+        page_index: int,
+        zoom: float = 2.0,
+        clip: tuple[float, float, float, float] | None = None,
+    ) -> bytes:
+        """PDF 페이지를 PNG 바이트로 렌더링 (뷰어 좌측 패널용). clip을 주면 그 영역만."""
         page = self.doc[page_index]
         mat = pymupdf.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat)
+        pix = page.get_pixmap(matrix=mat, clip=pymupdf.Rect(clip) if clip else None)
         return pix.tobytes("png")
 
     def close(self):
-        self.doc.close()
+        if self.ocr is not None:
+            self.ocr.close()
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        if self._owns_doc:
+            self.doc.close()
 
     # ------------------------------------------------------------------
     # Private
     # ------------------------------------------------------------------
 
+    def _extract_scanned_page(self, page_index: int) -> PageResult:
+        """스캔 페이지: OCR 텍스트로 markdown 구성 (테이블 추출 생략).
+
+        텍스트 레이어가 조금이라도 있으면 (이미지 위 장 제목, 머리글 등) OCR 텍스트 앞에 둔다.
+        헤딩은 텍스트 레이어 폰트로 찾으므로 OCR 결과만으로는 제목 위치를 못 찾을 수 있다.
+        """
+        layer = self.doc[page_index].get_text().strip()
+        text = self.ocr.text(page_index)
+        if layer:
+            text = f"{layer}\n\n{text}"
+        md_text = self._build_fallback_markdown(text, [])
+        images = self._extract_images(page_index)
+
+        if self.compact:
+            return PageResult.model_construct(
+                page_number=page_index + 1,
+                markdown=md_text,
+                raw_text="",
+                tables=[],
+                images=images,
+                elements=[],
+            )
+
+        elements = [
+            PageElement(type=ElementType.TEXT, content=md_text, page=page_index + 1)
+        ] if md_text.strip() else []
+        elements += [
+            PageElement(type=ElementType.IMAGE, content=img.filename, page=page_index + 1, bbox=img.bbox)
+            for img in images
+        ]
+        return PageResult(
+            page_number=page_index + 1,
+            markdown=md_text,
+            raw_text=text,
+            tables=[],
+            images=images,
+            elements=elements,
+        )
+
     def _build_fallback_markdown(
         self, raw_text: str, tables: list[TableData]
     ) -> str:
@@ -111,7 +212,7 @@ class PDFExtractor:
         parts: list[str] = []
 
         # 테이블을 markdown으로 변환
-        table_markdowns = [_table_to_markdown(t) for t in tables if t.headers]
+        table_markdowns = [t.to_markdown() for t in tables if t.headers]
 
         # raw text를 정리하여 markdown으로
         lines = raw_text.split("\n")
@@ -133,13 +234,18 @@ class PDFExtractor:
         return "\n".join(parts)
 
     def _extract_tables(self, page_index: int) -> list[TableData]:
-        """pdfplumber로 테이블 추출 (merged cell 처리 우수)."""
-        results: list[TableData] = []
-        with pdfplumber.open(str(self.pdf_path)) as pdf:
-            if page_index >= len(pdf.pages):
-                return results
-            page = pdf.pages[page_index]
+        """pdfplumber로 테이블 추출 (merged cell 처리 우수).
 
+        pdf.pages는 처음 접근할 때 페이지 트리 전체를 파싱하므로 (활용 매뉴얼 134p 약 0.3s)
+        페이지마다 새로 열지 않고 추출기당 한 번 연 문서를 재사용한다.
+        """
+        results: list[TableData] = []
+        if self._plumber is None:
+            self._plumber = self.source.open_pdfplumber()
+        if page_index >= len(self._plumber.pages):
+            return results
+        page = self._plumber.pages[page_index]
+        try:
             found = page.find_tables()
             for table_obj in found:
                 raw = table_obj.extract()
@@ -156,6 +262,8 @@ class PDFExtractor:
                         bbox=bbox,
                     )
                 )
+        finally:
+            page.close()  # 페이지 객체 캐시 해제 (추출한 페이지만큼 쌓이지 않게)
         return results
 
     def _extract_images(self, page_index: int) -> list[ImageData]:
@@ -180,15 +288,18 @@ class PDFExtractor:
 
             ext = base_image.get("ext", "png")
             filename = f"page{page_index + 1}_img{img_idx + 1}.{ext}"
-            img_path = self.output_dir / "images" / filename
-            img_path.write_bytes(base_image["image"])
+            if self.write_images:
+                (self.output_dir / "images" / filename).write_bytes(base_image["image"])
 
+            # 페이지 위 배치 위치 (같은 이미지를 여러 번 그리면 첫 위치)
+            rects = page.get_image_rects(xref)
             results.append(
                 ImageData(
                     filename=filename,
                     page=page_index + 1,
                     width=w,
                     height=h,
+                    bbox=tuple(rects[0]) if rects else None,
                 )
             )
         return results
@@ -200,62 +311,28 @@ class PDFExtractor:
         tables: list[TableData],
         images: list[ImageData],
     ) -> list[PageElement]:
-        """페이지 내 감지된 요소 목록 생성."""
-        elements: list[PageElement] = []
-
-        # 텍스트 블록
-        page = self.doc[page_index]
-        blocks = page.get_text("dict")["blocks"]
-        for block in blocks:
-            if block["type"] == 0:  # text block
-                text = ""
-                for line in block.get("lines", []):
-                    for span in line.get("spans", []):
-                        text += span.get("text", "")
-                    text += "\n"
-                text = text.strip()
-                if text:
-                    bbox = tuple(block["bbox"])
-                    elements.append(
-                        PageElement(
-                            type=ElementType.TEXT,
-                            content=text,
-                            page=page_index + 1,
-                            bbox=bbox,
-                        )
-                    )
-
-        # 테이블
-        for table in tables:
-            md_table = _table_to_markdown(table)
-            elements.append(
-                PageElement(
-                    type=ElementType.TABLE,
-                    content=md_table,
-                    page=page_index + 1,
-                    bbox=table.bbox,
-                )
+        """페이지 내 감지된 요소 목록 생성 (HEADING/TEXT는 레이아웃 분석, 읽기 순서로 정렬)."""
+        extra = [
+            PageElement(
+                type=ElementType.TABLE,
+                content=table.to_markdown(),
+                page=page_index + 1,
+                bbox=table.bbox,
             )
-
-        # 이미지
-        for img in images:
-            elements.append(
-                PageElement(
-                    type=ElementType.IMAGE,
-                    content=img.filename,
-                    page=page_index + 1,
-                    bbox=img.bbox,
-                )
+            for table in tables
+        ]
+        extra += [
+            PageElement(
+                type=ElementType.IMAGE,
+                content=img.filename,
+                page=page_index + 1,
+                bbox=img.bbox,
             )
+            for img in images
+        ]
+        from .layout import DocumentLayout, font_stats  # numpy - 요소 목록이 필요할 때만 로드
 
-        return elements
-
+        stats = font_stats(self.doc, self.source.key)
+        layout = DocumentLayout.from_pages(self.doc, [page_index + 1], stats)
+        return layout.page_elements(page_index + 1, extra)
 
-def _table_to_markdown(table: TableData) -> str:
-    """TableData → Markdown 테이블 문자열."""
-    if not table.headers:
-        return ""
-    header_line = "| " + " | ".join(table.headers) + " |"
-    separator = "| " + " | ".join(["---"] * len(table.headers)) + " |"
-    rows = ["| " + " | ".join(row) + " |" for row in table.rows]
-    return "\n".join([header_line, separator] + rows)
@@ -0,0 +1,103 @@
+"""백그라운드 작업 - 진행 상황 스냅샷 + 최근 로그 + 취소"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+class BackgroundJob:
+    """fn(job, *args, **kwargs)를 별도 스레드에서 실행한다.
+
+    fn은 job.report()/job.log()로 진행 상황을 남기고, 페이지 사이마다
+    job.cancel_requested를 확인해 중단한다. UI는 snapshot()을 원하는 주기로
+    읽기만 하므로 갱신 빈도가 작업 속도와 무관하다. 로그는 최근 log_size줄만 유지한다.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        name: str = "",
+        log_size: int = 200,
+        **kwargs,
+    ):
+        self.name = name  # 작업 식별용 (예: pdf 경로)
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._progress = (0, 0)
+        self._message = ""
+        self._log: deque[str] = deque(maxlen=log_size)
+        self._log_total = 0
+        self._started = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundJob":
+        self._started = time.monotonic()
+        self._thread.start()
+        return self
+
+    # --- 작업 쪽 API ---
+
+    def report(self, done: int, total: int, message: str = "") -> None:
+        with self._lock:
+            self._progress = (done, total)
+            self._message = message
+
+    def log(self, line: str) -> None:
+        with self._lock:
+            self._log.append(line)
+            self._log_total += 1
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    # --- UI 쪽 API ---
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.done and self._cancel.is_set() and self.result is None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            done, total = self._progress
+            return {
+                "done": done,
+                "total": total,
+                "fraction": done / total if total else 0.0,
+                "message": self._message,
+                "log": list(self._log),
+                "log_total": self._log_total,
+                "elapsed": time.monotonic() - self._started if self._started else 0.0,
+            }
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        try:
+            self.result = self._fn(self, *self._args, **self._kwargs)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._done.set()
@@ -0,0 +1,395 @@
+"""레이아웃 분석 - span/블록을 NumPy 배열로 모아 헤딩 분류, 단(column) 감지, 읽기 순서"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Iterable, Sequence
+
+import numpy as np
+import pymupdf
+
+from .models import ElementType, PageElement
+
+# 이미지 블록 없이 텍스트만 (기본 dict 플래그는 이미지 바이트까지 복사해 10배 이상 느림)
+TEXT_FLAGS = pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES
+
+_SPAN_FIELDS = itemgetter("text", "size", "bbox")
+
+MERGE_MAX_CHARS = 50  # 연속 같은 크기 헤딩 span은 이 길이가 될 때까지 한 제목으로 병합
+
+SAMPLE_PAGES = 32  # 이보다 긴 문서는 고르게 뽑은 이만큼의 페이지로 폰트 통계를 추정
+STATS_CACHE_SIZE = 64  # 폰트 통계를 기억할 문서 수 (source.key별)
+
+_stats_cache: OrderedDict[str, tuple[dict[float, int], bool]] = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FontStats:
+    """헤딩 레벨 판정 기준 - 본문 크기와 헤딩 크기 (레벨 1, 2, ... 순).
+
+    exact=False이면 표본 페이지에서 추정한 값 (font_stats 참고).
+    """
+
+    body_size: float | None
+    heading_sizes: tuple[float, ...]
+    exact: bool = True
+
+    @classmethod
+    def from_chars(cls, chars: dict[float, int], max_heading_levels: int, exact: bool = True) -> FontStats:
+        """크기별 글자 수(처음 나온 순서) → 본문 = 글자 수 최대 (같으면 먼저 나온 크기)."""
+        if not chars:
+            return cls(None, (), exact)
+        body = max(chars, key=chars.get)
+        larger = sorted((size for size in chars if size > body), reverse=True)
+        return cls(body, tuple(larger[:max_heading_levels]), exact)
+
+
+def count_sizes(page_dict: dict, chars: dict[float, int]) -> None:
+    """페이지 dict의 span 크기별 글자 수를 chars에 더한다 (DocumentLayout과 같은 기준:
+    0.1 단위 반올림, 앞뒤 공백 제외 2글자 이상 span만)."""
+    for block in page_dict["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                n = len(span["text"].strip())
+                if n >= 2:
+                    size = round(span["size"], 1)
+                    chars[size] = chars.get(size, 0) + n
+
+
+def font_stats(doc: pymupdf.Document, key: str, max_heading_levels: int = 2) -> FontStats:
+    """문서 폰트 통계. key(source.key)별로 캐시한다.
+
+    캐시에 없으면 span 크기만 세는 패스를 돈다 (블록/배열은 만들지 않음). SAMPLE_PAGES
+    이하 문서는 전 페이지, 긴 문서는 처음/끝을 포함해 고르게 뽑은 SAMPLE_PAGES 페이지만
+    읽어 추정하므로 첫 호출 비용이 문서 길이에 비례하지 않는다. 추정값은 전 페이지를 읽은
+    쪽(SectionStream)이 remember_font_stats로 확정할 때까지 exact=False.
+    """
+    with _stats_lock:
+        cached = _stats_cache.get(key)
+        if cached is not None:
+            _stats_cache.move_to_end(key)
+    if cached is None:
+        n = len(doc)
+        exact = n <= SAMPLE_PAGES
+        pages = range(n) if exact else sorted({round(i * (n - 1) / (SAMPLE_PAGES - 1)) for i in range(SAMPLE_PAGES)})
+        chars: dict[float, int] = {}
+        for i in pages:
+            count_sizes(doc[i].get_text("dict", flags=TEXT_FLAGS), chars)
+        cached = (chars, exact)
+        remember_font_stats(key, chars, exact)
+    return FontStats.from_chars(cached[0], max_heading_levels, cached[1])
+
+
+def remember_font_stats(key: str, chars: dict[float, int], exact: bool = True) -> None:
+    """크기별 글자 수를 캐시에 넣는다. 추정값이 확정값을 덮어쓰지는 않는다."""
+    with _stats_lock:
+        cached = _stats_cache.get(key)
+        if cached is not None and cached[1] and not exact:
+            return
+        _stats_cache[key] = (chars, exact)
+        _stats_cache.move_to_end(key)
+        while len(_stats_cache) > STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+
+
+@dataclass
+class _Heading:
+    title: str
+    level: int
+    page: int  # 1부터
+    bbox: tuple[float, float, float, float]
+
+
+class DocumentLayout:
+    """문서(또는 일부 페이지)의 span/블록을 한 번 읽어 배열로 보관하고, 분류/정렬은 배열 연산으로 한다.
+
+    - 본문 크기: 가장 많은 글자 수를 차지하는 폰트 크기 (같으면 먼저 나온 크기)
+    - 헤딩: 본문보다 큰 크기 중 상위 max_heading_levels개 → 레벨 1, 2, ...
+      연속된 같은 크기 span(줄바꿈된 긴 제목, 사이에 본문 없음)은 하나로 병합
+    - 읽기 순서: 페이지마다 단 사이 빈 세로 띠를 찾고, 단을 가로지르는 블록으로
+      위아래 구역을 나눈 뒤 구역 → 단 → y → x 순
+
+    본문/헤딩 크기는 문서 전체 기준이라 stats(font_stats)를 주면 일부 페이지만 읽어도
+    전체 문서로 만든 레이아웃과 같은 결과를 낸다 (헤딩 병합은 페이지를 넘지 않음).
+    PDF 읽기(MuPDF 텍스트 페이지 생성)가 비용 대부분 (페이지당 약 8-12 ms)이다.
+    """
+
+    def __init__(
+        self,
+        page_dicts: Iterable[dict],
+        page_widths: Sequence[float],
+        max_heading_levels: int = 2,
+        stats: FontStats | None = None,
+        page_numbers: Sequence[int] | None = None,
+    ):
+        """page_dicts: 페이지별 page.get_text("dict") 결과 (page_numbers 순서, 기본 1, 2, ...).
+
+        stats가 없으면 주어진 페이지로 폰트 통계를 계산한다.
+        """
+        self.max_heading_levels = max_heading_levels
+        self.page_count = len(page_widths)
+        self.page_numbers = list(page_numbers) if page_numbers is not None else list(range(1, self.page_count + 1))
+        self.page_widths = np.asarray(page_widths, dtype=np.float32)
+        self._page_index = {p: i for i, p in enumerate(self.page_numbers)}
+        self._load(page_dicts)
+        self._classify(stats)
+
+    @classmethod
+    def from_document(cls, doc: pymupdf.Document, max_heading_levels: int = 2) -> DocumentLayout:
+        return cls(
+            (page.get_text("dict", flags=TEXT_FLAGS) for page in doc),
+            [page.rect.width for page in doc],
+            max_heading_levels,
+        )
+
+    @classmethod
+    def from_pages(
+        cls,
+        doc: pymupdf.Document,
+        page_numbers: Sequence[int],
+        stats: FontStats,
+        max_heading_levels: int = 2,
+    ) -> DocumentLayout:
+        """page_numbers(1부터) 페이지만 읽은 레이아웃 (헤딩 레벨은 stats 기준)."""
+        pages = [doc[p - 1] for p in page_numbers]
+        return cls(
+            (page.get_text("dict", flags=TEXT_FLAGS) for page in pages),
+            [page.rect.width for page in pages],
+            max_heading_levels,
+            stats,
+            page_numbers,
+        )
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    @property
+    def has_headings(self) -> bool:
+        return bool(self.heading_sizes)
+
+    def headings(self, page_number: int) -> list[PageElement]:
+        """페이지의 HEADING 요소 (읽기 순서)."""
+        return self.page_elements(page_number, text=False)
+
+    def page_elements(
+        self,
+        page_number: int,
+        extra: list[PageElement] = (),
+        text: bool = True,
+    ) -> list[PageElement]:
+        """페이지 요소 (HEADING + TEXT 블록 + extra)를 읽기 순서로.
+
+        전체가 헤딩 크기인 블록은 TEXT로 중복해 내보내지 않는다. extra(테이블/이미지)는
+        bbox가 있으면 같은 기준으로 정렬하고, 없으면 뒤에 붙인다.
+        """
+        elements = [
+            PageElement(
+                type=ElementType.HEADING, content=h.title, page=page_number, bbox=h.bbox, level=h.level
+            )
+            for h in self._headings.get(page_number, [])
+        ]
+        index = self._page_index[page_number]
+        if text:
+            lo, hi = self._block_range[index]
+            keep = np.flatnonzero(~self._block_is_heading[lo:hi]) + lo
+            elements += [
+                PageElement(
+                    type=ElementType.TEXT,
+                    content=self._block_text[i],
+                    page=page_number,
+                    bbox=tuple(self._block_bbox[i].tolist()),
+                )
+                for i in keep
+            ]
+        placed = elements + [e for e in extra if e.bbox]
+        if not placed:
+            return list(extra)
+        order = reading_order(
+            np.array([e.bbox for e in placed], dtype=np.float32),
+            float(self.page_widths[index]),
+        )
+        return [placed[i] for i in order] + [e for e in extra if not e.bbox]
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    def _load(self, page_dicts: Iterable[dict]) -> None:
+        """span/블록 속성을 평평한 리스트로 모은 뒤 배열로 (페이지 순회는 여기 1회)."""
+        rows: list[tuple[str, float, tuple]] = []  # (text, size, bbox)
+        span_block: list[int] = []
+        block_text: list[str] = []
+        block_bbox: list[tuple] = []
+        block_range: list[tuple[int, int]] = []
+        page_spans: list[int] = []
+
+        for page_dict in page_dicts:
+            first_block = len(block_text)
+            first_span = len(rows)
+            for block in page_dict["blocks"]:
+                if block["type"] != 0:
+                    continue
+                line_texts = []
+                for line in block.get("lines", []):
+                    spans = line.get("spans", [])
+                    rows += map(_SPAN_FIELDS, spans)
+                    line_texts.append("".join(s["text"] for s in spans))
+                span_block += [len(block_text)] * (len(rows) - len(span_block))
+                block_text.append("\n".join(line_texts).strip())
+                block_bbox.append(block["bbox"])
+            block_range.append((first_block, len(block_text)))
+            page_spans.append(len(rows) - first_span)
+
+        n = len(rows)
+        texts, sizes, bboxes = zip(*rows) if rows else ((), (), ())
+        self._span_text = [t.strip() for t in texts]
+        self._span_size = np.array([round(size, 1) for size in sizes], dtype=np.float64)
+        self._span_bbox = np.array(bboxes, dtype=np.float32).reshape(n, 4)
+        self._span_page = np.repeat(np.asarray(self.page_numbers, dtype=np.int32), page_spans)
+        self._span_block = np.array(span_block, dtype=np.int32)
+        self._span_len = np.fromiter(map(len, self._span_text), dtype=np.int32, count=n)
+        self._span_digit = np.fromiter(map(str.isdigit, self._span_text), dtype=bool, count=n)
+        self._block_text = block_text
+        self._block_bbox = np.array(block_bbox, dtype=np.float32).reshape(len(block_bbox), 4)
+        self._block_range = block_range
+
+    def _classify(self, stats: FontStats | None) -> None:
+        valid = self._span_len >= 2
+        if stats is None:
+            # 크기별 글자 수 (bincount, 처음 나온 순서) → 본문/헤딩 크기
+            sizes, first, inverse = np.unique(
+                self._span_size[valid], return_index=True, return_inverse=True
+            )
+            chars = np.bincount(inverse, weights=self._span_len[valid])
+            order = np.argsort(first)
+            stats = FontStats.from_chars(
+                dict(zip(sizes[order].tolist(), chars[order].tolist())), self.max_heading_levels
+            )
+        self.stats = stats
+        self.body_size: float | None = stats.body_size
+        self.heading_sizes: list[float] = list(stats.heading_sizes)
+        self._headings: dict[int, list[_Heading]] = {}
+        self._block_is_heading = np.zeros(len(self._block_text), dtype=bool)
+        if not valid.any() or not self.heading_sizes:
+            return
+
+        # span별 레벨 (0 = 헤딩 아님)
+        level = np.zeros(len(self._span_size), dtype=np.int8)
+        for i, size in enumerate(self.heading_sizes):
+            level[self._span_size == size] = i + 1
+        heading_span = valid & (level > 0)
+
+        # 블록의 모든 유효 span이 헤딩 크기면 TEXT 요소로 중복해 내보내지 않음
+        n_blocks = len(self._block_text)
+        valid_per_block = np.bincount(self._span_block[valid], minlength=n_blocks)
+        heading_per_block = np.bincount(self._span_block[heading_span], minlength=n_blocks)
+        self._block_is_heading = (valid_per_block > 0) & (heading_per_block == valid_per_block)
+
+        # 헤딩 후보 (숫자만인 span 제외) → 페이지/크기가 바뀌거나 사이에 본문 span이 있으면 새 제목
+        idx = np.flatnonzero(heading_span & ~self._span_digit)
+        if not len(idx):
+            return
+        page = self._span_page[idx]
+        size = self._span_size[idx]
+        body_seen = np.cumsum(valid & ~heading_span)[idx]
+        starts = np.r_[
+            True,
+            (page[1:] != page[:-1]) | (size[1:] != size[:-1]) | (body_seen[1:] != body_seen[:-1]),
+        ]
+
+        # 같은 크기 연속 구간 안에서는 누적 길이 제한만 순서대로 확인 (후보 span 수만큼)
+        current: _Heading | None = None
+        for i, is_start in zip(idx.tolist(), starts.tolist()):
+            text = self._span_text[i]
+            bbox = tuple(self._span_bbox[i].tolist())
+            if not is_start and len(current.title) < MERGE_MAX_CHARS:
+                current.title += " " + text
+                current.bbox = _union(current.bbox, bbox)
+                continue
+            current = _Heading(
+                title=text, level=int(level[i]), page=int(self._span_page[i]), bbox=bbox
+            )
+            self._headings.setdefault(current.page, []).append(current)
+
+
+def reading_order(
+    bboxes: np.ndarray,
+    page_width: float,
+    min_gap: float = 12.0,
+    min_column: float = 0.25,
+    max_columns: int = 3,
+) -> np.ndarray:
+    """bbox 배열 (n, 4) → 읽기 순서 인덱스.
+
+    단 감지: 폭이 텍스트 영역의 절반 미만인 블록으로 x축 점유 히스토그램을 만들고,
+    min_gap pt 이상 빈 구간 중 양쪽 블록이 나란히 있고 각각 텍스트 높이의 min_column
+    비율 이상을 채우는 곳만 단 사이 여백으로 본다 (가운데 정렬된 저자 블록, 표의 셀 열은 제외).
+    여백이 max_columns - 1개보다 많으면 본문 단이 아니라 표 격자로 보고 단 구분을 하지 않는다.
+    여백을 가로지르는 블록(전폭 제목/표)은 구역 경계가 된다.
+    """
+    n = len(bboxes)
+    if n < 2:
+        return np.arange(n)
+    x0, y0, x1, y1 = bboxes.T
+    gutters = _find_gutters(bboxes, page_width, min_gap, min_column)
+
+    if 0 < len(gutters) < max_columns:
+        col = np.searchsorted(gutters, (x0 + x1) / 2)
+        wide = ((x0[:, None] < gutters) & (x1[:, None] > gutters)).any(axis=1)
+    else:
+        col = np.zeros(n, dtype=np.intp)
+        wide = np.zeros(n, dtype=bool)
+    band = np.searchsorted(np.sort(y0[wide]), y0, side="right")
+    # 뒤 키가 우선: 구역 → 전폭 블록 먼저 → 단 → y → x
+    return np.lexsort((x0, y0, col, ~wide, band))
+
+
+def _find_gutters(
+    bboxes: np.ndarray, page_width: float, min_gap: float, min_column: float
+) -> np.ndarray:
+    """단 사이 빈 세로 띠의 중심 x 좌표 (정렬됨)."""
+    x0, y0, x1, y1 = bboxes.T
+    lo, hi = float(x0.min()), float(x1.max())
+    narrow = (x1 - x0) < (hi - lo) / 2
+    if narrow.sum() < 2:
+        return np.empty(0, dtype=np.float32)
+
+    width = int(np.ceil(max(page_width, hi))) + 2
+    coverage = np.zeros(width + 1, dtype=np.int32)
+    np.add.at(coverage, np.clip(np.floor(x0[narrow]).astype(np.intp), 0, width), 1)
+    np.add.at(coverage, np.clip(np.ceil(x1[narrow]).astype(np.intp), 0, width), -1)
+    empty = np.cumsum(coverage)[:width] == 0
+
+    # 빈 구간 [start, end) - 첫/마지막 블록 바깥 여백은 제외
+    padded = np.concatenate(([0], empty.view(np.int8), [0]))  # np.diff(prepend/append)보다 빠름
+    edges = padded[1:] - padded[:-1]
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    inner = (starts > np.floor(x0[narrow].min())) & (ends < np.ceil(x1[narrow].max()))
+    wide_enough = (ends - starts) >= min_gap
+    centers = ((starts + ends) / 2)[inner & wide_enough].astype(np.float32)
+    if not len(centers):
+        return centers
+
+    # 후보 여백마다 왼쪽/오른쪽 블록 중 y 구간이 겹치는 쌍이 있는지 (후보 x 블록 x 블록)
+    nx0, ny0, nx1, ny1 = x0[narrow], y0[narrow], x1[narrow], y1[narrow]
+    left = nx1[None, :] <= centers[:, None]  # (후보, 블록)
+    right = nx0[None, :] >= centers[:, None]
+    overlap = (ny0[:, None] < ny1[None, :]) & (ny0[None, :] < ny1[:, None])  # (블록, 블록)
+    side_by_side = (left[:, :, None] & right[:, None, :] & overlap[None]).any(axis=(1, 2))
+    # 각 쪽 블록 높이 합이 텍스트 높이의 min_column 이상 (짧은 셀 열이 아닌 본문 단)
+    heights = ny1 - ny0
+    tall = min_column * float(y1.max() - y0.min())
+    tall_enough = ((left * heights).sum(axis=1) >= tall) & ((right * heights).sum(axis=1) >= tall)
+    return centers[side_by_side & tall_enough]
+
+
+def _union(a: tuple, b: tuple) -> tuple[float, float, float, float]:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
@@ -19,6 +19,15 @@ class TableData(BaseModel):
     page: int
     bbox: tuple[float, float, float, float] | None = None
 
+    def to_markdown(self, start: int = 0, end: int | None = None) -> str:
+        """Markdown 테이블 문자열. start/end로 행 범위를 지정하면 헤더를 반복해 붙인다."""
+        if not self.headers:
+            return ""
+        header_line = "| " + " | ".join(self.headers) + " |"
+        separator = "| " + " | ".join(["---"] * len(self.headers)) + " |"
+        rows = ["| " + " | ".join(row) + " |" for row in self.rows[start:end]]
+        return "\n".join([header_line, separator] + rows)
+
 
 class ImageData(BaseModel):
     filename: str
@@ -33,6 +42,7 @@ class PageElement(BaseModel):
     content: str
     page: int
     bbox: tuple[float, float, float, float] | None = None
+    level: int | None = None  # HEADING 레벨 (1=대제목, 2=중제목, ...)
 
 
 class PageResult(BaseModel):
@@ -51,6 +61,7 @@ class Section(BaseModel):
     content: str = ""
     start_page: int = 0
     end_page: int = 0
+    key: str = ""  # 문서 안에서 고정된 섹션 키 (청크 id용, 페이지 범위 추출에서도 같은 값)
 
 
 class Chunk(BaseModel):
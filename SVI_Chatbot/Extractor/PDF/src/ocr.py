@@ -0,0 +1,208 @@
+"""스캔 페이지 감지 + OCR 라우팅 - 별도 프로세스 풀, 페이지 지문 기반 캐시"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pymupdf
+
+from .pdf_source import PDFSource
+
+
+@dataclass
+class OCROptions:
+    """OCR 설정.
+
+    engine: "tesseract" (PyMuPDF OCR, Tesseract 설치 필요) 또는 "패키지.모듈:함수".
+    사용자 함수는 fn(png_bytes, language) -> str 형태로, 워커 프로세스에서 import된다.
+    """
+    engine: str = "tesseract"
+    dpi: int = 300
+    language: str = "kor+eng"
+    workers: int = 2
+    cache_dir: str | None = "./output/ocr_cache"
+    min_image_coverage: float = 0.5  # 이미지가 페이지의 이 비율 이상을 덮고
+    max_text_ratio: float = 0.1  # 텍스트 블록 면적이 이미지 면적의 이 비율 미만이며
+    max_text_chars: int = 100  # 텍스트 레이어가 이보다 짧으면 스캔 페이지
+
+
+@dataclass
+class PageScan:
+    text_chars: int
+    text_coverage: float  # 텍스트 블록 면적 / 페이지 면적
+    image_coverage: float  # 이미지 면적 / 페이지 면적
+    needs_ocr: bool
+
+
+def scan_page(page: pymupdf.Page, options: OCROptions | None = None) -> PageScan:
+    """텍스트 레이어와 이미지 면적만 보는 빠른 분류 (렌더링/레이아웃 분석 없음).
+
+    이미지가 페이지 대부분을 덮고 텍스트 블록 면적이 그에 비해 작으면 스캔 페이지로 본다
+    (머리글/쪽 번호/도장 텍스트만 있는 스캔도 포함). 글자 수는 보조 신호로, 면적은 작아도
+    max_text_chars 이상 글자가 있는 페이지(사진 옆 작은 글씨 본문 등)는 텍스트 경로에 둔다.
+    """
+    options = options or OCROptions()
+    rect = page.rect
+    area = abs(rect) or 1.0
+
+    text_chars = 0
+    text_area = 0.0
+    for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+        if block_type == 0:
+            text_chars += len(text.strip())
+            text_area += abs(pymupdf.Rect(x0, y0, x1, y1) & rect)
+
+    image_area = sum(abs(pymupdf.Rect(info["bbox"]) & rect) for info in page.get_image_info())
+
+    text_coverage = min(1.0, text_area / area)
+    image_coverage = min(1.0, image_area / area)
+    return PageScan(
+        text_chars=text_chars,
+        text_coverage=text_coverage,
+        image_coverage=image_coverage,
+        needs_ocr=(
+            image_coverage >= options.min_image_coverage
+            and text_coverage < options.max_text_ratio * image_coverage
+            and text_chars < options.max_text_chars
+        ),
+    )
+
+
+def page_fingerprint(doc: pymupdf.Document, page: pymupdf.Page) -> str:
+    """페이지 내용 스트림 + 이미지 원본 스트림 + 크기/회전의 해시.
+
+    같은 스캔 페이지가 다른 파일(개정판, 재업로드)에 있어도 OCR 캐시를 공유한다.
+    """
+    h = hashlib.sha1()
+    h.update(page.read_contents())
+    for img in page.get_images(full=True):
+        h.update(doc.xref_stream_raw(img[0]) or b"")
+    h.update(f"{tuple(page.rect)}|{page.rotation}".encode())
+    return h.hexdigest()
+
+
+class OCRRouter:
+    """문서 하나의 스캔 페이지를 OCR 풀로 보낸다.
+
+    분류(scan)와 지문 계산은 호출 스레드에서, 렌더링 + OCR은 워커 프로세스에서 실행한다.
+    prefetch()로 여러 페이지를 먼저 넣어 두면 텍스트 페이지를 추출하는 동안 OCR이 병렬로 진행된다.
+    풀은 첫 OCR 요청 때 만들어지므로 스캔 페이지가 없는 문서는 비용이 없다.
+    """
+
+    def __init__(self, source: PDFSource, doc: pymupdf.Document, options: OCROptions | None = None):
+        self.source = source
+        self.doc = doc
+        self.options = options or OCROptions()
+        if self.options.engine == "tesseract":
+            pymupdf.get_tessdata()  # Tesseract가 없으면 첫 페이지가 아니라 여기서 바로 실패
+        self.cache_dir = Path(self.options.cache_dir) if self.options.cache_dir else None
+        self.cache_hits = 0
+        self._scans: dict[int, PageScan] = {}
+        self._futures: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+
+    def needs_ocr(self, page_index: int) -> bool:
+        scan = self._scans.get(page_index)
+        if scan is None:
+            scan = self._scans[page_index] = scan_page(self.doc[page_index], self.options)
+        return scan.needs_ocr
+
+    def prefetch(self, page_indices) -> int:
+        """스캔 페이지를 미리 OCR 풀에 넣는다. 반환: 스캔 페이지 수."""
+        n = 0
+        for i in page_indices:
+            if self.needs_ocr(i):
+                self.submit(i)
+                n += 1
+        return n
+
+    def submit(self, page_index: int) -> Future:
+        with self._lock:
+            fut = self._futures.get(page_index)
+            if fut is not None:
+                return fut
+
+            cache_path = self._cache_path(page_index)
+            if cache_path is not None and cache_path.exists():
+                fut = Future()
+                fut.set_result(cache_path.read_text(encoding="utf-8"))
+                self.cache_hits += 1
+            else:
+                fut = self._get_pool().submit(_ocr_page, page_index)
+                if cache_path is not None:
+                    fut.add_done_callback(lambda f, p=cache_path: _write_cache(p, f))
+            self._futures[page_index] = fut
+            return fut
+
+    def text(self, page_index: int) -> str:
+        """OCR 텍스트 (결과를 받으면 메모리에서는 놓는다 - 디스크 캐시에 남음)."""
+        text = self.submit(page_index).result()
+        with self._lock:
+            self._futures.pop(page_index, None)
+        return text
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            pdf = self.source.data if self.source.data is not None else str(self.source.path)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.options.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(pdf, self.options),
+            )
+        return self._pool
+
+    def _cache_path(self, page_index: int) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        o = self.options
+        fp = page_fingerprint(self.doc, self.doc[page_index])
+        key = hashlib.sha1(f"{fp}|{o.engine}|{o.dpi}|{o.language}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+
+
+def _write_cache(path: Path, fut: Future) -> None:
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(fut.result(), encoding="utf-8")
+    tmp.replace(path)
+
+
+# ------------------------------------------------------------------
+# Worker (프로세스 풀)
+# ------------------------------------------------------------------
+
+_worker_doc: pymupdf.Document | None = None
+_worker_options: OCROptions | None = None
+
+
+def _init_worker(pdf: str | bytes, options: OCROptions) -> None:
+    global _worker_doc, _worker_options
+    _worker_doc = PDFSource(pdf).open_pymupdf()
+    _worker_options = options
+
+
+def _ocr_page(page_index: int) -> str:
+    page = _worker_doc[page_index]
+    o = _worker_options
+    if o.engine == "tesseract":
+        textpage = page.get_textpage_ocr(dpi=o.dpi, full=True, language=o.language)
+        return page.get_text(textpage=textpage)
+    module, _, func = o.engine.partition(":")
+    engine = getattr(importlib.import_module(module), func)
+    png = page.get_pixmap(dpi=o.dpi).tobytes("png")
+    return engine(png, o.language)
@@ -0,0 +1,64 @@
+"""뷰어 요소 검사 - 캐시된 페이지 래스터 위에 요소 bbox를 SVG로 겹쳐 그림"""
+
+from __future__ import annotations
+
+import base64
+import html
+from typing import Iterable
+
+from .models import ElementType
+
+# 요소 종류별 테두리 색
+ELEMENT_COLORS = {
+    ElementType.TEXT: "#3478f6",
+    ElementType.TABLE: "#e65028",
+    ElementType.IMAGE: "#28aa5a",
+    ElementType.HEADING: "#a03cc8",
+}
+SELECTED_COLOR = "#ffc800"
+
+IMAGE_MIME = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+Box = tuple[float, float, float, float]
+
+
+def data_uri(image: bytes, fmt: str) -> str:
+    """미디어 URL을 쓸 수 없을 때(Streamlit 런타임 밖) 이미지를 HTML에 직접 넣는 URI."""
+    return f"data:{IMAGE_MIME[fmt]};base64,{base64.b64encode(image).decode('ascii')}"
+
+
+def overlay_html(
+    image_url: str,
+    page_size: tuple[float, float],
+    boxes: Iterable[tuple[Box, ElementType, str]],
+    selected: int | None = None,
+) -> str:
+    """렌더 결과(image_url) + bbox SVG 레이어 HTML. 박스는 (bbox, 종류, 툴팁 텍스트).
+
+    이미지를 디코딩/재인코딩하지 않는다 (서버에서 그리면 PNG 인코딩이 페이지 렌더링보다 느림).
+    래스터는 URL로만 참조하므로 요소 선택으로 다시 그릴 때는 SVG만 바뀐다.
+    SVG viewBox를 페이지 크기(pt)로 두므로 bbox 좌표를 배율과 무관하게 그대로 쓴다.
+    selected 번째 상자는 강조하고, 각 상자에 1부터 시작하는 번호를 붙인다.
+    """
+    w, h = page_size
+    shapes: list[str] = []
+    for i, (bbox, kind, title) in enumerate(boxes):
+        x0, y0, x1, y1 = bbox
+        is_sel = i == selected
+        color = SELECTED_COLOR if is_sel else ELEMENT_COLORS.get(kind, "#808080")
+        shapes.append(
+            f'<g><title>{html.escape(title)}</title>'
+            f'<rect x="{x0:.1f}" y="{y0:.1f}" width="{x1 - x0:.1f}" height="{y1 - y0:.1f}" '
+            f'fill="{color}" fill-opacity="{0.2 if is_sel else 0.04}" stroke="{color}" '
+            f'stroke-width="{2.5 if is_sel else 1}"/>'
+            f'<text x="{x0 + 1:.1f}" y="{y0 + 8:.1f}" font-size="8" font-family="sans-serif" '
+            f'fill="{color}" font-weight="bold">{i + 1}</text></g>'
+        )
+    return (
+        '<div style="position:relative;width:100%">'
+        f'<img src="{html.escape(image_url)}" style="width:100%;display:block"/>'
+        f'<svg viewBox="0 0 {w:.1f} {h:.1f}" preserveAspectRatio="none" '
+        'style="position:absolute;left:0;top:0;width:100%;height:100%">'
+        + "".join(shapes)
+        + "</svg></div>"
+    )
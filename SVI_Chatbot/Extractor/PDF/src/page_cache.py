@@ -0,0 +1,118 @@
+"""뷰어용 페이지 결과 캐시 - 이웃 페이지 백그라운드 prefetch 포함"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+
+class PageCache:
+    """(문서, 페이지, 종류, ...) 키 → 결과 캐시.
+
+    값은 Future로 보관하므로 prefetch 중인 페이지를 요청하면 중복 계산 없이
+    완료를 기다린다. 아직 시작되지 않은 prefetch는 예약한 쪽이 cancel()로 취소할 수 있다.
+    캐시는 세션 간 공유되므로 취소는 prefetch()가 돌려준 Future 단위로만 한다.
+    """
+
+    def __init__(self, workers: int = 2, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        # cancel() 중 done 콜백(_discard)이 같은 스레드에서 락을 다시 잡으므로 RLock
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[tuple, Future] = OrderedDict()
+
+    def get(self, key: tuple, fn: Callable[..., Any], *args) -> tuple[Any, bool]:
+        """결과 반환 (없으면 호출 스레드에서 바로 계산). 반환: (결과, 캐시 적중 여부).
+
+        기다리던 prefetch가 (예약한 세션에 의해) 취소되면 다시 계산한다.
+        """
+        while True:
+            with self._lock:
+                fut = self._entries.get(key)
+                if fut is not None and (fut.cancelled() or (fut.done() and fut.exception())):
+                    del self._entries[key]
+                    fut = None
+                if fut is None:
+                    fut = Future()
+                    fut.set_running_or_notify_cancel()
+                    self._put(key, fut)
+                    owner = True
+                else:
+                    self._entries.move_to_end(key)
+                    owner = False
+                hit = not owner and fut.done()
+                if hit:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+            if owner:
+                try:
+                    fut.set_result(fn(*args))
+                except BaseException as e:
+                    fut.set_exception(e)
+                    self._discard(key, fut)
+                    raise
+                return fut.result(), hit
+            try:
+                return fut.result(), hit
+            except CancelledError:
+                continue
+
+    def prefetch(
+        self, key: tuple, fn: Callable[..., Any], *args, keep: bool = True
+    ) -> Future | None:
+        """백그라운드 계산 예약. 새로 예약한 Future 반환 (이미 있거나 진행 중이면 None).
+
+        keep=False이면 완료 후 항목을 지운다 (fn이 자체 캐시에 결과를 넣는 경우).
+        """
+        with self._lock:
+            if key in self._entries:
+                return None
+            fut = self._pool.submit(fn, *args)
+            self._put(key, fut)
+        if not keep:
+            fut.add_done_callback(lambda f: self._discard(key, f))
+        return fut
+
+    def cancel(self, futures: Iterable[tuple[tuple, Future]]) -> int:
+        """prefetch()가 돌려준 (키, Future) 중 아직 시작 안 된 것 취소. 취소된 개수 반환.
+
+        다른 세션이 예약한 작업은 건드리지 않는다.
+        """
+        cancelled = 0
+        with self._lock:
+            for key, fut in futures:
+                if self._entries.get(key) is fut and fut.cancel():
+                    self._entries.pop(key, None)  # keep=False 항목은 done 콜백이 이미 지움
+                    cancelled += 1
+        return cancelled
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for fut in self._entries.values() if not fut.done())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    def _discard(self, key: tuple, fut: Future) -> None:
+        with self._lock:
+            if self._entries.get(key) is fut:
+                del self._entries[key]
+
+    def _put(self, key: tuple, fut: Future) -> None:
+        self._entries[key] = fut
+        # 오래된 완료 항목부터 제거 (진행 중인 항목은 유지)
+        while len(self._entries) > self.max_entries:
+            old_key, old = next(iter(self._entries.items()))
+            if not old.done():
+                break
+            del self._entries[old_key]
@@ -0,0 +1,101 @@
+"""PDF 입력 - 파일 경로 또는 메모리 버퍼(bytes, memoryview, file-like)"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Union
+
+if TYPE_CHECKING:
+    import pymupdf
+
+PdfInput = Union[str, Path, bytes, bytearray, memoryview, BinaryIO, "PDFSource"]
+
+
+class PDFSource:
+    """하나의 PDF를 PyMuPDF / pdfplumber / pypdf로 여는 공통 입력.
+
+    메모리 입력은 bytes 하나로 보관하고 각 라이브러리에 같은 버퍼를 넘긴다
+    (BytesIO(bytes)는 쓰기 전까지 복사하지 않는다). key는 내용 해시라서
+    같은 파일을 다른 경로/업로드로 열어도 캐시를 공유한다.
+    """
+
+    def __init__(self, data: PdfInput, name: str | None = None):
+        self.path: Path | None = None
+        self.data: bytes | None = None
+
+        if isinstance(data, (str, Path)):
+            self.path = Path(data)
+        elif isinstance(data, bytes):
+            self.data = data
+        elif isinstance(data, memoryview):
+            # bytes 전체를 가리키는 view면 원본 bytes를 그대로 사용
+            obj = data.obj
+            self.data = obj if isinstance(obj, bytes) and data.nbytes == len(obj) else data.tobytes()
+        elif isinstance(data, bytearray):
+            self.data = bytes(data)
+        elif hasattr(data, "read"):
+            self.data = data.read()
+        else:
+            raise TypeError(f"unsupported PDF input: {type(data).__name__}")
+
+        if name is None:
+            name = self.path.name if self.path else getattr(data, "name", None) or "document.pdf"
+        self.name = Path(str(name)).name
+        self._key: str | None = None
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+    @property
+    def key(self) -> str:
+        """내용 해시 (캐시 키)."""
+        if self._key is None:
+            h = hashlib.sha1()
+            if self.data is not None:
+                h.update(self.data)
+            else:
+                with open(self.path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        h.update(block)
+            self._key = h.hexdigest()[:16]
+        return self._key
+
+    def exists(self) -> bool:
+        return self.data is not None or self.path.exists()
+
+    def open_pymupdf(self) -> pymupdf.Document:
+        import pymupdf
+        if self.data is not None:
+            return pymupdf.open(stream=self.data, filetype="pdf")
+        return pymupdf.open(str(self.path))
+
+    def open_pdfplumber(self):
+        import pdfplumber
+        return pdfplumber.open(self._stream())
+
+    def open_pypdf(self):
+        from pypdf import PdfReader
+        return PdfReader(self._stream())
+
+    def _stream(self) -> str | io.BytesIO:
+        return io.BytesIO(self.data) if self.data is not None else str(self.path)
+
+    def __repr__(self) -> str:
+        where = str(self.path) if self.path else f"<{len(self.data)} bytes>"
+        return f"PDFSource({self.name!r}, {where})"
+
+
+def as_source(pdf: PdfInput, name: str | None = None) -> PDFSource:
+    return pdf if isinstance(pdf, PDFSource) else PDFSource(pdf, name)
+
+
+def source_key(pdf: PdfInput) -> str:
+    """캐시/풀 키. PDFSource는 내용 해시, 경로는 경로 문자열 (매번 해시하지 않도록)."""
+    if isinstance(pdf, PDFSource):
+        return pdf.key
+    if isinstance(pdf, (str, Path)):
+        return str(pdf)
+    return as_source(pdf).key
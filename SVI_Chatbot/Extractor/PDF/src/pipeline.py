@@ -0,0 +1,41 @@
+"""추출 → 구조 파싱 → 청킹 파이프라인 (CLI/서비스/감시 데몬 공용)"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from .chunker import PDFChunker
+from .document import LazyDocument
+from .models import Chunk, PageResult, Section
+from .ocr import OCROptions
+from .pdf_source import PdfInput, as_source
+from .structure_parser import StructureParser
+
+
+def stream_chunks(
+    pdf: PdfInput,
+    output_dir: str = "./output",
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    chunk_workers: int = 1,
+    pages: list[int] | None = None,
+    ocr: OCROptions | None = None,
+    progress_callback: Callable[[int, int, PageResult], None] | None = None,
+    on_section: Callable[[Section], None] | None = None,
+) -> Iterator[Chunk]:
+    """PDF 하나를 페이지 단위 파이프라인으로 처리해 청크를 생성되는 대로 내보낸다.
+
+    페이지 추출 → 증분 구조 파싱 → 청킹이 페이지마다 이어지고, 헤딩 레벨 기준인 폰트
+    통계는 캐시(source.key별)나 표본 페이지(최대 layout.SAMPLE_PAGES)에서 가져오므로 첫
+    청크까지의 시간이 문서 길이와 무관하다. 표본 추정 레벨이 전체 문서와 다르면 끝에서
+    경고하고 확정값을 캐시한다 (StructureParser 참고). 페이지 결과는 문서 전체만큼 쌓아
+    두지 않는다. pages(0부터 시작 인덱스)를 주면 해당 페이지만 추출/파싱한다.
+    ocr은 PDFExtractor 참고.
+    """
+    source = as_source(pdf)
+    sections = StructureParser(source).stream()  # 폰트 통계 (캐시 또는 표본 페이지)
+    chunker = PDFChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap, workers=chunk_workers)
+
+    with LazyDocument(source, output_dir, compact=True, ocr=ocr) as doc:
+        results = doc.pages(pages, progress_callback, memoize=False)
+        yield from chunker.chunk_stream(results, sections, source=source.stem, on_section=on_section)
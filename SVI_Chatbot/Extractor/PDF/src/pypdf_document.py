@@ -0,0 +1,85 @@
+"""LangChain 모드 - 문서당 pypdf 파싱 1회 공유 + RecursiveCharacterTextSplitter 청킹"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+from .models import Chunk
+from .pdf_source import PdfInput, as_source
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+
+class PyPDFDocument:
+    """pypdf PdfReader를 문서당 한 번만 만들고 페이지 텍스트를 기억한다.
+
+    PyPDFLoader(PyPDFParser)는 호출할 때마다 문서 전체를 다시 파싱하므로, 뷰어의 페이지
+    표시와 Extract All이 같은 reader/텍스트를 쓰도록 이 객체를 공유한다.
+    PdfReader는 스트림 위치를 바꾸며 읽으므로 동시 접근은 락으로 직렬화한다.
+    """
+
+    def __init__(self, pdf: PdfInput):
+        self.source = as_source(pdf)
+        self.reader = self.source.open_pypdf()
+        self.total_pages = len(self.reader.pages)
+        self._lock = threading.Lock()
+        self._texts: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self.total_pages
+
+    def page_text(self, page_index: int) -> str:
+        """pypdf 페이지 텍스트 (PyPDFParser 기본 모드와 같은 extract_text())."""
+        if not 0 <= page_index < self.total_pages:
+            return ""
+        text = self._texts.get(page_index)
+        if text is None:
+            with self._lock:
+                text = self._texts.get(page_index)
+                if text is None:
+                    text = self._texts[page_index] = (
+                        self.reader.pages[page_index].extract_text() or ""
+                    )
+        return text
+
+    def page_label(self, page_index: int) -> str:
+        with self._lock:
+            return self.reader.page_labels[page_index]
+
+    def documents(self, pages: Iterable[int] | None = None) -> list[Document]:
+        """PyPDFParser(mode="page")와 같은 형태의 LangChain Document 목록 (page는 0부터)."""
+        from langchain_core.documents import Document
+
+        pages = range(self.total_pages) if pages is None else pages
+        base = {"source": self.source.name, "total_pages": self.total_pages}
+        return [
+            Document(
+                page_content=self.page_text(i).strip(),
+                metadata=base | {"page": i, "page_label": self.page_label(i)},
+            )
+            for i in pages
+        ]
+
+
+def chunk_documents(
+    docs: list[Document],
+    source: str = "",
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+) -> list[Chunk]:
+    """RecursiveCharacterTextSplitter로 분할해 Chunk로 변환 (기존 LangChain 모드와 같은 id 규칙)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [
+        Chunk(
+            id=hashlib.md5(f"{source}_{i}".encode()).hexdigest()[:12],
+            content=sd.page_content,
+            metadata=sd.metadata,
+            token_count=max(1, len(sd.page_content) // 2),
+        )
+        for i, sd in enumerate(splitter.split_documents(docs))
+    ]
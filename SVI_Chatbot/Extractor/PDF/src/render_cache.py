@@ -0,0 +1,270 @@
+"""뷰어 페이지 렌더 캐시 - 메모리 LRU + 디스크 LRU + 썸네일 (용량 상한), 영역(clip) 렌더링"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+import pymupdf
+
+from .doc_pool import DocumentPool
+from .pdf_source import PdfInput, as_source, source_key
+
+
+IMAGE_FORMATS = ("png", "jpeg", "webp")
+THUMBNAIL_ZOOM = 0.25
+
+_MB = 1024 * 1024
+
+
+class _LRUBytes:
+    """바이트 용량 상한이 있는 메모리 LRU."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, key: tuple) -> bytes | None:
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._items[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _DiskLRU:
+    """디렉터리 기반 LRU. 파일명은 키 해시, 순서는 mtime으로 복원.
+
+    락은 인덱스 갱신에만 잡고 파일 읽기/쓰기/삭제는 락 밖에서 한다. 축출된 파일을
+    다른 스레드가 읽는 중이면 그 읽기는 실패로 처리된다 (get이 None, 인덱스에서 제거).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._files: OrderedDict[str, int] = OrderedDict()
+        directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(directory.iterdir(), key=lambda p: p.stat().st_mtime):
+            if path.is_file():
+                self._files[path.name] = path.stat().st_size
+                self.size += self._files[path.name]
+
+    def get(self, name: str) -> bytes | None:
+        with self._lock:
+            if name not in self._files:
+                return None
+        try:
+            data = (self.directory / name).read_bytes()
+        except OSError:
+            with self._lock:
+                self.size -= self._files.pop(name, 0)
+            return None
+        with self._lock:
+            if name in self._files:
+                self._files.move_to_end(name)
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        tmp = self.directory / f".{name}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.directory / name)
+        evicted: list[str] = []
+        with self._lock:
+            self.size -= self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                old, old_size = self._files.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old)
+        for old in evicted:
+            (self.directory / old).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+class RenderCache:
+    """페이지 렌더 결과 캐시.
+
+    조회 순서: 메모리(LRU, max_memory_bytes) → 디스크(LRU, max_disk_bytes) → 렌더링.
+    PDFSource 입력은 내용 해시로, 경로 입력은 경로 + 크기/수정 시각으로 디스크 키를 만든다.
+    같은 페이지를 동시에 요청하면 렌더링은 한 번만 수행된다.
+    clip(페이지 좌표 bbox)을 주면 그 영역만 렌더링한다 - 고배율 확대 비용이 영역 크기에 비례.
+    """
+
+    def __init__(
+        self,
+        disk_dir: str | Path | None = "./output/render_cache",
+        max_memory_bytes: int = 128 * _MB,
+        max_disk_bytes: int = 1024 * _MB,
+        max_thumbnail_bytes: int = 16 * _MB,
+        jpeg_quality: int = 85,
+        doc_pool: DocumentPool | None = None,
+    ):
+        self.jpeg_quality = jpeg_quality
+        self.doc_pool = doc_pool
+        self._memory = _LRUBytes(max_memory_bytes)
+        self._thumbs = _LRUBytes(max_thumbnail_bytes)
+        self._disk = _DiskLRU(Path(disk_dir), max_disk_bytes) if disk_dir else None
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple, Future] = {}
+        self._hits = {"memory": 0, "disk": 0, "render": 0}
+        self._render_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    def get(
+        self,
+        pdf: PdfInput,
+        page_index: int,
+        zoom: float = 2.0,
+        fmt: str = "png",
+        clip: tuple[float, float, float, float] | None = None,
+    ) -> tuple[bytes, str]:
+        """렌더 이미지 반환. 반환: (이미지 바이트, 적중 계층: memory/disk/render)."""
+        return self._get(self._memory, pdf, page_index, zoom, fmt, use_disk=True, clip=clip)
+
+    def thumbnail(self, pdf: PdfInput, page_index: int) -> bytes:
+        """페이지 스트립용 저해상도 JPEG (메모리 전용 계층)."""
+        data, _ = self._get(
+            self._thumbs, pdf, page_index, THUMBNAIL_ZOOM, "jpeg", use_disk=False
+        )
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            renders = self._hits["render"]
+            return {
+                "memory_bytes": self._memory.size,
+                "memory_limit": self._memory.max_bytes,
+                "memory_entries": len(self._memory),
+                "thumbnail_bytes": self._thumbs.size,
+                "disk_bytes": self._disk.size if self._disk is not None else 0,
+                "disk_entries": len(self._disk) if self._disk is not None else 0,
+                "hits": dict(self._hits),
+                "avg_render_ms": self._render_seconds / renders * 1000 if renders else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    def _get(
+        self,
+        tier: _LRUBytes,
+        pdf: PdfInput,
+        page_index: int,
+        zoom: float,
+        fmt: str,
+        use_disk: bool,
+        clip: tuple[float, float, float, float] | None = None,
+    ) -> tuple[bytes, str]:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"unsupported image format: {fmt}")
+        if clip is not None:
+            clip = tuple(round(v, 1) for v in clip)
+        key = (source_key(pdf), page_index, zoom, fmt, clip)
+
+        with self._lock:
+            data = tier.get(key)
+            if data is not None:
+                self._hits["memory"] += 1
+                return data, "memory"
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+
+        if not owner:
+            # 진행 중인 디스크 읽기/렌더링을 기다린 경우 - 그 계층을 그대로 보고 (적중 아님)
+            return fut.result()
+
+        try:
+            disk_name = None
+            if use_disk and self._disk is not None:
+                disk_name = _disk_name(pdf, page_index, zoom, fmt, clip)
+            source = "disk"
+            data = self._disk.get(disk_name) if disk_name else None
+            if data is None:
+                source = "render"
+                t0 = time.perf_counter()
+                data = self._render(pdf, page_index, zoom, fmt, clip)
+                elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                tier.put(key, data)
+                self._hits[source] += 1
+                if source == "render":
+                    self._render_seconds += elapsed
+            fut.set_result((data, source))
+            if source == "render" and disk_name:
+                try:
+                    self._disk.put(disk_name, data)
+                except OSError:
+                    pass  # 디스크 계층 저장 실패는 렌더 결과에 영향 없음
+            return data, source
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _render(
+        self, pdf: PdfInput, page_index: int, zoom: float, fmt: str, clip: tuple | None = None
+    ) -> bytes:
+        matrix = pymupdf.Matrix(zoom, zoom)
+        rect = pymupdf.Rect(clip) if clip is not None else None
+        if self.doc_pool is not None:
+            with self.doc_pool.document(pdf) as doc:
+                pix = doc[page_index].get_pixmap(matrix=matrix, clip=rect)
+        else:
+            with as_source(pdf).open_pymupdf() as doc:
+                pix = doc[page_index].get_pixmap(matrix=matrix, clip=rect)
+        if fmt == "png":
+            return pix.tobytes("png")
+        if fmt == "jpeg":
+            return pix.tobytes("jpg", jpg_quality=self.jpeg_quality)
+        # WebP는 Pillow 필요 (streamlit 의존성으로 설치됨)
+        return pix.pil_tobytes(format="WEBP", quality=self.jpeg_quality)
+
+
+def _disk_name(
+    pdf: PdfInput, page_index: int, zoom: float, fmt: str, clip: tuple | None = None
+) -> str:
+    if isinstance(pdf, (str, Path)):
+        st = os.stat(pdf)
+        doc_key = f"{os.path.abspath(pdf)}|{st.st_size}|{st.st_mtime_ns}"
+    else:
+        doc_key = source_key(pdf)
+    raw = f"{doc_key}|{page_index}|{zoom}"
+    if clip is not None:
+        raw += f"|{clip}"
+    return hashlib.md5(raw.encode()).hexdigest() + "." + fmt
@@ -0,0 +1,53 @@
+"""청크/페이지 결과 JSON 직렬화 - pydantic 컴파일 직렬화 + (설치 시) orjson"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Iterable
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def dumps_models(items: Iterable[BaseModel], pretty: bool = False) -> bytes:
+    """모델 목록 → JSON 배열 (UTF-8 bytes, 한글 이스케이프 없음)."""
+    parts: list[bytes] = []
+    _write_array(parts.append, items, pretty)
+    return b"".join(parts)
+
+
+def dump_models(items: Iterable[BaseModel], path: str | Path, pretty: bool = False) -> None:
+    """모델 목록을 JSON 배열로 파일에 스트리밍 저장 (전체 문자열을 메모리에 만들지 않음)."""
+    with open(path, "wb") as f:
+        write_models(f, items, pretty)
+
+
+def write_models(f: IO[bytes], items: Iterable[BaseModel], pretty: bool = False) -> None:
+    _write_array(f.write, items, pretty)
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _write_array(write, items: Iterable[BaseModel], pretty: bool) -> None:
+    sep = b",\n" if pretty else b","
+    write(b"[\n" if pretty else b"[")
+    first = True
+    for item in items:
+        if not first:
+            write(sep)
+        first = False
+        write(_dump_one(item, pretty))
+    write(b"\n]" if pretty and not first else b"]")
+
+
+def _dump_one(item: BaseModel, pretty: bool) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(item.model_dump(), option=option)
+    return item.model_dump_json(indent=2 if pretty else None).encode("utf-8")
@@ -0,0 +1,407 @@
+"""로컬 비동기 추출 서비스 - 작업 큐 + 프로세스 풀 + SSE 진행 상황
+
+외부 의존성 없이 asyncio 스트림 위에 최소한의 HTTP/1.1만 구현한다.
+
+    POST /jobs?name=a.pdf&priority=0     (body: PDF 바이트) → 202 {"job_id": ...}
+    GET  /jobs/{id}                      → 상태
+    GET  /jobs/{id}/events               → text/event-stream (queued/started/page/done/failed)
+    GET  /jobs/{id}/chunks               → 청크 JSON 배열 (완료 후)
+    GET  /health                         → 큐/워커 현황
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class _Job:
+    id: str
+    name: str
+    priority: int
+    options: dict
+    data: bytes | None
+    status: str = "queued"  # queued → running → done | failed
+    total_pages: int = 0
+    pages_done: int = 0
+    chunks_json: bytes | None = None
+    chunk_count: int = 0
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    events: list[tuple[str, dict]] = field(default_factory=list)
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+    progress_drained: asyncio.Event = field(default_factory=asyncio.Event)  # 워커의 끝 표시 수신
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "priority": self.priority,
+            "pages_done": self.pages_done,
+            "total_pages": self.total_pages,
+            "chunk_count": self.chunk_count,
+            "error": self.error,
+        }
+
+
+class ExtractionService:
+    """PDF 업로드 → 작업 큐 → 프로세스 풀 추출/구조 파싱/청킹.
+
+    - 대기 큐는 max_queue개까지 (초과 시 429), priority가 높은 작업부터 실행
+    - 동시에 실행되는 작업 수 = workers (프로세스 풀 크기)
+    - 워커의 페이지별 진행 상황은 multiprocessing 큐로 받아 SSE로 전달
+      (done/failed는 그 작업의 진행 메시지를 모두 전달한 뒤에 발행)
+    - 워커가 비정상 종료되면(세그폴트, OOM 등) 그 풀에서 실행 중이던 작업만 실패 처리하고
+      풀을 새로 만들어 이후 작업을 계속 처리
+    """
+
+    # 워커가 끝 표시를 보내지 못한 경우(프로세스 비정상 종료 등) 기다리는 최대 시간
+    DRAIN_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 32,
+        max_jobs: int = 200,
+        max_upload_bytes: int = 200 * 1024 * 1024,
+        output_dir: str = "./output/service",
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_jobs = max_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.output_dir = Path(output_dir)
+        self._jobs: dict[str, _Job] = {}
+        self._queue: asyncio.PriorityQueue | None = None
+        self._seq = itertools.count()
+        self._running = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._progress = None
+        self._progress_thread: threading.Thread | None = None
+        self._dispatchers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._progress = multiprocessing.get_context("spawn").Queue()
+        self._pool = self._new_pool()
+        self._progress_thread = threading.Thread(target=self._read_progress, daemon=True)
+        self._progress_thread.start()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._pool.shutdown(cancel_futures=True)
+        self._progress.put(None)
+        self._progress_thread.join(timeout=5)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._progress,),
+        )
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.Server:
+        await self.start()
+        return await asyncio.start_server(self._handle, host, port)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, data: bytes, name: str, priority: int = 0, **options) -> _Job:
+        """작업 등록. 대기 큐가 가득 차면 OverflowError."""
+        if self._queue.qsize() >= self.max_queue:
+            raise OverflowError("job queue is full")
+        job = _Job(id=uuid.uuid4().hex[:12], name=name, priority=priority, options=options, data=data)
+        self._jobs[job.id] = job
+        self._evict_finished()
+        self._queue.put_nowait((-priority, next(self._seq), job.id))
+        self._publish(job, "queued", {"position": self._queue.qsize()})
+        return job
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            job.status = "running"
+            self._running += 1
+            self._publish(job, "started", {})
+            data, job.data = job.data, None  # 워커로 넘긴 뒤 원본 버퍼는 해제
+            pool = self._pool
+            try:
+                chunks_json, count = await loop.run_in_executor(
+                    pool, _run_job, job.id, data, job.name,
+                    str(self.output_dir / job.id), job.options,
+                )
+            except BrokenProcessPool as e:
+                # 워커가 죽어 끝 표시가 오지 않으므로 기다리지 않는다. 풀 교체는 한 번만
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = self._new_pool()
+                job.status, job.error = "failed", f"worker crashed ({type(e).__name__})"
+                self._publish(job, "failed", {"error": job.error})
+            except Exception as e:
+                await self._drain_progress(job)
+                job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+                self._publish(job, "failed", {"error": job.error})
+            else:
+                await self._drain_progress(job)
+                job.chunks_json, job.chunk_count, job.status = chunks_json, count, "done"
+                self._publish(job, "done", {"chunk_count": count})
+            finally:
+                self._running -= 1
+
+    async def _drain_progress(self, job: _Job) -> None:
+        """진행 메시지는 mp 큐 → 수신 스레드 → 이벤트 루프로 늦게 도착할 수 있으므로
+        워커의 끝 표시가 처리될 때까지 기다린다 (page 이벤트가 done 뒤에 나가지 않도록)."""
+        try:
+            await asyncio.wait_for(job.progress_drained.wait(), self.DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    def _read_progress(self) -> None:
+        """워커 → 메인 진행 상황 (별도 스레드에서 블로킹 수신 후 이벤트 루프로 전달)."""
+        while True:
+            msg = self._progress.get()
+            if msg is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_progress, *msg)
+
+    def _on_progress(self, job_id: str, current: int | None, total: int, tables: int, images: int) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if current is None:  # 워커의 끝 표시 (이 작업의 진행 메시지는 여기까지)
+            job.progress_drained.set()
+            return
+        if job.status != "running":  # 끝 표시 대기 시간을 넘겨 도착한 메시지
+            return
+        job.pages_done, job.total_pages = current, total
+        self._publish(job, "page", {"page": current, "total": total, "tables": tables, "images": images})
+
+    def _publish(self, job: _Job, event: str, data: dict) -> None:
+        payload = {"job_id": job.id, **data}
+        job.events.append((event, payload))
+        for q in job.subscribers:
+            q.put_nowait((event, payload))
+
+    def _evict_finished(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in ("done", "failed")]
+        for job in sorted(finished, key=lambda j: j.created)[: max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job.id]
+
+    def health(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "jobs": len(self._jobs),
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers: dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            length = _content_length(headers)
+            if length is None:
+                await _respond_json(writer, HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"})
+                return
+            if length > self.max_upload_bytes:
+                await _respond_json(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "upload too large"})
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            await self._route(writer, method, url.path.rstrip("/"), query, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await _respond_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        finally:
+            writer.close()
+
+    async def _route(self, writer, method: str, path: str, query: dict, body: bytes) -> None:
+        parts = path.strip("/").split("/")
+
+        if method == "GET" and parts == ["health"]:
+            await _respond_json(writer, HTTPStatus.OK, self.health())
+            return
+
+        if method == "POST" and parts == ["jobs"]:
+            if not body.startswith(b"%PDF"):
+                await _respond_json(writer, HTTPStatus.BAD_REQUEST, {"error": "body is not a PDF"})
+                return
+            try:
+                params = _job_params(query)
+            except ValueError as e:
+                await _respond_json(writer, HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                return
+            try:
+                job = self.submit(body, name=query.get("name", "upload.pdf"), **params)
+            except OverflowError as e:
+                await _respond_json(writer, HTTPStatus.TOO_MANY_REQUESTS, {"error": str(e)})
+                return
+            await _respond_json(writer, HTTPStatus.ACCEPTED, job.info())
+            return
+
+        if method == "GET" and len(parts) >= 2 and parts[0] == "jobs":
+            job = self._jobs.get(parts[1])
+            if job is None:
+                await _respond_json(writer, HTTPStatus.NOT_FOUND, {"error": "unknown job"})
+            elif len(parts) == 2:
+                await _respond_json(writer, HTTPStatus.OK, job.info())
+            elif parts[2] == "events":
+                await self._stream_events(writer, job)
+            elif parts[2] == "chunks":
+                if job.status != "done":
+                    await _respond_json(writer, HTTPStatus.CONFLICT, job.info())
+                else:
+                    await _respond(writer, HTTPStatus.OK, job.chunks_json, "application/json")
+            else:
+                await _respond_json(writer, HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+
+        await _respond_json(writer, HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, job: _Job) -> None:
+        """SSE: 지난 이벤트를 먼저 보내고 done/failed까지 실시간 전달."""
+        q: asyncio.Queue = asyncio.Queue()
+        for item in job.events:
+            q.put_nowait(item)
+        job.subscribers.add(q)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            while True:
+                event, payload = await q.get()
+                data = json.dumps(payload, ensure_ascii=False)
+                writer.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+                if event in ("done", "failed"):
+                    return
+        finally:
+            job.subscribers.discard(q)
+
+
+# ------------------------------------------------------------------
+# HTTP helpers
+# ------------------------------------------------------------------
+
+def _content_length(headers: dict) -> int | None:
+    """Content-Length 헤더 값. 정수가 아니거나 음수면 None (400)."""
+    value = headers.get("content-length", "0")
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+def _job_params(query: dict) -> dict:
+    """POST /jobs 쿼리 → submit() 인자. 잘못된 값은 ValueError (400)."""
+    params = {}
+    for name, default in (("priority", 0), ("chunk_size", 1000), ("chunk_overlap", 200)):
+        value = query.get(name, default)
+        try:
+            params[name] = int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer: {value!r}") from None
+    if params["chunk_size"] <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= params["chunk_overlap"] < params["chunk_size"]:
+        raise ValueError("chunk_overlap must be in [0, chunk_size)")
+    return params
+
+
+async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, body: bytes, content_type: str) -> None:
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+
+
+async def _respond_json(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await _respond(writer, status, body, "application/json; charset=utf-8")
+
+
+# ------------------------------------------------------------------
+# Worker (프로세스 풀)
+# ------------------------------------------------------------------
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(job_id: str, data: bytes, name: str, output_dir: str, options: dict) -> tuple[bytes, int]:
+    from .pdf_source import PDFSource
+    from .pipeline import stream_chunks
+    from .serializer import dumps_models
+
+    def on_page(current, total, result):
+        _progress_queue.put((job_id, current, total, len(result.tables), len(result.images)))
+
+    try:
+        chunks = list(stream_chunks(
+            PDFSource(data, name=name),
+            output_dir,
+            chunk_size=options.get("chunk_size", 1000),
+            chunk_overlap=options.get("chunk_overlap", 200),
+            progress_callback=on_page,
+        ))
+    finally:
+        # 같은 프로세스의 큐 메시지는 순서가 유지되므로 이 표시가 마지막 진행 메시지 뒤에 도착
+        _progress_queue.put((job_id, None, 0, 0, 0))
+    return dumps_models(chunks), len(chunks)
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
-import re
+import warnings
+from bisect import bisect_right
 from dataclasses import dataclass
-
-import pymupdf
+from typing import TYPE_CHECKING
 
 from .models import PageResult, Section
+from .pdf_source import PDFSource, PdfInput, as_source
+
+if TYPE_CHECKING:
+    from .layout import FontStats
 
 
 @dataclass
@@ -16,177 +20,264 @@ class _Heading:
     level: int
     page: int
     offset: int  # 전체 텍스트에서의 시작 위치
+    key: str  # p<헤딩 페이지>h<페이지 내 순번>
+    resumed: bool = False  # 페이지 범위 시작에서 이어 연 섹션
 
 
 class StructureParser:
     """PDF에서 헤딩과 섹션 구조를 자동으로 탐지한다.
 
     탐지 방식:
-    1. PyMuPDF의 텍스트 블록에서 폰트 크기 분석
+    1. 문서 폰트 통계(layout.font_stats)로 본문/헤딩 크기를 정한다
     2. 본문보다 큰 폰트 = 헤딩으로 판단
     3. 상위 2개 레벨만 섹션 경계로 사용
-    4. 헤딩 사이 텍스트를 정확히 분할
+    4. 페이지가 도착하면 그 페이지만 DocumentLayout으로 읽어 HEADING 요소를 찾고,
+       헤딩 사이 텍스트를 정확히 분할
+
+    폰트 통계는 source.key별로 캐시되고, 처음 보는 긴 문서는 표본 페이지로 추정하므로
+    첫 섹션까지의 시간이 문서 길이에 비례하지 않는다. 추정한 레벨은 전 페이지를 받은 뒤
+    확인한다 (HeadingIndex 참고).
     """
 
-    def __init__(self, pdf_path: str, max_heading_levels: int = 2):
-        self.pdf_path = pdf_path
+    def __init__(self, pdf: PdfInput, max_heading_levels: int = 2):
+        self.source = as_source(pdf)
         self.max_heading_levels = max_heading_levels
 
     def parse(self, page_results: list[PageResult]) -> list[Section]:
         """페이지 결과에서 섹션 구조를 추출한다."""
-        doc = pymupdf.open(self.pdf_path)
-
-        # 1) 전체 텍스트를 페이지별로 합침 (offset 추적)
-        full_text = ""
-        page_offsets: list[tuple[int, int, int]] = []  # (start, end, page_number)
+        stream = self.stream()
+        sections: list[Section] = []
         for pr in page_results:
-            start = len(full_text)
-            full_text += pr.markdown + "\n\n"
-            page_offsets.append((start, len(full_text), pr.page_number))
-
-        # 2) 폰트 크기별 텍스트 수집
-        size_texts: dict[float, list[str]] = {}
-        for page_idx in range(len(doc)):
-            page = doc[page_idx]
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if block["type"] != 0:
-                    continue
-                for line in block.get("lines", []):
-                    for span in line.get("spans", []):
-                        text = span.get("text", "").strip()
-                        if not text or len(text) < 2:
-                            continue
-                        size = round(span.get("size", 0), 1)
-                        size_texts.setdefault(size, []).append(text)
-
-        doc.close()
-
-        if not size_texts:
-            return self._fallback_pages(page_results)
-
-        # 3) 본문 크기 = 가장 많은 글자 수를 차지하는 폰트 크기
-        size_char_count = {
-            s: sum(len(t) for t in texts) for s, texts in size_texts.items()
-        }
-        body_size = max(size_char_count, key=size_char_count.get)
-
-        # 본문보다 큰 크기만 헤딩 후보 (상위 N개 레벨)
-        heading_sizes = sorted(
-            [s for s in size_texts if s > body_size],
-            reverse=True,
-        )[: self.max_heading_levels]
-
-        if not heading_sizes:
-            return self._fallback_pages(page_results)
-
-        size_to_level = {s: i + 1 for i, s in enumerate(heading_sizes)}
-
-        # 4) 헤딩 텍스트를 full_text에서 찾아 offset 기록
-        heading_texts: list[tuple[str, int, float]] = []  # (text, page, size)
-        doc = pymupdf.open(self.pdf_path)
-        for page_idx in range(len(doc)):
-            page = doc[page_idx]
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if block["type"] != 0:
-                    continue
-                for line in block.get("lines", []):
-                    for span in line.get("spans", []):
-                        text = span.get("text", "").strip()
-                        size = round(span.get("size", 0), 1)
-                        if text and size in size_to_level and len(text) >= 2 and not text.isdigit():
-                            heading_texts.append((text, page_idx + 1, size))
-        doc.close()
-
-        # 연속 같은 페이지 + 같은 크기 → 병합 (줄바꿈된 긴 제목)
-        merged: list[tuple[str, int, float]] = []
-        for text, page, size in heading_texts:
-            if (
-                merged
-                and merged[-1][1] == page
-                and merged[-1][2] == size
-                and len(merged[-1][0]) < 50
-            ):
-                merged[-1] = (merged[-1][0] + " " + text, page, size)
-            else:
-                merged.append((text, page, size))
-
-        # 5) full_text에서 각 헤딩의 offset 찾기
-        headings: list[_Heading] = []
-        search_start = 0
-        for title, page, size in merged:
-            # 해당 페이지 범위 내에서만 검색
-            page_start = 0
-            page_end = len(full_text)
-            for ps, pe, pn in page_offsets:
-                if pn == page:
-                    page_start = ps
-                    page_end = pe
-                    break
-
-            idx = full_text.find(title, max(search_start, page_start))
-            if idx == -1:
-                idx = full_text.find(title, page_start)
-            if idx == -1:
-                continue
+            sections.extend(stream.feed(pr))
+        sections.extend(stream.finish())
+        return sections
 
-            headings.append(_Heading(
-                title=title,
-                level=size_to_level[size],
-                page=page,
-                offset=idx,
-            ))
-            search_start = idx + len(title)
+    def stream(self) -> SectionStream:
+        """증분 파서. feed(page)마다 새로 닫힌 섹션을, finish()에서 마지막 섹션을 반환."""
+        index = HeadingIndex(self.source, self.max_heading_levels)
+        if not index.stats.heading_sizes:
+            index.close()
+            return SectionStream(None, index.page_count)
+        return SectionStream(index, index.page_count)
 
-        if not headings:
-            return self._fallback_pages(page_results)
 
-        # 6) 헤딩 사이 텍스트 추출
-        sections: list[Section] = []
-        for i, h in enumerate(headings):
-            content_start = h.offset
-            content_end = headings[i + 1].offset if i + 1 < len(headings) else len(full_text)
-            content = full_text[content_start:content_end].strip()
+class HeadingIndex:
+    """페이지별 헤딩 [(텍스트, 레벨)]을 요청받은 페이지만 읽어 찾는다.
 
-            end_page = self._offset_to_page(content_end - 1, page_offsets)
+    비용은 feed된 페이지와, 범위 시작에서 직전 헤딩을 찾느라 거슬러 읽은 페이지 수에
+    비례한다. 전 페이지를 읽게 되면 그 크기별 글자 수로 표본 추정치를 확인하고 캐시를
+    확정값으로 바꾼다 (confirm).
+    """
 
-            sections.append(Section(
-                title=h.title,
-                level=h.level,
-                content=content,
-                start_page=h.page,
-                end_page=end_page,
-            ))
+    def __init__(self, source: PDFSource, max_heading_levels: int = 2):
+        from .layout import font_stats  # numpy - 실제 파싱할 때만 로드
 
-        return sections
+        self.source = source
+        self.max_heading_levels = max_heading_levels
+        self._doc = source.open_pymupdf()
+        self.page_count = len(self._doc)
+        self.stats: FontStats = font_stats(self._doc, source.key, max_heading_levels)
+        self._found: dict[int, list[tuple[str, int]]] = {}
+        self._chars: dict[int, dict[float, int]] = {}  # 페이지별 크기별 글자 수 (확인용)
+
+    def get(self, page_number: int) -> list[tuple[str, int]]:
+        found = self._found.get(page_number)
+        if found is None:
+            found = self._found[page_number] = self._read(page_number)
+        return found
+
+    def prior(self, page_number: int) -> tuple[int, list[tuple[str, int]]] | None:
+        """page_number 앞에서 헤딩이 있는 마지막 페이지와 그 헤딩 (거슬러 읽음)."""
+        for p in range(page_number - 1, 0, -1):
+            found = self.get(p)
+            if found:
+                return p, found
+        return None
+
+    def confirm(self) -> bool:
+        """전 페이지를 읽었으면 통계를 확정해 캐시하고, 추정 레벨이 맞았는지 반환."""
+        from .layout import FontStats, remember_font_stats
+
+        if self.stats.exact or len(self._chars) < self.page_count:
+            return True
+        chars: dict[float, int] = {}
+        for p in range(1, self.page_count + 1):
+            for size, n in self._chars[p].items():
+                chars[size] = chars.get(size, 0) + n
+        remember_font_stats(self.source.key, chars)
+        exact = FontStats.from_chars(chars, self.max_heading_levels)
+        return (exact.body_size, exact.heading_sizes) == (self.stats.body_size, self.stats.heading_sizes)
+
+    def close(self) -> None:
+        self._doc.close()
+
+    def _read(self, page_number: int) -> list[tuple[str, int]]:
+        from .layout import TEXT_FLAGS, DocumentLayout, count_sizes
+
+        page = self._doc[page_number - 1]
+        page_dict = page.get_text("dict", flags=TEXT_FLAGS)
+        if not self.stats.exact:
+            chars: dict[float, int] = {}
+            count_sizes(page_dict, chars)
+            self._chars[page_number] = chars
+        layout = DocumentLayout(
+            [page_dict], [page.rect.width], self.max_heading_levels, self.stats, [page_number]
+        )
+        return [(h.content, h.level) for h in layout.headings(page_number)]
+
+
+class SectionStream:
+    """페이지를 순서대로 받아 헤딩 위치를 찾고, 다음 헤딩이 나오는 즉시 섹션을 내보낸다.
+
+    텍스트는 열린 섹션의 시작부터만 보관하므로 메모리는 문서 길이가 아니라
+    가장 긴 섹션에 비례한다. 헤딩은 자기 페이지 이후 텍스트에서만 찾는다.
+
+    페이지 범위만 넣을 때(예: 10-40, 55) 건너뛴 페이지가 있으면 열린 섹션을
+    그 앞에서 닫고, 범위 시작 페이지는 직전 헤딩의 섹션으로 이어서 연다.
+
+    Section.key는 헤딩 위치(페이지, 페이지 내 순번)로 정해지므로 범위 추출에서도 전체
+    추출과 같은 섹션은 같은 키를 갖는다. 범위 경계에서 잘린 섹션은 내용이 다르므로
+    키에 잘린 위치를 붙인다 (이어 연 섹션: @p<시작>, 끝이 잘린 섹션: ~p<끝>).
+
+    headings가 None이면 헤딩 크기가 없는 문서 (페이지 단위 fallback).
+    """
+
+    def __init__(self, headings: HeadingIndex | None, page_count: int = 0):
+        self._headings = headings
+        self._page_count = page_count
+        self._text = ""  # 전체 텍스트 중 [self._base:] 부분
+        self._base = 0
+        self._length = 0
+        self._search_start = 0
+        self._open: _Heading | None = None
+        self._starts: list[int] = []  # 페이지별 (시작 offset, 끝 offset, 페이지 번호)
+        self._ends: list[int] = []
+        self._pages: list[int] = []
+        self._next_page = 1
+        # 첫 헤딩을 찾기 전까지는 fallback에 대비해 페이지를 보관
+        self._held: list[PageResult] | None = []
+
+    def feed(self, pr: PageResult) -> list[Section]:
+        if self._headings is None:
+            return _fallback_pages([pr])
 
-    def _fallback_pages(self, page_results: list[PageResult]) -> list[Section]:
-        """폰트 크기 차이가 없을 때 페이지 단위 fallback."""
         sections: list[Section] = []
-        for pr in page_results:
-            text = pr.markdown.strip()
-            if not text:
+        if pr.page_number != self._next_page:
+            sections += self._resume(pr.page_number)
+        self._next_page = pr.page_number + 1
+
+        if self._held is not None:
+            self._held.append(pr)
+        page_start = self._length
+        self._text += pr.markdown + "\n\n"
+        self._length += len(pr.markdown) + 2
+        self._starts.append(page_start)
+        self._ends.append(self._length)
+        self._pages.append(pr.page_number)
+
+        for h_idx, (title, level) in enumerate(self._headings.get(pr.page_number)):
+            idx = self._find(title, max(self._search_start, page_start))
+            if idx == -1:
+                idx = self._find(title, page_start)
+            if idx == -1:
                 continue
-            # 첫 번째 의미 있는 줄을 제목으로
-            title = f"Page {pr.page_number}"
-            for line in text.split("\n"):
-                line = line.strip()
-                if line and not line.startswith("![") and len(line) > 2:
-                    title = line[:80]
-                    break
-
-            sections.append(Section(
-                title=title,
-                level=1,
-                content=text,
-                start_page=pr.page_number,
-                end_page=pr.page_number,
-            ))
+            if self._open is not None:
+                section = self._close(idx)
+                # 범위 시작 페이지가 곧바로 새 헤딩으로 시작하면 이어 연 섹션은 비어 있음
+                if section.content or not self._open.resumed:
+                    sections.append(section)
+            self._open = _Heading(
+                title=title, level=level, page=pr.page_number, offset=idx,
+                key=f"p{pr.page_number}h{h_idx}",
+            )
+            self._held = None
+            self._search_start = idx + len(title)
+
+        # 이후 페이지는 자기 페이지 시작부터 검색하므로 열린 섹션 이전 텍스트는 버린다
+        keep_from = self._open.offset if self._open is not None else self._length
+        self._text = self._text[keep_from - self._base:]
+        self._base = keep_from
         return sections
 
-    def _offset_to_page(self, offset: int, page_offsets: list[tuple[int, int, int]]) -> int:
-        for start, end, page_num in page_offsets:
-            if start <= offset < end:
-                return page_num
-        return page_offsets[-1][2] if page_offsets else 1
+    def finish(self) -> list[Section]:
+        if self._headings is None:
+            return []
+        self._headings.close()
+        if not self._headings.confirm():
+            warnings.warn(
+                f"{self._headings.source.name}: heading sizes estimated from sampled pages differ "
+                "from the full document; the exact sizes are cached for the next run",
+                stacklevel=2,
+            )
+        if self._open is None:
+            return _fallback_pages(self._held or [])
+        # 문서 끝까지 받지 않았으면 마지막 섹션은 범위 끝에서 잘린 것
+        section = self._close(self._length, truncated=self._next_page <= self._page_count)
+        self._open = None
+        return [section]
+
+    def _resume(self, page_number: int) -> list[Section]:
+        """앞 페이지를 건너뛰고 page_number부터 이어 받을 때의 섹션 경계 처리."""
+        closed = [self._close(self._length, truncated=True)] if self._open is not None else []
+        self._open = None
+        prior = self._headings.prior(page_number)
+        if prior is not None:
+            prior_page, found = prior
+            h_idx = len(found) - 1
+            title, level = found[h_idx]
+            self._open = _Heading(
+                title=title, level=level, page=page_number, offset=self._length,
+                key=f"p{prior_page}h{h_idx}@p{page_number}", resumed=True,
+            )
+            self._held = None
+        return closed
+
+    def _find(self, title: str, start: int) -> int:
+        idx = self._text.find(title, start - self._base)
+        return idx + self._base if idx != -1 else -1
+
+    def _close(self, content_end: int, truncated: bool = False) -> Section:
+        """열린 헤딩부터 content_end까지를 섹션으로. truncated: 범위 경계에서 잘림."""
+        h = self._open
+        content = self._text[h.offset - self._base:max(content_end - self._base, 0)].strip()
+        end_page = self._offset_to_page(content_end - 1)
+        return Section(
+            title=h.title,
+            level=h.level,
+            content=content,
+            start_page=h.page,
+            end_page=end_page,
+            key=f"{h.key}~p{end_page}" if truncated else h.key,
+        )
+
+    def _offset_to_page(self, offset: int) -> int:
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self._ends[i]:
+            return self._pages[i]
+        return self._pages[-1] if self._pages else 1
+
+
+def _fallback_pages(page_results: list[PageResult]) -> list[Section]:
+    """폰트 크기 차이가 없을 때 페이지 단위 fallback."""
+    sections: list[Section] = []
+    for pr in page_results:
+        text = pr.markdown.strip()
+        if not text:
+            continue
+        # 첫 번째 의미 있는 줄을 제목으로
+        title = f"Page {pr.page_number}"
+        for line in text.split("\n"):
+            line = line.strip()
+            if line and not line.startswith("![") and len(line) > 2:
+                title = line[:80]
+                break
+
+        sections.append(Section(
+            title=title,
+            level=1,
+            content=text,
+            start_page=pr.page_number,
+            end_page=pr.page_number,
+            key=f"p{pr.page_number}",
+        ))
+    return sections
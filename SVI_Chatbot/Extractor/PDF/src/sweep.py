@@ -0,0 +1,320 @@
+"""청킹 파라미터 스윕 - 문서당 추출 1회(디스크 캐시) 후 크기/겹침/전략 격자를 병렬 평가"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from .compare import token_stats
+from .models import Chunk, PageResult, Section
+from .pdf_source import PdfInput, as_source
+
+STRATEGIES = ("sections", "pages")
+
+# 캐시 JSON 형식/추출 규칙이 바뀌면 올린다 (2: Section.key)
+CACHE_VERSION = 2
+# 추출 결과를 바꾸는 라이브러리 - 버전이 바뀌면 캐시를 다시 만든다
+_EXTRACT_PACKAGES = ("pymupdf", "pymupdf4llm", "pdfplumber")
+
+_WORD = re.compile(r"\w+")
+_HANGUL = re.compile(r"[가-힣]")
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    chunk_size: int
+    chunk_overlap: int
+    strategy: str  # sections | pages
+
+    @property
+    def label(self) -> str:
+        return f"{self.strategy}/{self.chunk_size}/{self.chunk_overlap}"
+
+
+@dataclass
+class CachedDocument:
+    """추출 + 구조 파싱 결과 (청킹 입력 전부)."""
+    name: str
+    pages: list[PageResult]
+    sections: list[Section]
+
+
+@dataclass
+class Query:
+    text: str
+    expect: list[str]  # 정답 청크에 모두 들어 있어야 하는 키워드
+
+
+def build_grid(sizes: list[int], overlaps: list[int], strategies: list[str]) -> list[SweepConfig]:
+    """크기 × 겹침 × 전략 조합. 겹침이 크기 이상인 조합은 뺀다."""
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy: {strategy} (choose from {', '.join(STRATEGIES)})")
+    return [
+        SweepConfig(size, overlap, strategy)
+        for strategy, size, overlap in itertools.product(strategies, sizes, overlaps)
+        if 0 <= overlap < size
+    ]
+
+
+# ------------------------------------------------------------------
+# 추출 캐시
+# ------------------------------------------------------------------
+
+def extract_cached(
+    pdf: PdfInput,
+    cache_dir: str | Path,
+    output_dir: str = "./output/sweep",
+    max_heading_levels: int = 2,
+) -> tuple[Path, bool]:
+    """문서를 한 번만 추출/파싱해 cache_dir/<내용 해시>-<옵션 해시>.json에 저장.
+    반환: (캐시 경로, 캐시 적중 여부).
+
+    청킹 파라미터와 무관한 단계(추출, 폰트 분석)만 캐시하므로 같은 문서는 격자 크기와
+    상관없이, 그리고 다음 스윕에서도 다시 추출하지 않는다. 옵션 해시에는 캐시 형식 버전,
+    추출 라이브러리 버전, 파서 옵션이 들어가므로 그중 하나가 바뀌면 다시 추출한다.
+    """
+    from .document import LazyDocument
+    from .serializer import dumps_models
+    from .structure_parser import StructureParser
+
+    source = as_source(pdf)
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{source.key}-{_options_key(max_heading_levels)}.json"
+    if path.exists():
+        return path, True
+
+    with LazyDocument(source, output_dir, compact=True) as doc:
+        pages = list(doc.pages(memoize=False))
+    sections = StructureParser(source, max_heading_levels).parse(pages)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(
+        b'{"name":' + json.dumps(source.stem, ensure_ascii=False).encode("utf-8")
+        + b',"pages":' + dumps_models(pages)
+        + b',"sections":' + dumps_models(sections) + b"}"
+    )
+    os.replace(tmp, path)
+    return path, False
+
+
+def _options_key(max_heading_levels: int) -> str:
+    options = {
+        "version": CACHE_VERSION,
+        "packages": {name: _package_version(name) for name in _EXTRACT_PACKAGES},
+        "max_heading_levels": max_heading_levels,
+    }
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return ""
+
+
+def load_cached(path: str | Path) -> CachedDocument:
+    data = json.loads(Path(path).read_bytes())
+    return CachedDocument(
+        data["name"],
+        [PageResult.model_validate(p) for p in data["pages"]],
+        [Section.model_validate(s) for s in data["sections"]],
+    )
+
+
+def load_queries(path: str | Path) -> list[Query]:
+    """JSONL 질의 파일. 줄마다 {"query": "...", "expect": ["키워드", ...]}.
+
+    expect를 생략하면 질의의 단어 전부를 키워드로 쓴다. 빈 줄과 #으로 시작하는 줄은 무시.
+    """
+    queries = []
+    for n, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            item = json.loads(line)
+            text = item["query"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"{path}:{n}: invalid query line ({e})") from None
+        expect = item.get("expect") or _WORD.findall(text)
+        queries.append(Query(text, [expect] if isinstance(expect, str) else list(expect)))
+    return queries
+
+
+# ------------------------------------------------------------------
+# 평가
+# ------------------------------------------------------------------
+
+def evaluate(
+    config: SweepConfig,
+    documents: list[CachedDocument],
+    queries: list[Query] = (),
+    top_k: int = 5,
+) -> dict:
+    """설정 하나로 모든 문서를 청킹하고 지표 계산."""
+    from .chunker import PDFChunker
+
+    t0 = time.perf_counter()
+    chunker = PDFChunker(config.chunk_size, config.chunk_overlap)
+    chunks: list[Chunk] = []
+    for part in chunker.chunk_documents([
+        (doc.sections if config.strategy == "sections" else [], doc.pages, doc.name)
+        for doc in documents
+    ]):
+        chunks.extend(part)
+    seconds = time.perf_counter() - t0
+
+    texts = [c.content for c in chunks]
+    report = {
+        "strategy": config.strategy,
+        "chunk_size": config.chunk_size,
+        "chunk_overlap": config.chunk_overlap,
+        "chunks": len(chunks),
+        "chunk_seconds": round(seconds, 3),
+        "tokens": token_stats([c.token_count or 0 for c in chunks]),
+        "duplication": round(duplication_ratio(texts), 4),
+    }
+    if queries:
+        report.update(retrieval_scores(texts, queries, top_k))
+    return report
+
+
+def duplication_ratio(texts: list[str], n: int = 5) -> float:
+    """청크 전체의 연속 n단어 조각 중 다른 곳과 중복된 비율 (1 - 고유 조각 / 전체 조각).
+
+    겹침(overlap)과 테이블 청크의 섹션 본문 중복이 여기에 잡힌다. 문서 자체의 반복
+    (머리말/꼬리말 등)도 포함되므로 설정 간 상대 비교용이다.
+    """
+    total = 0
+    distinct: set[tuple[str, ...]] = set()
+    for text in texts:
+        words = _WORD.findall(text.lower())
+        if len(words) < n:
+            if words:
+                total += 1
+                distinct.add(tuple(words))
+            continue
+        total += len(words) - n + 1
+        distinct.update(zip(*(words[i:] for i in range(n))))
+    return 1 - len(distinct) / total if total else 0.0
+
+
+def retrieval_scores(texts: list[str], queries: list[Query], top_k: int = 5) -> dict:
+    """BM25 키워드 검색 상위 top_k 안에 expect 키워드를 모두 담은 청크가 있으면 적중.
+
+    hit_rate: 적중 질의 비율, mrr: 첫 정답 청크 순위의 역수 평균 (top_k 밖이면 0).
+    키워드 포함 여부는 대소문자/공백을 무시하고 비교한다 (PDF 줄바꿈이 단어 중간에 끼는 경우).
+    """
+    index = _BM25(texts)
+    normalized = [_SPACE.sub("", t.lower()) for t in texts]
+    hits = 0
+    rr = 0.0
+    for query in queries:
+        expect = [_SPACE.sub("", k.lower()) for k in query.expect]
+        for rank, i in enumerate(index.search(query.text, top_k), 1):
+            if all(k in normalized[i] for k in expect):
+                hits += 1
+                rr += 1 / rank
+                break
+    return {
+        "queries": len(queries),
+        "hit_rate": round(hits / len(queries), 4),
+        "mrr": round(rr / len(queries), 4),
+    }
+
+
+def run_sweep(
+    cache_paths: list[Path],
+    configs: list[SweepConfig],
+    queries: list[Query] = (),
+    top_k: int = 5,
+    workers: int = 1,
+) -> list[dict]:
+    """설정별 보고서 (configs 순서). workers > 1이면 설정 단위로 프로세스 풀에 분배한다.
+
+    워커는 시작할 때 캐시 JSON을 한 번 읽어 두고, 작업마다 설정값만 주고받는다.
+    """
+    queries = list(queries)
+    if workers <= 1 or len(configs) <= 1:
+        documents = [load_cached(p) for p in cache_paths]
+        return [evaluate(c, documents, queries, top_k) for c in configs]
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(configs)),
+        initializer=_init_worker,
+        initargs=([str(p) for p in cache_paths], queries, top_k),
+    ) as pool:
+        return list(pool.map(_evaluate_worker, configs))
+
+
+# ------------------------------------------------------------------
+# Worker (프로세스 풀)
+# ------------------------------------------------------------------
+
+_worker_state: tuple[list[CachedDocument], list[Query], int] | None = None
+
+
+def _init_worker(cache_paths: list[str], queries: list[Query], top_k: int):
+    global _worker_state
+    _worker_state = ([load_cached(p) for p in cache_paths], queries, top_k)
+
+
+def _evaluate_worker(config: SweepConfig) -> dict:
+    documents, queries, top_k = _worker_state
+    return evaluate(config, documents, queries, top_k)
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _terms(text: str) -> list[str]:
+    """검색어 단위. 한글 단어는 음절 bigram으로 나눠 조사/어미가 붙어도 맞도록 한다."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) > 1 and _HANGUL.search(word):
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.append(word)
+    return terms
+
+
+class _BM25:
+    def __init__(self, texts: list[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tfs = [Counter(_terms(t)) for t in texts]
+        self.lengths = [sum(tf.values()) for tf in self.tfs]
+        self.avg_len = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.postings: dict[str, list[int]] = {}
+        for i, tf in enumerate(self.tfs):
+            for term in tf:
+                self.postings.setdefault(term, []).append(i)
+
+    def search(self, query: str, top_k: int) -> list[int]:
+        n = len(self.tfs)
+        scores: dict[int, float] = {}
+        for term in set(_terms(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for i in docs:
+                tf = self.tfs[i][term]
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_len)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=lambda i: (-scores[i], i))[:top_k]
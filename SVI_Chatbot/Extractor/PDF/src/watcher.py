@@ -0,0 +1,432 @@
+"""폴더 감시 수집 데몬 - inotify(폴링 대체) + 디바운스 + 내용 해시 중복 제거 + 워커 풀"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import json
+import multiprocessing
+import os
+import select
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from .pdf_source import PDFSource
+
+
+# inotify 이벤트 마스크 (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """libc inotify를 ctypes로 직접 사용 (Linux 전용, 추가 의존성 없음)."""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed: {directory}")
+
+    def read(self, timeout: float) -> list[str]:
+        """timeout 동안 대기 후 변경된 파일 이름 목록."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, pos = [], 0
+        while pos < len(buf):
+            _, _, _, length = _EVENT_HEADER.unpack_from(buf, pos)
+            pos += _EVENT_HEADER.size
+            names.append(os.fsdecode(buf[pos:pos + length].rstrip(b"\0")))
+            pos += length
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+@dataclass
+class _Pending:
+    """디바운스 대기 중인 파일 - (크기, mtime)이 settle 시간 동안 그대로여야 처리."""
+    first_seen: float
+    last_change: float
+    signature: tuple[int, int]
+
+
+@dataclass
+class _Retry:
+    """처리에 실패한 파일 - due 시각에 다시 디바운스부터 시작 (파일이 바뀌면 초기화)."""
+    attempts: int
+    due: float
+    signature: tuple[int, int] | None
+
+
+class FolderWatcher:
+    """directory에 들어온 새/변경 PDF를 자동으로 추출해 output_dir에 청크를 저장한다.
+
+    - 감지: inotify (Linux), 실패 시 poll_seconds 간격 디렉터리 스캔
+    - 디바운스: 크기/수정 시각이 settle_seconds 동안 변하지 않고 파일 끝에 %%EOF가
+      있어야 작성 완료로 본다 (복사 중인 파일 방지)
+    - 중복 제거: 내용 해시가 이미 처리된 파일은 건너뜀 (manifest.json에 기록)
+    - 실패: retry_seconds부터 두 배씩 늘려 max_retries번까지 재시도, 그 뒤에는 파일이
+      바뀔 때까지 건너뜀
+    - 처리: workers개 프로세스. 대기열은 직접 관리해 queue depth를 정확히 보고
+    - 지표: metrics_seconds마다 output_dir/watch_metrics.json 갱신
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        output_dir: str | Path = "./output",
+        workers: int = 2,
+        settle_seconds: float = 1.0,
+        poll_seconds: float = 2.0,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        use_inotify: bool = True,
+        metrics_seconds: float = 10.0,
+        max_retries: int = 3,
+        retry_seconds: float = 5.0,
+        log=print,
+    ):
+        self.directory = Path(directory)
+        self.output_dir = Path(output_dir)
+        self.workers = workers
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.metrics_seconds = metrics_seconds
+        self.max_retries = max_retries
+        self.retry_seconds = retry_seconds
+        self.log = log
+
+        self._inotify: _Inotify | None = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.directory)
+            except OSError as e:
+                self.log(f"inotify unavailable ({e}), falling back to polling")
+        self.mode = "inotify" if self._inotify else "polling"
+
+        self._manifest_path = self.output_dir / "manifest.json"
+        self._metrics_path = self.output_dir / "watch_metrics.json"
+        self._last_metrics = 0.0
+        self._manifest: dict[str, dict] = self._load_manifest()  # 내용 해시 → 처리 결과
+        self._seen: dict[str, tuple[int, int]] = {}  # 경로 → 마지막으로 확인한 (크기, mtime)
+        self._retries: dict[str, _Retry] = {}  # 실패한 경로 → 재시도 상태
+        self._pending: dict[str, _Pending] = {}
+        self._queue: deque[tuple[str, str, bytes, float]] = deque()  # (경로, 해시, 데이터, 감지 시각)
+        self._running: dict[Future, tuple[str, str, float, float]] = {}
+        self._pool: ProcessPoolExecutor | None = None
+        self._last_scan = 0.0
+
+        self._started = time.monotonic()
+        self._counts = {"processed": 0, "failed": 0, "duplicates": 0, "pages": 0, "chunks": 0}
+        self._latencies: deque[float] = deque(maxlen=100)
+        self._completions: deque[tuple[float, int]] = deque()  # (완료 시각, 페이지 수), 최근 60초
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    def run(self, stop_after: float | None = None) -> None:
+        """감시 루프. stop_after(초)가 주어지면 그 시간 후 대기열을 비우고 종료."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._pool = self._new_pool()
+        self.log(f"Watching {self.directory} ({self.mode}, workers: {self.workers})")
+        deadline = None if stop_after is None else time.monotonic() + stop_after
+        try:
+            self._scan()  # 시작 전에 들어와 있던 파일
+            while deadline is None or time.monotonic() < deadline:
+                self.step(timeout=0.2)
+            while self._queue or self._running:
+                self.step(timeout=0.2)
+            self._write_metrics()
+        finally:
+            self.close()
+
+    def step(self, timeout: float = 0.2) -> None:
+        """이벤트 수신 → 디바운스 확인 → 워커 배정 → 완료 수거를 한 번 수행."""
+        now = time.monotonic()
+        if self._inotify is not None:
+            for name in self._inotify.read(timeout):
+                if name.lower().endswith(".pdf"):
+                    self._touch(self.directory / name, time.monotonic())
+        else:
+            time.sleep(timeout)
+            if now - self._last_scan >= self.poll_seconds:
+                self._scan()
+        self._check_retries(time.monotonic())
+        self._check_pending(time.monotonic())
+        self._dispatch()
+        self._collect()
+        if time.monotonic() - self._last_metrics >= self.metrics_seconds:
+            self._write_metrics()
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        while self._completions and now - self._completions[0][0] > 60:
+            self._completions.popleft()
+        window = min(60.0, now - self._started) or 1.0
+        recent_pages = sum(p for _, p in self._completions)
+        return {
+            "mode": self.mode,
+            "debouncing": len(self._pending),
+            "retrying": len(self._retries),
+            "queue_depth": len(self._queue),
+            "running": len(self._running),
+            **self._counts,
+            "docs_per_min": len(self._completions) * 60.0 / window,
+            "pages_per_sec": recent_pages / window,
+            "avg_latency_s": sum(self._latencies) / len(self._latencies) if self._latencies else 0.0,
+            "last_latency_s": self._latencies[-1] if self._latencies else 0.0,
+            "uptime_s": now - self._started,
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    # ------------------------------------------------------------------
+    # Detection / debounce
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> None:
+        self._last_scan = time.monotonic()
+        for path in self.directory.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if self._seen.get(str(path)) != (st.st_size, st.st_mtime_ns):
+                self._touch(path, self._last_scan)
+
+    def _touch(self, path: Path, now: float) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        sig = (st.st_size, st.st_mtime_ns)
+        retry = self._retries.get(str(path))
+        if retry is not None:
+            if retry.signature != sig:
+                del self._retries[str(path)]  # 파일이 바뀜 - 새 파일로 처리
+            elif now < retry.due:
+                return  # 재시도 시각 전 (또는 재시도 진행 중)
+        pending = self._pending.get(str(path))
+        if pending is None:
+            self._pending[str(path)] = _Pending(now, now, sig)
+        elif pending.signature != sig:
+            pending.signature, pending.last_change = sig, now
+
+    def _check_pending(self, now: float) -> None:
+        for key, pending in list(self._pending.items()):
+            if now - pending.last_change < self.settle_seconds:
+                continue
+            path = Path(key)
+            try:
+                st = path.stat()
+            except OSError:
+                del self._pending[key]  # 삭제/이동됨
+                self._retries.pop(key, None)
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            if sig != pending.signature:
+                pending.signature, pending.last_change = sig, now
+                continue
+            # 크기가 그대로여도 쓰기 도중 멈춘 파일일 수 있음 - 끝부분 %%EOF 확인
+            # (settle 시간의 10배가 지나도록 없으면 그대로 처리해 실패로 기록)
+            if not _has_eof_marker(path) and now - pending.last_change < self.settle_seconds * 10:
+                continue
+            del self._pending[key]
+            self._seen[key] = sig
+            self._enqueue(path, pending.first_seen)
+
+    def _check_retries(self, now: float) -> None:
+        for key, retry in list(self._retries.items()):
+            if now < retry.due:
+                continue
+            if not Path(key).exists():
+                del self._retries[key]
+                continue
+            self._touch(Path(key), now)
+            retry.due = float("inf")  # 결과가 나올 때까지 다시 예약하지 않음
+
+    def _enqueue(self, path: Path, detected: float) -> None:
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            self._schedule_retry(str(path), f"{type(e).__name__}: {e}")
+            return
+        digest = PDFSource(data, name=path.name).key
+        done = self._manifest.get(digest)
+        busy = any(h == digest for _, h, _, _ in self._queue) or any(
+            h == digest for _, h, _, _ in self._running.values()
+        )
+        if done is not None or busy:
+            self._retries.pop(str(path), None)
+            self._counts["duplicates"] += 1
+            where = f"already ingested as {done['name']}" if done else "same content already queued"
+            self.log(f"  = {path.name}: {where}, skipped")
+            return
+        self._queue.append((str(path), digest, data, detected))
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _dispatch(self) -> None:
+        while self._queue and len(self._running) < self.workers:
+            path, digest, data, detected = self._queue.popleft()
+            args = (_ingest, data, Path(path).name, str(self.output_dir), self.chunk_size, self.chunk_overlap)
+            try:
+                fut = self._pool.submit(*args)
+            except BrokenProcessPool:
+                # 워커가 비정상 종료되면 풀 전체를 쓸 수 없으므로 새로 만든다 (실패 작업은 재시도 대상)
+                self._pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                fut = self._pool.submit(*args)
+            self._running[fut] = (path, digest, detected, time.monotonic())
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        ctx = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+
+    def _collect(self) -> None:
+        for fut in [f for f in self._running if f.done()]:
+            path, digest, detected, started = self._running.pop(fut)
+            name = Path(path).name
+            try:
+                info = fut.result()
+            except Exception as e:
+                self._counts["failed"] += 1
+                self._schedule_retry(path, f"{type(e).__name__}: {e}")
+                continue
+            self._retries.pop(path, None)
+            now = time.monotonic()
+            latency = now - detected
+            self._latencies.append(latency)
+            self._completions.append((now, info["pages"]))
+            self._counts["processed"] += 1
+            self._counts["pages"] += info["pages"]
+            self._counts["chunks"] += info["chunks"]
+            self._manifest[digest] = {"name": name, "ingested_at": time.time(), **info}
+            self._save_manifest()
+            self.log(
+                f"  + {name}: {info['pages']} pages, {info['chunks']} chunks "
+                f"(extract {now - started:.1f}s, latency {latency:.1f}s)"
+            )
+
+    def _schedule_retry(self, path: str, error: str) -> None:
+        """실패한 파일은 처리 완료로 남기지 않는다 - 백오프 후 재시도, 한도를 넘으면 파일이 바뀔 때까지 보류."""
+        name = Path(path).name
+        sig = self._seen.get(path)
+        retry = self._retries.get(path)
+        attempts = retry.attempts + 1 if retry is not None else 1
+        if attempts > self.max_retries:
+            self._retries.pop(path, None)
+            self.log(f"  ! {name}: {error} (giving up after {self.max_retries} retries)")
+            return
+        delay = self.retry_seconds * 2 ** (attempts - 1)
+        self._retries[path] = _Retry(attempts, time.monotonic() + delay, sig)
+        self._seen.pop(path, None)
+        self.log(f"  ! {name}: {error} (retry {attempts}/{self.max_retries} in {delay:.0f}s)")
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> dict[str, dict]:
+        try:
+            return json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_metrics(self) -> None:
+        self._last_metrics = time.monotonic()
+        tmp = self._metrics_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.metrics(), indent=2), encoding="utf-8")
+        os.replace(tmp, self._metrics_path)
+
+    def _save_manifest(self) -> None:
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self._manifest_path)
+
+
+def _has_eof_marker(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, path.stat().st_size - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def _ingest(data: bytes, name: str, output_dir: str, chunk_size: int, chunk_overlap: int) -> dict:
+    """워커 프로세스: 파이프라인 실행 후 extract.py와 같은 위치에 청크/마크다운 저장."""
+    from .pipeline import stream_chunks
+    from .serializer import dump_models
+
+    source = PDFSource(data, name=name)
+    out = Path(output_dir)
+    chunks_path = out / "chunks" / f"{source.stem}_chunks.json"
+    md_path = out / "markdown" / f"{source.stem}.md"
+    chunks_path.parent.mkdir(parents=True, exist_ok=True)
+    md_path.parent.mkdir(parents=True, exist_ok=True)
+
+    counts = {"pages": 0, "sections": 0, "chunks": 0}
+    # 같은 폴더의 임시 파일에 쓰고 끝까지 성공했을 때만 교체 (색인기가 반쯤 쓴 파일을 읽지 않도록)
+    md_tmp = md_path.with_name(f"{md_path.name}.{os.getpid()}.tmp")
+    chunks_tmp = chunks_path.with_name(f"{chunks_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(md_tmp, "w", encoding="utf-8") as md:
+            def on_page(current, total, result):
+                if current > 1:
+                    md.write("\n\n---\n\n")
+                md.write(result.markdown)
+                counts["pages"] = current
+
+            def on_section(section):
+                counts["sections"] += 1
+
+            def counted(chunks):
+                for chunk in chunks:
+                    counts["chunks"] += 1
+                    yield chunk
+
+            dump_models(
+                counted(stream_chunks(source, output_dir, chunk_size, chunk_overlap,
+                                      progress_callback=on_page, on_section=on_section)),
+                chunks_tmp,
+            )
+        os.replace(md_tmp, md_path)
+        os.replace(chunks_tmp, chunks_path)  # 청크 파일이 마지막 (완료 표시)
+    except BaseException:
+        md_tmp.unlink(missing_ok=True)
+        chunks_tmp.unlink(missing_ok=True)
+        raise
+    return {**counts, "chunks_path": str(chunks_path)}
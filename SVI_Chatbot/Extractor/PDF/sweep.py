@@ -0,0 +1,140 @@
+"""
+청킹 파라미터 스윕 - 문서는 한 번만 추출(캐시)하고 청크 크기/겹침/전략 조합별 지표 비교
+
+Usage:
+    python sweep.py data
+    python sweep.py data/sample.pdf --sizes 500,1000,1500 --overlaps 0,100,200
+    python sweep.py data --strategies sections --queries queries.jsonl --top-k 3
+    python sweep.py data --workers 4 --json output/sweep.json
+
+queries.jsonl (줄마다 질의 하나, expect 생략 시 질의 단어 전부):
+    {"query": "취약계층 고용 비율은 어떻게 계산하나요", "expect": ["취약계층", "고용"]}
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def int_list(value: str) -> list[int]:
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers: {value}") from None
+
+
+def print_table(reports: list[dict]):
+    has_queries = any("hit_rate" in r for r in reports)
+    header = f"  {'strategy':<9}{'size':>6}{'overlap':>8}{'chunks':>8}  {'tokens p50/p90/max':<20}{'mean':>7}{'dup':>7}"
+    if has_queries:
+        header += f"{'hit':>7}{'mrr':>7}"
+    print(header)
+    for r in reports:
+        t = r["tokens"]
+        spread = f"{t['p50']}/{t['p90']}/{t['max']}"
+        line = (
+            f"  {r['strategy']:<9}{r['chunk_size']:6d}{r['chunk_overlap']:8d}{r['chunks']:8d}"
+            f"  {spread:<20}{t['mean']:7.1f}{r['duplication']:7.3f}"
+        )
+        if has_queries:
+            line += f"{r['hit_rate']:7.3f}{r['mrr']:7.3f}"
+        print(line)
+
+
+def write_report(path: str, documents: list[str], failed: list[dict], elapsed: float, reports: list[dict]):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(
+        json.dumps({"documents": documents, "failed": failed, "seconds": round(elapsed, 3),
+                    "configs": reports}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    print(f"\nReport: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep chunking parameters over cached extractions")
+    parser.add_argument("path", help="PDF file or folder of PDFs")
+    parser.add_argument("--sizes", type=int_list, default=[500, 1000, 1500], help="chunk sizes (comma-separated)")
+    parser.add_argument("--overlaps", type=int_list, default=[0, 100, 200], help="chunk overlaps (comma-separated)")
+    parser.add_argument("--strategies", default="sections,pages", help="sections, pages or both")
+    parser.add_argument("--queries", metavar="FILE", help="JSONL query file for keyword-retrieval hit rate")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--heading-levels", type=int, default=2,
+                        help="heading levels used as section boundaries (part of the cache key)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="process pool size (1 = serial)")
+    parser.add_argument("--output-dir", default="./output/sweep",
+                        help="extraction cache and working directory (images)")
+    parser.add_argument("--json", metavar="FILE", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    from src.compare import find_pdfs
+    from src.sweep import build_grid, extract_cached, load_queries, run_sweep
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"Error: not found - {path}")
+        return
+    pdfs = find_pdfs(path)
+    if not pdfs:
+        print(f"Error: no PDF files in {path}")
+        return
+    try:
+        configs = build_grid(args.sizes, args.overlaps, [s.strip() for s in args.strategies.split(",")])
+        queries = load_queries(args.queries) if args.queries else []
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        return
+    if not configs:
+        print("Error: no valid configuration (overlap must be smaller than size)")
+        return
+
+    output_dir = Path(args.output_dir)
+    cache_dir = output_dir / "cache"
+    print(f"Extracting {len(pdfs)} document(s) (cache: {cache_dir})")
+    cache_paths = []
+    documents = []
+    failed = []
+    for pdf in pdfs:
+        t0 = time.perf_counter()
+        try:
+            cache_path, hit = extract_cached(pdf, cache_dir, str(output_dir), args.heading_levels)
+        except Exception as e:
+            print(f"  {pdf.name}: failed - {e}")
+            failed.append({"name": pdf.name, "error": str(e)})
+            continue
+        state = "cached" if hit else f"{time.perf_counter() - t0:.2f}s"
+        print(f"  {pdf.name}: {state}")
+        cache_paths.append(cache_path)
+        documents.append(pdf.name)
+    if not cache_paths:
+        # 실패 목록도 결과이므로 보고서는 남기고, 스크립트/CI가 알 수 있게 0이 아닌 코드로 종료
+        print(f"\nError: all {len(failed)} document(s) failed to extract")
+        if args.json:
+            write_report(args.json, documents, failed, 0.0, [])
+        sys.exit(1)
+
+    print(f"\nSweeping {len(configs)} configuration(s)"
+          + (f", {len(queries)} queries (top {args.top_k})" if queries else "")
+          + f", {args.workers} worker(s)")
+    t0 = time.perf_counter()
+    reports = run_sweep(cache_paths, configs, queries, args.top_k, args.workers)
+    elapsed = time.perf_counter() - t0
+    print()
+    print_table(reports)
+    print(f"\n  {elapsed:.2f}s total")
+
+    if queries:
+        best = max(reports, key=lambda r: (r["hit_rate"], r["mrr"], -r["chunks"]))
+        print(f"  best: {best['strategy']} size {best['chunk_size']} overlap {best['chunk_overlap']}"
+              f" (hit {best['hit_rate']:.3f}, mrr {best['mrr']:.3f}, {best['chunks']} chunks)")
+
+    if args.json:
+        write_report(args.json, documents, failed, elapsed, reports)
+
+
+if __name__ == "__main__":
+    main()
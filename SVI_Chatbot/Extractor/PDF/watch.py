@@ -0,0 +1,64 @@
+"""
+폴더 감시 수집 데몬 - 새/변경 PDF를 자동으로 추출해 청크 저장
+
+Usage:
+    python watch.py
+    python watch.py data --output-dir ./output --workers 4
+    python watch.py data --poll            # inotify 대신 폴링
+"""
+
+import argparse
+import signal
+import sys
+from pathlib import Path
+
+from src.watcher import FolderWatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and ingest PDFs")
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--output-dir", default="./output")
+    parser.add_argument("--workers", type=int, default=2, help="extraction process pool size")
+    parser.add_argument("--settle", type=float, default=1.0,
+                        help="seconds a file must stay unchanged before ingesting")
+    parser.add_argument("--poll", action="store_true", help="use polling instead of inotify")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between watch_metrics.json updates")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="retries for a failed file (backoff doubles from --retry-delay)")
+    parser.add_argument("--retry-delay", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, help="stop after N seconds (for testing)")
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: directory not found - {directory}")
+        return
+
+    watcher = FolderWatcher(
+        directory,
+        args.output_dir,
+        workers=args.workers,
+        settle_seconds=args.settle,
+        poll_seconds=args.poll_interval,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        use_inotify=not args.poll,
+        metrics_seconds=args.metrics_interval,
+        max_retries=args.max_retries,
+        retry_seconds=args.retry_delay,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        watcher.run(stop_after=args.duration)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    print(watcher.metrics())
+
+
+if __name__ == "__main__":
+    main()